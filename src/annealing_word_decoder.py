@@ -0,0 +1,200 @@
+import math
+import random
+import backtracking_word_decoder
+import instrumentation
+from timeit import default_timer as timer
+
+
+class AnnealingWordDecoder(backtracking_word_decoder.BacktrackingWordDecoder):
+    """
+    Simulated annealing alternative to the exhaustive search of the BacktrackingWordDecoder, for puzzles
+    where the search is too expensive. Each epoch holds one complete assignment of potential_words to
+    encrypted_words, starting from random potential_words, and moves by changing the potential_word of
+    one encrypted_word. A move is kept if it lowers the energy of the assignment, or otherwise with a
+    probability which falls as the temperature is lowered from start_temperature to end_temperature.
+
+    The energy is the no. of letter collisions, i.e. letters used at the zeros of more than one
+    potential_word, plus the no. of letters left unused beyond those needed by encrypted_words without
+    potential_words. If potential_word_scores are given, e.g. by word_frequency, word_score_weight times
+    the difference of each potential_word from the best score for its encrypted_word is added, so common
+    words are preferred. Energies are updated from per letter usage counts as each move is made,
+    rather than rescoring the assignment from scratch.
+
+    The lowest energy assignment of each epoch is yielded, so the decoder can be stopped at any time
+    with the best assignment so far. Each epoch restarts from a new random assignment.
+    """
+    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection, max_epochs=1,
+                 max_iterations=5000, max_seconds=None, start_temperature=1.0, end_temperature=0.05,
+                 word_score_weight=0.5, **kwargs):
+        """
+        :param max_epochs: No. of restarts, each with up to max_iterations moves
+        :param max_seconds: Optional time budget for every epoch together.
+        Decoding stops once it has passed, yielding the best assignment of the current epoch
+        :param kwargs: Stop conditions, as for the EncryptedWordDecoder
+        """
+        backtracking_word_decoder.BacktrackingWordDecoder.__init__(self, alphabet, encrypted_words,
+                                                                   potential_words_dict_collection, max_epochs,
+                                                                   **kwargs)
+        self.max_iterations = max_iterations
+        self.max_seconds = max_seconds
+        self.start_temperature = start_temperature
+        self.end_temperature = end_temperature
+        self.word_score_weight = word_score_weight
+        self.letter_indexes = {letter: i for i, letter in enumerate(self.alphabet)}
+        self.annealing_candidates = self.get_annealing_candidates()
+        self.free_words = [x for x in self.encrypted_words if x not in self.annealing_candidates]
+        self.free_zeros_count = sum(len(self.potential_words_dict_collection[x]['zeros_list'])
+                                    for x in self.free_words)
+        zeros_count = sum(len(self.potential_words_dict_collection[x]['zeros_list']) for x in self.encrypted_words)
+        self.spare_letters_count = self.free_zeros_count + max(0, len(self.alphabet) - zeros_count)
+        self.letter_counts = []
+        self.collisions = 0
+        self.unused_letters_count = 0
+        self.score_difference = 0
+        self.iterations = 0
+
+    def get_annealing_candidates(self):
+        """
+        :return: e.g. {'0ri0t': [('print', (15, 19), 0.0), ('wrist', (22, 18), 2.4), ...], ...}
+        where each potential_word is paired with the indexes of its zero index letters in the alphabet
+        and the difference of its score from the best potential_word_score of the encrypted_word.
+        Encrypted words without potential_words that fit the alphabet, e.g. 'tritt' for '0ri0t', are left out
+        and treated as free_words, so they are left unassigned and their letters count as unused
+        """
+        annealing_candidates = {}
+        for encrypted_word, candidates in self.candidates_by_encrypted_word.items():
+            if not candidates:
+                continue
+            zeros_list = self.potential_words_dict_collection[encrypted_word]['zeros_list']
+            potential_word_scores = self.potential_words_dict_collection[encrypted_word].get('potential_word_scores', {})
+            max_score = max(potential_word_scores.values(), default=0)
+            annealing_candidates[encrypted_word] = [
+                (potential_word, tuple(self.letter_indexes[potential_word[i]] for i in zeros_list),
+                 max_score - potential_word_scores.get(potential_word, 0))
+                for potential_word, letters_mask in candidates]
+        return annealing_candidates
+
+    def generate_decrypted_words_dicts(self):
+        self.best_score = None
+        self.epochs_without_improvement = 0
+        self.iterations = 0
+        deadline = timer() + self.max_seconds if self.max_seconds is not None else None
+        for x in range(1, self.max_epochs + 1):
+            print("Epoch", x)
+            instrumentation.increment("decoder_epochs")
+            assignment = self.get_assignment_for_epoch(deadline)
+            decrypted_words_dict = self.get_decrypted_words_dict_for_assignment(assignment)
+            yield decrypted_words_dict
+            if self.check_stop_for_decrypted_words_dict(decrypted_words_dict) or self.check_stop_for_epoch():
+                return
+            if deadline is not None and timer() >= deadline:
+                print("Stopping: time budget of {}s used".format(self.max_seconds))
+                return
+
+    def get_assignment_for_epoch(self, deadline=None):
+        """
+        :return: the lowest energy assignment found, e.g. {'0ri0t': 'wrist', '0ala00': 'galaxy', ...}
+        """
+        self.letter_counts = [0] * len(self.alphabet)
+        self.collisions = 0
+        self.unused_letters_count = len(self.alphabet)
+        self.score_difference = 0
+        candidate_indexes = {}
+        for encrypted_word, candidates in self.annealing_candidates.items():
+            candidate_indexes[encrypted_word] = random.randrange(len(candidates))
+            self.add_candidate(candidates[candidate_indexes[encrypted_word]])
+        movable_words = [x for x, candidates in self.annealing_candidates.items() if len(candidates) > 1]
+        energy = self.get_energy()
+        best_energy = energy
+        best_candidate_indexes = dict(candidate_indexes)
+        cooling_rate = (self.end_temperature / self.start_temperature) ** (1 / max(self.max_iterations - 1, 1))
+        temperature = self.start_temperature
+        iterations = 0
+        moves_accepted = 0
+        while movable_words and best_energy > 0 and iterations < self.max_iterations:
+            if deadline is not None and iterations % 256 == 0 and timer() >= deadline:
+                break
+            iterations += 1
+            encrypted_word = random.choice(movable_words)
+            candidates = self.annealing_candidates[encrypted_word]
+            old_index = candidate_indexes[encrypted_word]
+            new_index = random.randrange(len(candidates) - 1)
+            if new_index >= old_index:
+                new_index += 1
+            self.remove_candidate(candidates[old_index])
+            self.add_candidate(candidates[new_index])
+            new_energy = self.get_energy()
+            if new_energy <= energy or random.random() < math.exp((energy - new_energy) / temperature):
+                candidate_indexes[encrypted_word] = new_index
+                energy = new_energy
+                moves_accepted += 1
+                if energy < best_energy:
+                    best_energy = energy
+                    best_candidate_indexes = dict(candidate_indexes)
+            else:
+                self.remove_candidate(candidates[new_index])
+                self.add_candidate(candidates[old_index])
+            temperature *= cooling_rate
+        self.iterations += iterations
+        instrumentation.increment("annealing_iterations", iterations)
+        instrumentation.increment("annealing_moves_accepted", moves_accepted)
+        return {encrypted_word: self.annealing_candidates[encrypted_word][i][0]
+                for encrypted_word, i in best_candidate_indexes.items()}
+
+    def add_candidate(self, candidate):
+        potential_word, letter_indexes, score_difference = candidate
+        for i in letter_indexes:
+            count = self.letter_counts[i]
+            if count:
+                self.collisions += 1
+            else:
+                self.unused_letters_count -= 1
+            self.letter_counts[i] = count + 1
+        self.score_difference += score_difference
+
+    def remove_candidate(self, candidate):
+        potential_word, letter_indexes, score_difference = candidate
+        for i in letter_indexes:
+            count = self.letter_counts[i] - 1
+            if count:
+                self.collisions -= 1
+            else:
+                self.unused_letters_count += 1
+            self.letter_counts[i] = count
+        self.score_difference -= score_difference
+
+    def get_energy(self):
+        return self.collisions + max(0, self.unused_letters_count - self.spare_letters_count) + \
+               self.word_score_weight * self.score_difference
+
+    def get_score(self, decrypted_words_dict):
+        """
+        Without an answers_dict, assignments with fewer letter collisions and unused letters score higher
+        """
+        if self.answers_dict is not None:
+            return self.get_accuracy(decrypted_words_dict)
+        letter_counts = {}
+        for encrypted_word, decrypted_word in decrypted_words_dict.items():
+            for i in self.potential_words_dict_collection[encrypted_word]['zeros_list']:
+                letter_counts[decrypted_word[i]] = letter_counts.get(decrypted_word[i], 0) + 1
+        collisions = sum(count - 1 for count in letter_counts.values())
+        unused_letters_count = sum(1 for letter in self.alphabet if letter not in letter_counts)
+        return -collisions - unused_letters_count
+
+    def get_decrypted_words_dict_for_assignment(self, assignment):
+        """
+        Letters not used by the assignment are allocated to the free_words at zero indexes, as done by
+        the EncryptedWordDecoder for unassigned words. If collisions leave too few letters,
+        the free_words are left encrypted.
+        """
+        used_letters_mask = 0
+        for encrypted_word, potential_word in assignment.items():
+            used_letters_mask |= self.potential_word_masks[encrypted_word][potential_word]
+        unassigned_letters = self.get_letters_for_mask(self.alphabet_mask & ~used_letters_mask)
+        decrypted_words_dict = dict(assignment)
+        if len(unassigned_letters) >= self.free_zeros_count:
+            decrypted_words_dict.update(self.get_decrypted_words_dict_for_unassigned_words(unassigned_letters,
+                                                                                          list(self.free_words)))
+        else:
+            decrypted_words_dict.update({x: x for x in self.free_words})
+        return {x: decrypted_words_dict[x] for x in self.encrypted_words}
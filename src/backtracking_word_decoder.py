@@ -0,0 +1,142 @@
+import encrypted_word_decoder
+import instrumentation
+
+
+class BacktrackingWordDecoder(encrypted_word_decoder.EncryptedWordDecoder):
+    """
+    Deterministic alternative to the randomised epochs of the EncryptedWordDecoder.
+    A depth first search assigns potential_words to encrypted_words, always expanding the
+    encrypted_word with the fewest potential_words still consistent with the letters already used.
+    Branches are pruned when a potential_word reuses a letter, when an encrypted_word has no
+    consistent potential_words left, or when the letters left can no longer cover the zeros left.
+    Every consistent assignment is found in one pass, so the decrypted_words_dict_collection
+    holds each solution once rather than one dictionary per starting letter per epoch.
+    If no assignment exists the collection is empty, which proves the potential_words_dict_collection
+    cannot solve the encrypted_words.
+    """
+    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection, max_epochs=None,
+                 max_solutions=None, **kwargs):
+        """
+        :param max_epochs: Unused. Kept so the class is interchangeable with the EncryptedWordDecoder
+        :param max_solutions: Optional limit on the number of solutions collected before the search stops
+        :param kwargs: Stop conditions, as for the EncryptedWordDecoder. Each solution counts as an epoch
+        """
+        encrypted_word_decoder.EncryptedWordDecoder.__init__(self, alphabet, encrypted_words,
+                                                             potential_words_dict_collection, max_epochs, **kwargs)
+        self.max_solutions = max_solutions
+        self.candidates_by_encrypted_word = self.get_candidates_by_encrypted_word()
+        self.free_words = [x for x in self.encrypted_words if x not in self.candidates_by_encrypted_word]
+        self.free_zeros_count = sum(len(self.potential_words_dict_collection[x]['zeros_list'])
+                                    for x in self.free_words)
+        self.exact_cover = self.check_exact_cover()
+        self.backtracks = 0
+
+    def get_candidates_by_encrypted_word(self):
+        """
+        :return: e.g. {'0ri0t': [('drift', 40), ('wrist', 4456448)], ...}
+        where each potential_word is paired with the letters_mask of its zero index letters.
+        Encrypted words without successful potential_words are left out and are
+        later filled with the letters left over by each solution.
+        """
+        candidates_by_encrypted_word = {}
+        for encrypted_word in self.encrypted_words:
+            potential_words_dict = self.potential_words_dict_collection[encrypted_word]
+            if not potential_words_dict['success']:
+                continue
+            potential_word_masks = self.potential_word_masks.get(encrypted_word, {})
+            candidates_by_encrypted_word[encrypted_word] = list(potential_word_masks.items())
+        return candidates_by_encrypted_word
+
+    def check_exact_cover(self):
+        """
+        When every encrypted_word has potential_words and there are as many zeros as letters,
+        each letter must be used exactly once. This allows pruning branches which leave a letter
+        that no remaining potential_word can use.
+        """
+        zeros_count = sum(len(self.potential_words_dict_collection[x]['zeros_list']) for x in self.encrypted_words)
+        return not self.free_words and zeros_count == len(self.alphabet)
+
+    def execute_encrypted_word_decoder(self):
+        return list(self.generate_decrypted_words_dicts())
+
+    def generate_decrypted_words_dicts(self):
+        """
+        Yields each solution as soon as the search finds it
+        """
+        self.best_score = None
+        self.epochs_without_improvement = 0
+        self.backtracks = 0
+        no_of_solutions = 0
+        try:
+            for solution in self.search({}, 0):
+                decrypted_words_dict = self.get_decrypted_words_dict_for_solution(solution)
+                no_of_solutions += 1
+                yield decrypted_words_dict
+                if self.check_stop_for_decrypted_words_dict(decrypted_words_dict) or self.check_stop_for_epoch():
+                    break
+                if self.max_solutions and no_of_solutions >= self.max_solutions:
+                    break
+        finally:
+            print("Solutions found: {}, backtracks: {}".format(no_of_solutions, self.backtracks))
+            instrumentation.increment("backtracks", self.backtracks)
+            instrumentation.increment("solutions", no_of_solutions)
+
+    def search(self, decrypted_words_dict, used_letters_mask):
+        """
+        Generator which yields a copy of decrypted_words_dict for each consistent assignment
+        """
+        if len(decrypted_words_dict) == len(self.candidates_by_encrypted_word):
+            yield dict(decrypted_words_dict)
+            return
+        next_word_result_dict = self.get_next_word_result_dict(decrypted_words_dict, used_letters_mask)
+        if not next_word_result_dict["success"]:
+            self.backtracks += 1
+            return
+        next_word = next_word_result_dict["next_word"]
+        for potential_word, letters_mask in next_word_result_dict["next_candidates"]:
+            decrypted_words_dict[next_word] = potential_word
+            yield from self.search(decrypted_words_dict, used_letters_mask | letters_mask)
+            decrypted_words_dict.pop(next_word)
+
+    def get_next_word_result_dict(self, decrypted_words_dict, used_letters_mask):
+        """
+        Chooses the remaining encrypted_word with the fewest potential_words consistent with used_letters_mask.
+        success is False if the partial assignment cannot be completed, so the branch should be pruned.
+        :return: e.g. {"next_word": '0ri0t', "next_candidates": [('wrist', 4456448), ...], "success": True}
+        """
+        remaining_words = [x for x in self.candidates_by_encrypted_word if x not in decrypted_words_dict]
+        remaining_zeros_count = self.free_zeros_count + sum(
+            len(self.potential_words_dict_collection[x]['zeros_list']) for x in remaining_words)
+        if len(self.alphabet) - bin(used_letters_mask).count("1") < remaining_zeros_count:
+            return {"success": False}
+        next_word = None
+        next_candidates = None
+        reachable_letters_mask = 0
+        for encrypted_word in remaining_words:
+            consistent_candidates = [(potential_word, letters_mask) for potential_word, letters_mask
+                                     in self.candidates_by_encrypted_word[encrypted_word]
+                                     if not used_letters_mask & letters_mask]
+            if not consistent_candidates:
+                return {"success": False}
+            if self.exact_cover:
+                for potential_word, letters_mask in consistent_candidates:
+                    reachable_letters_mask |= letters_mask
+            if next_candidates is None or len(consistent_candidates) < len(next_candidates):
+                next_word = encrypted_word
+                next_candidates = consistent_candidates
+        if self.exact_cover and self.alphabet_mask & ~used_letters_mask & ~reachable_letters_mask:
+            return {"success": False}
+        return {"next_word": next_word, "next_candidates": next_candidates, "success": True}
+
+    def get_decrypted_words_dict_for_solution(self, solution):
+        """
+        Letters not used by the solution are allocated to the free_words at zero indexes,
+        as done by the EncryptedWordDecoder for unassigned words.
+        """
+        used_letters_mask = 0
+        for encrypted_word, potential_word in solution.items():
+            used_letters_mask |= self.potential_word_masks[encrypted_word][potential_word]
+        unassigned_letters = self.get_letters_for_mask(self.alphabet_mask & ~used_letters_mask)
+        solution.update(self.get_decrypted_words_dict_for_unassigned_words(unassigned_letters,
+                                                                           list(self.free_words)))
+        return {x: solution[x] for x in self.encrypted_words}
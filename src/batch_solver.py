@@ -0,0 +1,172 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import string
+import experimenter
+import lexicon_word_finder
+import trie_word_finder
+import word_frequency
+import report_writer
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from timeit import default_timer as timer
+
+_batch_solver = None
+
+
+def set_batch_solver(batch_solver):
+    """
+    Initializer for worker processes. The BatchSolver is sent to each worker once,
+    rather than with every puzzle.
+    """
+    global _batch_solver
+    _batch_solver = batch_solver
+
+
+def get_result_dict_for_puzzle_in_worker(puzzle_dict):
+    return _batch_solver.get_result_dict_for_puzzle(puzzle_dict)
+
+
+def read_puzzle_dicts(puzzles_path):
+    """
+    Lazily reads puzzles from a JSON Lines file, one puzzle per line, so the whole batch is never held in memory.
+    alphabet defaults to a-z, name defaults to the line number and answers_dict is optional.
+    e.g. {"name": "original", "encrypted_words": ["0ri0t", "0ala00", ...], "answers_dict": {"0ri0t": "wrist", ...}}
+    """
+    with open(puzzles_path) as puzzles_file:
+        for line_no, line in enumerate(puzzles_file, 1):
+            if not line.strip():
+                continue
+            puzzle_dict = json.loads(line)
+            puzzle_dict.setdefault("name", str(line_no))
+            yield puzzle_dict
+
+
+class BatchSolver():
+    """
+    Solves many independent puzzles, spread across a pool of worker processes.
+    Puzzles are taken lazily from any iterable and at most max_pending_puzzles are queued at once,
+    so memory stays bounded however large the batch is. Results are yielded in completion order.
+
+    Word finding uses an Experimenter, so the word finder parameters, the on-disk word finder cache
+    and the word finder seed behave as they do for experiments. The lexicon and spellchecker dictionaries
+    are loaded once before the workers are forked, so every worker shares them copy-on-write.
+    """
+    def __init__(self):
+        self.experimenter_cls = experimenter.Experimenter()
+        self.word_finder = self.experimenter_cls.lexicon_word_finder
+        self.word_decoder = self.experimenter_cls.backtracking_word_decoder
+        self.word_decoder_max_epochs = self.experimenter_cls.word_decoder_max_epochs
+        self.word_decoder_kwargs = {"max_solutions": 1, "stop_on_full_solution": True}
+        self.verbose = False
+
+    def generate_result_dicts(self, puzzle_dicts, max_workers=None, max_pending_puzzles=None):
+        """
+        :param puzzle_dicts: An iterable of puzzles, e.g. read_puzzle_dicts(puzzles_path)
+        :param max_workers: Number of worker processes, defaults to the number of CPUs.
+        With max_workers=0 puzzles are solved one after another in this process.
+        :param max_pending_puzzles: Limit on puzzles queued or being solved, defaults to 2 per worker
+        """
+        if max_workers == 0:
+            for puzzle_dict in puzzle_dicts:
+                yield self.get_result_dict_for_puzzle(puzzle_dict)
+            return
+        max_workers = max_workers or multiprocessing.cpu_count()
+        max_pending_puzzles = max_pending_puzzles or 2 * max_workers
+        mp_context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            self.preload_word_finder()
+            mp_context = multiprocessing.get_context("fork")
+        puzzle_dicts = iter(puzzle_dicts)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                                 initializer=set_batch_solver, initargs=(self,)) as executor:
+            pending_futures = set()
+            for puzzle_dict in puzzle_dicts:
+                pending_futures.add(executor.submit(get_result_dict_for_puzzle_in_worker, puzzle_dict))
+                if len(pending_futures) < max_pending_puzzles:
+                    continue
+                done_futures, pending_futures = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    yield future.result()
+            while pending_futures:
+                done_futures, pending_futures = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    yield future.result()
+
+    def execute_batch_solver(self, puzzles_path, results_path, max_workers=None):
+        """
+        Solves the puzzles in the JSON Lines file at puzzles_path and appends a row per puzzle
+        to results_path (.jsonl, .csv or .parquet) as each completes
+        """
+        writer = report_writer.ReportWriter(results_path)
+        no_of_puzzles = 0
+        for result_dict in self.generate_result_dicts(read_puzzle_dicts(puzzles_path), max_workers):
+            writer.append_row(result_dict)
+            no_of_puzzles += 1
+            print("Solved puzzle {} in {:.2f}s, success: {}".format(result_dict["name"],
+                                                                    result_dict["time_taken_in_seconds"],
+                                                                    result_dict["success"]))
+        print("Written results for {} puzzles to {}".format(no_of_puzzles, results_path))
+
+    def preload_word_finder(self):
+        """
+        Loads the dictionaries used by self.word_finder, and the word frequencies used to rank potential_words,
+        in this process before workers are forked
+        """
+        if self.word_finder is self.experimenter_cls.lexicon_word_finder:
+            lexicon_word_finder.get_lexicon(self.experimenter_cls.lexicon_word_list_path)
+        elif self.word_finder is self.experimenter_cls.trie_word_finder:
+            trie_word_finder.get_word_trie(self.experimenter_cls.lexicon_word_list_path,
+                                           self.experimenter_cls.trie_path)
+        if self.experimenter_cls.use_word_frequencies:
+            word_frequency.get_word_frequencies(self.experimenter_cls.word_frequency_path)
+
+    def get_result_dict_for_puzzle(self, puzzle_dict):
+        """
+        :return: e.g. {"name": "original", "decrypted_words_dict": {'0ri0t': 'wrist', ...}, "success": True,
+                       "accuracy": 1.0, "time_word_finder": 0.02, "time_decoder": 0.01, "time_taken_in_seconds": 0.03}
+        success is True if a full solution was found. accuracy is only given for puzzles with an answers_dict.
+        Errors are returned in the result, so one bad puzzle does not stop the batch.
+        """
+        start = timer()
+        result_dict = {"name": puzzle_dict.get("name")}
+        try:
+            with contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO()):
+                result_dict.update(self.get_decrypted_words_result_dict(puzzle_dict))
+        except Exception as e:
+            result_dict.update({"decrypted_words_dict": {}, "success": False, "error": repr(e)})
+        result_dict["time_taken_in_seconds"] = timer() - start
+        return result_dict
+
+    def get_decrypted_words_result_dict(self, puzzle_dict):
+        self.experimenter_cls.set_puzzle({"name": puzzle_dict.get("name"),
+                                          "alphabet": puzzle_dict.get("alphabet", string.ascii_lowercase),
+                                          "encrypted_words": puzzle_dict["encrypted_words"],
+                                          "answers_dict": puzzle_dict.get("answers_dict") or {}})
+        start = timer()
+        potential_words_dict_collection = self.experimenter_cls.get_potential_words_dict_collection_for_word_finder(
+            self.word_finder, self.experimenter_cls.text_blob_params_dict)
+        word_finder_time = timer() - start
+
+        start = timer()
+        decoder = self.word_decoder(self.experimenter_cls.alphabet, self.experimenter_cls.encrypted_words,
+                                    potential_words_dict_collection, max_epochs=self.word_decoder_max_epochs,
+                                    **self.word_decoder_kwargs)
+        best_decrypted_words_dict = {}
+        best_score = None
+        for decrypted_words_dict in decoder.generate_decrypted_words_dicts():
+            score = decoder.get_score(decrypted_words_dict)
+            if best_score is None or score > best_score:
+                best_decrypted_words_dict, best_score = decrypted_words_dict, score
+        decoder_time = timer() - start
+
+        result_dict = {"decrypted_words_dict": best_decrypted_words_dict,
+                       "success": decoder.check_full_solution(best_decrypted_words_dict),
+                       "time_word_finder": word_finder_time,
+                       "time_decoder": decoder_time}
+        answers_dict = puzzle_dict.get("answers_dict")
+        if answers_dict:
+            result_dict["accuracy"] = sum(1 for encrypted_word, correct_word in answers_dict.items()
+                                          if best_decrypted_words_dict.get(encrypted_word) == correct_word
+                                          ) / len(answers_dict)
+        return result_dict
@@ -0,0 +1,105 @@
+import heapq
+import random
+import backtracking_word_decoder
+import instrumentation
+
+
+class BeamWordDecoder(backtracking_word_decoder.BacktrackingWordDecoder):
+    """
+    Beam search alternative to the randomised epochs of the EncryptedWordDecoder.
+    Each beam is a partial assignment of potential_words to encrypted_words. At every step each beam
+    is extended with the consistent potential_words of its most constrained encrypted_word, as chosen by
+    the BacktrackingWordDecoder, and only the beam_width beams with the highest total score are kept.
+    Scores come from the potential_word_scores of each potential_words_dict, e.g. from
+    word_frequency.get_scored_potential_words_dict_collection, so common words are preferred to junk.
+    As beams may have decrypted different encrypted_words, each potential_word scores the difference
+    from the best score for its encrypted_word, so a beam only loses score for choosing a less common word.
+    Without potential_word_scores every beam scores 0 and ties are broken randomly.
+    Each full assignment left at the end is yielded, from the highest score down.
+    """
+    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection, max_epochs=None,
+                 beam_width=16, **kwargs):
+        """
+        :param max_epochs: Unused. Kept so the class is interchangeable with the EncryptedWordDecoder
+        :param beam_width: No. of partial assignments kept after each step
+        :param kwargs: Stop conditions, as for the EncryptedWordDecoder. Each full assignment counts as an epoch
+        """
+        backtracking_word_decoder.BacktrackingWordDecoder.__init__(self, alphabet, encrypted_words,
+                                                                   potential_words_dict_collection, max_epochs,
+                                                                   **kwargs)
+        self.beam_width = beam_width
+        self.potential_word_scores = {x: self.potential_words_dict_collection[x].get('potential_word_scores', {})
+                                      for x in self.candidates_by_encrypted_word}
+        self.max_potential_word_scores = {x: max(potential_word_scores.values(), default=0)
+                                          for x, potential_word_scores in self.potential_word_scores.items()}
+        self.pruned_beams = 0
+
+    def generate_decrypted_words_dicts(self):
+        """
+        Yields each full assignment in the final beams. If every beam was pruned before a full assignment
+        was reached, the best beam of the last step is yielded, with letters left over allocated at random
+        as done by the EncryptedWordDecoder for unassigned words.
+        """
+        self.best_score = None
+        self.epochs_without_improvement = 0
+        self.pruned_beams = 0
+        no_of_solutions = 0
+        try:
+            beams = self.get_final_beams()
+            for beam in beams:
+                decrypted_words_dict = self.get_decrypted_words_dict_for_beam(beam)
+                no_of_solutions += 1
+                yield decrypted_words_dict
+                if self.check_stop_for_decrypted_words_dict(decrypted_words_dict) or self.check_stop_for_epoch():
+                    break
+        finally:
+            print("Solutions found: {}, beams pruned: {}".format(no_of_solutions, self.pruned_beams))
+            instrumentation.increment("beams_pruned", self.pruned_beams)
+            instrumentation.increment("solutions", no_of_solutions)
+
+    def get_final_beams(self):
+        """
+        :return: e.g. [(-12.4, 0.53, {'0ri0t': 'wrist', ...}, 67108863), ...] beams as
+        (score, tie_break, decrypted_words_dict, used_letters_mask), from the highest score down
+        """
+        beams = [(0, random.random(), {}, 0)]
+        for x in range(len(self.candidates_by_encrypted_word)):
+            next_beams = self.get_next_beams(beams)
+            if not next_beams:
+                return beams[:1]
+            beams = next_beams
+        return beams
+
+    def get_next_beams(self, beams):
+        """
+        Extends each beam by one encrypted_word, then keeps the beam_width beams with the highest scores.
+        Beams reaching the same assignment by a different order are only kept once.
+        """
+        next_beams_by_assignment = {}
+        for score, tie_break, decrypted_words_dict, used_letters_mask in beams:
+            next_word_result_dict = self.get_next_word_result_dict(decrypted_words_dict, used_letters_mask)
+            if not next_word_result_dict["success"]:
+                self.pruned_beams += 1
+                continue
+            next_word = next_word_result_dict["next_word"]
+            potential_word_scores = self.potential_word_scores[next_word]
+            max_score = self.max_potential_word_scores[next_word]
+            for potential_word, letters_mask in next_word_result_dict["next_candidates"]:
+                next_decrypted_words_dict = dict(decrypted_words_dict)
+                next_decrypted_words_dict[next_word] = potential_word
+                assignment = frozenset(next_decrypted_words_dict.items())
+                if assignment not in next_beams_by_assignment:
+                    next_score = score + potential_word_scores.get(potential_word, 0) - max_score
+                    next_beams_by_assignment[assignment] = (next_score, random.random(), next_decrypted_words_dict,
+                                                            used_letters_mask | letters_mask)
+        return heapq.nlargest(self.beam_width, next_beams_by_assignment.values(), key=lambda beam: beam[:2])
+
+    def get_decrypted_words_dict_for_beam(self, beam):
+        score, tie_break, decrypted_words_dict, used_letters_mask = beam
+        if len(decrypted_words_dict) == len(self.candidates_by_encrypted_word):
+            return self.get_decrypted_words_dict_for_solution(dict(decrypted_words_dict))
+        unassigned_letters = self.get_letters_for_mask(self.alphabet_mask & ~used_letters_mask)
+        decrypted_words_dict = dict(decrypted_words_dict)
+        decrypted_words_dict.update(self.get_decrypted_words_dict_for_unassigned_words(
+            unassigned_letters, self.get_unassigned_words(decrypted_words_dict)))
+        return {x: decrypted_words_dict[x] for x in self.encrypted_words}
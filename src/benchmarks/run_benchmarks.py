@@ -0,0 +1,302 @@
+"""
+Benchmarks for the word finders, PotentialWordTracker and decoders using the versioned
+fixtures in benchmarks/fixtures. Everything runs offline with fixed seeds.
+
+Run from the src directory:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --tolerance 0.2
+
+Each benchmark reports throughput (e.g. epochs/sec, words/sec), peak memory traced by tracemalloc
+and accuracy. When a baseline is given, throughput is compared against it and the exit code is 1
+if any benchmark is slower than the baseline by more than the tolerance.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import tracemalloc
+from timeit import default_timer as timer
+
+import annealing_word_decoder
+import backtracking_word_decoder
+import beam_word_decoder
+import encrypted_word_decoder
+import lexicon_word_finder
+import potential_word_tracker
+import puzzle_generator
+import report_maker
+import trie_word_finder
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CANDIDATE_FIXTURES = ["small", "medium", "large"]
+FIXTURES_VERSION = 1
+# Restarts of the AnnealingWordDecoder, each of which runs up to its default max_iterations
+ANNEALING_EPOCHS = 5
+
+
+def get_fixture_path(name, extension="json"):
+    return os.path.join(FIXTURES_DIR, "{}_v{}.{}".format(name, FIXTURES_VERSION, extension))
+
+
+def load_fixture(name):
+    with open(get_fixture_path(name)) as fixture_file:
+        return json.load(fixture_file)
+
+
+def run_benchmark(name, function, unit, seed, rounds):
+    """
+    Runs the benchmark rounds times with the same seed and keeps the fastest round, to reduce timing noise.
+    Peak memory is traced in a separate round, as tracemalloc slows down the code being timed.
+    :param function: Runs the benchmark and returns {"work": no. of units of work done, "accuracy": ...}
+    :return: e.g. {"name": "encrypted_word_decoder[small]", "seconds": 0.52, "throughput": 96.2,
+                   "unit": "epochs/sec", "peak_memory_bytes": 181234, "accuracy": 0.28}
+    """
+    seconds = None
+    for x in range(rounds):
+        random.seed(seed)
+        start = timer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result_dict = function()
+        round_seconds = timer() - start
+        if seconds is None or round_seconds < seconds:
+            seconds = round_seconds
+    random.seed(seed)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function()
+    peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"name": name, "seconds": seconds, "throughput": result_dict["work"] / seconds if seconds else 0,
+            "unit": unit, "peak_memory_bytes": peak_memory_bytes, "accuracy": result_dict.get("accuracy")}
+
+
+def get_mean_accuracy(answers_dict, decrypted_words_dicts):
+    report_maker_cls = report_maker.ReportMaker(answers_dict, decrypted_words_dicts, {}, None, None, None, None)
+    accuracies = report_maker_cls.get_result_dict_for_runs()["accuracies"]
+    return float(accuracies.mean()) if len(accuracies) else 0
+
+
+def get_decoder_benchmark(puzzle, potential_words_dict_collection, max_epochs):
+    def benchmark():
+        decoder = encrypted_word_decoder.EncryptedWordDecoder(list(puzzle["alphabet"]), puzzle["encrypted_words"],
+                                                              potential_words_dict_collection, max_epochs=max_epochs)
+        accuracy = get_mean_accuracy(puzzle["answers_dict"], decoder.generate_decrypted_words_dicts())
+        return {"work": max_epochs, "accuracy": accuracy}
+    return benchmark
+
+
+def get_backtracking_decoder_benchmark(puzzle, potential_words_dict_collection):
+    def benchmark():
+        decoder = backtracking_word_decoder.BacktrackingWordDecoder(list(puzzle["alphabet"]),
+                                                                    puzzle["encrypted_words"],
+                                                                    potential_words_dict_collection,
+                                                                    max_solutions=1000)
+        accuracy = get_mean_accuracy(puzzle["answers_dict"], decoder.generate_decrypted_words_dicts())
+        return {"work": max(decoder.backtracks, 1), "accuracy": accuracy}
+    return benchmark
+
+
+def get_beam_decoder_benchmark(puzzle, potential_words_dict_collection):
+    def benchmark():
+        decoder = beam_word_decoder.BeamWordDecoder(list(puzzle["alphabet"]), puzzle["encrypted_words"],
+                                                    potential_words_dict_collection)
+        accuracy = get_mean_accuracy(puzzle["answers_dict"], decoder.generate_decrypted_words_dicts())
+        return {"work": 1, "accuracy": accuracy}
+    return benchmark
+
+
+def get_annealing_decoder_benchmark(puzzle, potential_words_dict_collection):
+    def benchmark():
+        decoder = annealing_word_decoder.AnnealingWordDecoder(list(puzzle["alphabet"]), puzzle["encrypted_words"],
+                                                              potential_words_dict_collection,
+                                                              max_epochs=ANNEALING_EPOCHS)
+        accuracy = get_mean_accuracy(puzzle["answers_dict"], decoder.generate_decrypted_words_dicts())
+        return {"work": max(decoder.iterations, 1), "accuracy": accuracy}
+    return benchmark
+
+
+def get_tracker_benchmark(puzzle, potential_words_dict_collection, repeats):
+    def benchmark():
+        no_of_words = sum(len(v["potential_words_list"]) for v in potential_words_dict_collection.values())
+        for x in range(repeats):
+            tracker = potential_word_tracker.PotentialWordTracker(list(puzzle["alphabet"]), puzzle["encrypted_words"],
+                                                                  potential_words_dict_collection)
+            tracker.execute_potential_word_tracker()
+        return {"work": no_of_words * repeats}
+    return benchmark
+
+
+def get_word_finder_benchmark(puzzle, word_finder, repeats, **kwargs):
+    """
+    Accuracy is the proportion of encrypted_words where the answer is among the potential_words found
+    """
+    def benchmark():
+        words_found = 0
+        for x in range(repeats):
+            words_found = 0
+            for encrypted_word, correct_word in puzzle["answers_dict"].items():
+                potential_words_dict = word_finder(encrypted_word, list(puzzle["alphabet"]), **kwargs).execute()
+                if correct_word in potential_words_dict[encrypted_word]["potential_words_list"]:
+                    words_found += 1
+        return {"work": len(puzzle["answers_dict"]) * repeats, "accuracy": words_found / len(puzzle["answers_dict"])}
+    return benchmark
+
+
+def get_optional_word_finder_benchmarks(puzzle):
+    """
+    The TextBlob and pyspellchecker finders are only benchmarked if their libraries are installed.
+    Both load their dictionaries from the installed packages, so they run offline.
+    """
+    benchmarks = []
+    if importlib.util.find_spec("spellchecker"):
+        import pyspellchecker_word_finder
+        benchmarks.append(("pyspellchecker_word_finder", get_word_finder_benchmark(
+            puzzle, pyspellchecker_word_finder.PyspellcheckerWordFinder, 1, no_of_random_letters=5), "words/sec"))
+    else:
+        print("Skipping pyspellchecker_word_finder: pyspellchecker is not installed")
+    if importlib.util.find_spec("textblob"):
+        import text_blob_word_finder
+        benchmarks.append(("text_blob_word_finder", get_word_finder_benchmark(
+            puzzle, text_blob_word_finder.TextBlobWordFinder, 1, min_iters_per_epoch=20, min_potential_words=3,
+            max_epochs=1, max_attempts=1), "words/sec"))
+    else:
+        print("Skipping text_blob_word_finder: textblob is not installed")
+    return benchmarks
+
+
+def get_puzzle_family_benchmarks(max_epochs, seed):
+    """
+    Generates a puzzle for each of the PUZZLE_FAMILIES from the fixture word list, finds candidates with the
+    LexiconWordFinder, then benchmarks the decoders on them. Families which cannot be generated from the
+    word list are skipped.
+    """
+    word_list_path = get_fixture_path("word_list", "txt")
+    generator = puzzle_generator.PuzzleGenerator(word_list_path, seed=seed)
+    benchmarks = []
+    for puzzle_family in puzzle_generator.PUZZLE_FAMILIES:
+        try:
+            puzzle = generator.get_puzzle_dict(**puzzle_family)
+        except ValueError as e:
+            print("Skipping puzzle family {}: {}".format(puzzle_family["name"], e))
+            continue
+        potential_words_dict_collection = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for encrypted_word in puzzle["encrypted_words"]:
+                potential_words_dict_collection.update(lexicon_word_finder.LexiconWordFinder(
+                    encrypted_word, puzzle["alphabet"], word_list_path=word_list_path).execute())
+        benchmarks.append(("encrypted_word_decoder[puzzle_{}]".format(puzzle["name"]),
+                           get_decoder_benchmark(puzzle, potential_words_dict_collection, max_epochs), "epochs/sec"))
+        benchmarks.append(("backtracking_word_decoder[puzzle_{}]".format(puzzle["name"]),
+                           get_backtracking_decoder_benchmark(puzzle, potential_words_dict_collection),
+                           "backtracks/sec"))
+        benchmarks.append(("beam_word_decoder[puzzle_{}]".format(puzzle["name"]),
+                           get_beam_decoder_benchmark(puzzle, potential_words_dict_collection), "decodes/sec"))
+        benchmarks.append(("annealing_word_decoder[puzzle_{}]".format(puzzle["name"]),
+                           get_annealing_decoder_benchmark(puzzle, potential_words_dict_collection),
+                           "iterations/sec"))
+    return benchmarks
+
+
+def get_benchmarks(max_epochs, repeats, include_spellcheckers, include_puzzle_families=False, seed=0):
+    puzzle = load_fixture("puzzle")
+    benchmarks = []
+    for fixture_name in CANDIDATE_FIXTURES:
+        potential_words_dict_collection = load_fixture(fixture_name)["potential_words_dict_collection"]
+        benchmarks.append(("encrypted_word_decoder[{}]".format(fixture_name),
+                           get_decoder_benchmark(puzzle, potential_words_dict_collection, max_epochs), "epochs/sec"))
+        benchmarks.append(("backtracking_word_decoder[{}]".format(fixture_name),
+                           get_backtracking_decoder_benchmark(puzzle, potential_words_dict_collection),
+                           "backtracks/sec"))
+        benchmarks.append(("beam_word_decoder[{}]".format(fixture_name),
+                           get_beam_decoder_benchmark(puzzle, potential_words_dict_collection), "decodes/sec"))
+        benchmarks.append(("annealing_word_decoder[{}]".format(fixture_name),
+                           get_annealing_decoder_benchmark(puzzle, potential_words_dict_collection),
+                           "iterations/sec"))
+        benchmarks.append(("potential_word_tracker[{}]".format(fixture_name),
+                           get_tracker_benchmark(puzzle, potential_words_dict_collection, repeats), "words/sec"))
+    benchmarks.append(("lexicon_word_finder", get_word_finder_benchmark(
+        puzzle, lexicon_word_finder.LexiconWordFinder, repeats,
+        word_list_path=get_fixture_path("word_list", "txt")), "words/sec"))
+    benchmarks.append(("trie_word_finder", get_word_finder_benchmark(
+        puzzle, trie_word_finder.TrieWordFinder, repeats,
+        word_list_path=get_fixture_path("word_list", "txt")), "words/sec"))
+    if include_spellcheckers:
+        benchmarks.extend(get_optional_word_finder_benchmarks(puzzle))
+    if include_puzzle_families:
+        benchmarks.extend(get_puzzle_family_benchmarks(max_epochs, seed))
+    return benchmarks
+
+
+def compare_with_baseline(results, baseline_results, tolerance):
+    """
+    :return: names of benchmarks with throughput below (1 - tolerance) of the baseline
+    """
+    baseline_results_dict = {result["name"]: result for result in baseline_results}
+    regressions = []
+    print("\n{:<40} {:>12} {:>12} {:>8}".format("benchmark", "baseline", "current", "ratio"))
+    for result in results:
+        baseline_result = baseline_results_dict.get(result["name"])
+        if baseline_result is None or not baseline_result["throughput"]:
+            continue
+        ratio = result["throughput"] / baseline_result["throughput"]
+        print("{:<40} {:>12.1f} {:>12.1f} {:>8.2f}".format(result["name"], baseline_result["throughput"],
+                                                          result["throughput"], ratio))
+        if ratio < 1 - tolerance:
+            regressions.append(result["name"])
+    return regressions
+
+
+def print_results(results):
+    print("{:<40} {:>14} {:<16} {:>12} {:>9}".format("benchmark", "throughput", "unit", "peak_mem_kb", "accuracy"))
+    for result in results:
+        accuracy = "" if result["accuracy"] is None else "{:.2f}".format(result["accuracy"])
+        print("{:<40} {:>14.1f} {:<16} {:>12.1f} {:>9}".format(result["name"], result["throughput"], result["unit"],
+                                                               result["peak_memory_bytes"] / 1024, accuracy))
+
+
+def main(args=None, prog=None):
+    """
+    :param prog: Program name shown in the usage, e.g. "alphabet_soup bench" when run by cli.py
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="Alphabet soup benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-epochs", type=int, default=20, help="EncryptedWordDecoder epochs per benchmark")
+    parser.add_argument("--repeats", type=int, default=20, help="Repeats for the tracker and lexicon benchmarks")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per benchmark, the fastest is kept")
+    parser.add_argument("--spellcheckers", action="store_true",
+                        help="Also benchmark the TextBlob and pyspellchecker word finders")
+    parser.add_argument("--puzzle-families", action="store_true",
+                        help="Also benchmark the decoders on generated puzzle families of increasing difficulty")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop against the baseline")
+    parser.add_argument("--save-baseline", help="Writes the results to this JSON file")
+    parsed_args = parser.parse_args(args)
+
+    results = [run_benchmark(name, function, unit, parsed_args.seed, parsed_args.rounds) for name, function, unit
+               in get_benchmarks(parsed_args.max_epochs, parsed_args.repeats, parsed_args.spellcheckers,
+                                 parsed_args.puzzle_families, parsed_args.seed)]
+    print_results(results)
+
+    if parsed_args.save_baseline:
+        with open(parsed_args.save_baseline, "w") as baseline_file:
+            json.dump({"fixtures_version": FIXTURES_VERSION, "seed": parsed_args.seed, "results": results},
+                      baseline_file, indent=2)
+        print("Saved baseline to", parsed_args.save_baseline)
+
+    if parsed_args.baseline:
+        with open(parsed_args.baseline) as baseline_file:
+            baseline_results = json.load(baseline_file)["results"]
+        regressions = compare_with_baseline(results, baseline_results, parsed_args.tolerance)
+        if regressions:
+            print("Regressions:", ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
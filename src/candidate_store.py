@@ -0,0 +1,294 @@
+import array
+import collections.abc
+
+# letters_mask of a potential_word which reuses a letter, or uses one outside the alphabet, at its zero indexes
+INVALID_LETTERS_MASK = -1
+
+
+class EncryptedWordRecord(collections.abc.Mapping):
+    """
+    Metadata of an encrypted_word in a CandidateStore. Its potential_words are the candidates
+    from start up to end, which have index as their owner. The record is also a read only view of the
+    encrypted_word's potential_words_dict, e.g. record['zeros_list'], so code written for a
+    potential_words_dict_collection keeps working.
+    """
+    __slots__ = ("candidate_store", "index", "encrypted_word", "zeros_list", "success", "start", "end")
+
+    def __init__(self, candidate_store, index, encrypted_word, zeros_list, success, start, end):
+        self.candidate_store = candidate_store
+        self.index = index
+        self.encrypted_word = encrypted_word
+        self.zeros_list = zeros_list
+        self.success = success
+        self.start = start
+        self.end = end
+
+    def __getitem__(self, key):
+        if key == "zeros_list":
+            return self.zeros_list
+        if key == "success":
+            return self.success
+        if key == "potential_words_list":
+            return [self.candidate_store.get_word(candidate_id) for candidate_id in range(self.start, self.end)]
+        if key == "potential_word_scores" and self.candidate_store.has_scores:
+            return {self.candidate_store.get_word(candidate_id): self.candidate_store.scores[candidate_id]
+                    for candidate_id in range(self.start, self.end)}
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield "potential_words_list"
+        yield "zeros_list"
+        yield "success"
+        if self.candidate_store.has_scores:
+            yield "potential_word_scores"
+
+    def __len__(self):
+        return 4 if self.candidate_store.has_scores else 3
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class CandidateStore():
+    """
+    Compact store of the potential_words of every encrypted_word of a puzzle. Each potential_word is
+    held once in a string table and candidates refer to it by an integer word id. Candidates are the rows
+    of array columns, grouped by encrypted_word, so a candidate id is an index into:
+
+    candidate_word_ids: candidate -> index of the potential_word in self.words
+    candidate_owners: candidate -> index of the encrypted_word's record in self.record_list
+    letters_masks: candidate -> bit per letter at the zero indexes, as the PotentialWordTracker's letter_bits,
+    or INVALID_LETTERS_MASK
+    scores: candidate -> potential_word_score, if the potential_words_dicts had them
+
+    candidate_ids_by_key indexes candidates by (owner, word id), so a potential_word's candidate
+    is found without scanning the encrypted_word's candidates.
+    get_potential_words_dict_collection provides the usual {encrypted_word: potential_words_dict} as a view.
+    """
+    def __init__(self, alphabet):
+        self.alphabet = list(alphabet)
+        self.letter_bits = {letter: 1 << i for i, letter in enumerate(self.alphabet)}
+        self.words = []
+        self.word_ids = {}
+        self.records = {}
+        self.record_list = []
+        self.candidate_word_ids = array.array("i")
+        self.candidate_owners = array.array("i")
+        self.letters_masks = array.array("q")
+        self.scores = array.array("d")
+        self.has_scores = False
+        self.candidate_ids_by_key = {}
+
+    @classmethod
+    def from_potential_words_dict_collection(cls, alphabet, potential_words_dict_collection):
+        candidate_store = cls(alphabet)
+        candidate_store.has_scores = any('potential_word_scores' in potential_words_dict
+                                         for potential_words_dict in potential_words_dict_collection.values())
+        for encrypted_word, potential_words_dict in potential_words_dict_collection.items():
+            candidate_store.add_potential_words_dict(encrypted_word, potential_words_dict)
+        return candidate_store
+
+    def add_potential_words_dict(self, encrypted_word, potential_words_dict):
+        """
+        Adds a candidate for each potential_word, once, in the order of the potential_words_list
+        """
+        zeros_list = list(potential_words_dict['zeros_list'])
+        potential_word_scores = potential_words_dict.get('potential_word_scores', {})
+        start = len(self.candidate_word_ids)
+        owner = len(self.record_list)
+        added_words = set()
+        for potential_word in potential_words_dict['potential_words_list']:
+            if potential_word in added_words:
+                continue
+            added_words.add(potential_word)
+            word_id = self.get_word_id(potential_word)
+            self.candidate_ids_by_key[(owner, word_id)] = len(self.candidate_word_ids)
+            self.candidate_word_ids.append(word_id)
+            self.candidate_owners.append(owner)
+            self.letters_masks.append(self.get_letters_mask(potential_word, zeros_list))
+            if self.has_scores:
+                self.scores.append(potential_word_scores.get(potential_word, 0))
+        record = EncryptedWordRecord(self, owner, encrypted_word, zeros_list, potential_words_dict['success'], start,
+                                     len(self.candidate_word_ids))
+        self.records[encrypted_word] = record
+        self.record_list.append(record)
+
+    def get_word_id(self, word):
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.words.append(word)
+            self.word_ids[word] = word_id
+        return word_id
+
+    def get_letters_mask(self, potential_word, zeros_list):
+        """
+        :return: e.g. 'wrist' for '0ri0t' -> 4456448, the bits of 'w' and 's'
+        """
+        letters_mask = 0
+        for i in zeros_list:
+            letter_bit = self.letter_bits.get(potential_word[i], 0)
+            if not letter_bit or letters_mask & letter_bit:
+                return INVALID_LETTERS_MASK
+            letters_mask |= letter_bit
+        return letters_mask
+
+    def get_word(self, candidate_id):
+        return self.words[self.candidate_word_ids[candidate_id]]
+
+    def get_encrypted_word(self, candidate_id):
+        return self.record_list[self.candidate_owners[candidate_id]].encrypted_word
+
+    def get_candidate_id(self, encrypted_word, potential_word):
+        """
+        :return: the id of the potential_word's candidate for the encrypted_word, or None
+        """
+        record = self.records.get(encrypted_word)
+        word_id = self.word_ids.get(potential_word)
+        if record is None or word_id is None:
+            return None
+        return self.candidate_ids_by_key.get((record.index, word_id))
+
+    def get_valid_candidate_ids(self, encrypted_word):
+        """
+        :return: ids of the encrypted_word's candidates which use each letter of the alphabet at most once
+        """
+        record = self.records[encrypted_word]
+        return array.array("i", [candidate_id for candidate_id in range(record.start, record.end)
+                                 if self.letters_masks[candidate_id] != INVALID_LETTERS_MASK])
+
+    def get_potential_words_dict_collection(self):
+        return PotentialWordsDictCollectionView(self)
+
+
+def get_candidate_store(alphabet, potential_words_dict_collection):
+    """
+    :return: the CandidateStore viewed by potential_words_dict_collection if it was built for the alphabet,
+    otherwise a new CandidateStore of the potential_words_dict_collection
+    """
+    if isinstance(potential_words_dict_collection, PotentialWordsDictCollectionView) and \
+            potential_words_dict_collection.candidate_store.alphabet == list(alphabet):
+        return potential_words_dict_collection.candidate_store
+    return CandidateStore.from_potential_words_dict_collection(alphabet, potential_words_dict_collection)
+
+
+class PotentialWordsDictCollectionView(collections.abc.Mapping):
+    """
+    Read only {encrypted_word: potential_words_dict} view of a CandidateStore, e.g.
+    {'0ri0t': {'potential_words_list': ['drift', 'grist', 'wrist', 'print'], 'zeros_list': [0, 3], 'success': True}}
+    """
+    def __init__(self, candidate_store):
+        self.candidate_store = candidate_store
+
+    def __getitem__(self, encrypted_word):
+        return self.candidate_store.records[encrypted_word]
+
+    def __iter__(self):
+        return iter(self.candidate_store.records)
+
+    def __len__(self):
+        return len(self.candidate_store.records)
+
+
+class CandidateMasksView(collections.abc.Mapping):
+    """
+    Read only {potential_word: letters_mask} view of some of an encrypted_word's candidates.
+    The candidate_ids are copied to a set on the first lookup, so later lookups are O(1)
+    """
+    def __init__(self, candidate_store, encrypted_word, candidate_ids):
+        self.candidate_store = candidate_store
+        self.encrypted_word = encrypted_word
+        self.candidate_ids = candidate_ids
+        self.candidate_ids_set = None
+
+    def __getitem__(self, potential_word):
+        candidate_id = self.candidate_store.get_candidate_id(self.encrypted_word, potential_word)
+        if self.candidate_ids_set is None:
+            self.candidate_ids_set = set(self.candidate_ids)
+        if candidate_id is None or candidate_id not in self.candidate_ids_set:
+            raise KeyError(potential_word)
+        return self.candidate_store.letters_masks[candidate_id]
+
+    def __iter__(self):
+        return (self.candidate_store.get_word(candidate_id) for candidate_id in self.candidate_ids)
+
+    def __len__(self):
+        return len(self.candidate_ids)
+
+    def items(self):
+        return CandidateMasksItemsView(self)
+
+
+class CandidateMasksItemsView(collections.abc.ItemsView):
+    def __iter__(self):
+        candidate_store = self._mapping.candidate_store
+        for candidate_id in self._mapping.candidate_ids:
+            yield candidate_store.get_word(candidate_id), candidate_store.letters_masks[candidate_id]
+
+
+class PotentialWordMasksView(collections.abc.Mapping):
+    """
+    Read only {encrypted_word: {potential_word: letters_mask}} view of the candidate_ids_by_encrypted_word
+    of a PotentialWordTracker. The CandidateMasksView of each encrypted_word is kept until its candidate_ids
+    are replaced, e.g. by constraint propagation, so its set of candidate_ids is only built once
+    """
+    def __init__(self, candidate_store, candidate_ids_by_encrypted_word):
+        self.candidate_store = candidate_store
+        self.candidate_ids_by_encrypted_word = candidate_ids_by_encrypted_word
+        self.candidate_masks_views = {}
+
+    def __getitem__(self, encrypted_word):
+        candidate_ids = self.candidate_ids_by_encrypted_word[encrypted_word]
+        candidate_masks_view = self.candidate_masks_views.get(encrypted_word)
+        if candidate_masks_view is None or candidate_masks_view.candidate_ids is not candidate_ids:
+            candidate_masks_view = CandidateMasksView(self.candidate_store, encrypted_word, candidate_ids)
+            self.candidate_masks_views[encrypted_word] = candidate_masks_view
+        return candidate_masks_view
+
+    def __iter__(self):
+        return iter(self.candidate_ids_by_encrypted_word)
+
+    def __len__(self):
+        return len(self.candidate_ids_by_encrypted_word)
+
+
+class AlphaDictView(collections.abc.Mapping):
+    """
+    Read only {letter: {(encrypted_word, potential_word): letters_mask}} view of the
+    candidate_ids_by_letter of a PotentialWordTracker
+    """
+    def __init__(self, candidate_store, candidate_ids_by_letter):
+        self.candidate_store = candidate_store
+        self.candidate_ids_by_letter = candidate_ids_by_letter
+
+    def __getitem__(self, letter):
+        return AlphaDictLetterView(self.candidate_store, self.candidate_ids_by_letter[letter])
+
+    def __iter__(self):
+        return iter(self.candidate_ids_by_letter)
+
+    def __len__(self):
+        return len(self.candidate_ids_by_letter)
+
+
+class AlphaDictLetterView(collections.abc.Mapping):
+    def __init__(self, candidate_store, candidate_ids):
+        self.candidate_store = candidate_store
+        self.candidate_ids = candidate_ids
+        self.candidate_ids_set = None
+
+    def __getitem__(self, alpha_dict_key):
+        encrypted_word, potential_word = alpha_dict_key
+        candidate_id = self.candidate_store.get_candidate_id(encrypted_word, potential_word)
+        if self.candidate_ids_set is None:
+            self.candidate_ids_set = set(self.candidate_ids)
+        if candidate_id is None or candidate_id not in self.candidate_ids_set:
+            raise KeyError(alpha_dict_key)
+        return self.candidate_store.letters_masks[candidate_id]
+
+    def __iter__(self):
+        return ((self.candidate_store.get_encrypted_word(candidate_id), self.candidate_store.get_word(candidate_id))
+                for candidate_id in self.candidate_ids)
+
+    def __len__(self):
+        return len(self.candidate_ids)
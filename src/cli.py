@@ -0,0 +1,201 @@
+"""
+Command line entry point for alphabet soup. Run from the src directory, e.g.
+
+    python cli.py solve
+    python cli.py solve ../puzzles.jsonl --workers 4 --results ../reports/batch_results.jsonl
+    python cli.py sweep --parallel --seed 0
+    python cli.py sweep --parallel --checkpoint ../reports/sweep_checkpoint.jsonl --resume
+    python cli.py sweep --adaptive --configs 27 --eta 3
+    python cli.py fix-report ../reports/alphabet_soup_report.csv ../reports/alphabet_soup_report_fixed.csv
+    python cli.py bench --baseline baseline.json
+
+Modules are imported inside the subcommand which needs them, so e.g. solve with the lexicon,
+trie or pyspellchecker word finder does not pay for importing pandas, numpy or TextBlob.
+"""
+import argparse
+import json
+import sys
+
+WORD_FINDERS = ("lexicon", "trie", "pyspellchecker", "textblob")
+WORD_DECODERS = ("backtracking", "beam", "annealing", "epochs")
+
+
+def get_word_finder(experimenter_cls, word_finder_name):
+    return {"lexicon": experimenter_cls.lexicon_word_finder,
+            "trie": experimenter_cls.trie_word_finder,
+            "pyspellchecker": experimenter_cls.pyspellchecker_word_finder,
+            "textblob": experimenter_cls.text_blob_word_finder}[word_finder_name]
+
+
+def get_word_decoder(experimenter_cls, word_decoder_name):
+    return {"backtracking": experimenter_cls.backtracking_word_decoder,
+            "beam": experimenter_cls.beam_word_decoder,
+            "annealing": experimenter_cls.annealing_word_decoder,
+            "epochs": experimenter_cls.word_decoder}[word_decoder_name]
+
+
+def execute_solve(args):
+    import batch_solver
+    import report_writer
+    batch_solver_cls = batch_solver.BatchSolver()
+    experimenter_cls = batch_solver_cls.experimenter_cls
+    experimenter_cls.lexicon_word_list_path = args.word_list
+    experimenter_cls.pyspellchecker_no_of_random_letters = args.no_of_random_letters
+    experimenter_cls.use_word_finder_cache = not args.no_cache
+    experimenter_cls.use_word_frequencies = not args.no_word_frequencies
+    experimenter_cls.word_frequency_path = args.word_frequencies
+    batch_solver_cls.word_finder = get_word_finder(experimenter_cls, args.word_finder)
+    batch_solver_cls.word_decoder = get_word_decoder(experimenter_cls, args.word_decoder)
+    batch_solver_cls.word_decoder_max_epochs = args.max_epochs
+    if args.word_decoder == "epochs":
+        batch_solver_cls.word_decoder_kwargs = {"stop_on_full_solution": True}
+    elif args.word_decoder == "beam":
+        batch_solver_cls.word_decoder_kwargs = {"beam_width": args.beam_width, "stop_on_full_solution": True}
+    elif args.word_decoder == "annealing":
+        batch_solver_cls.word_decoder_kwargs = {"max_iterations": args.max_iterations, "max_seconds": args.max_seconds,
+                                                "stop_on_full_solution": True}
+    batch_solver_cls.verbose = args.verbose
+
+    if args.puzzles:
+        puzzle_dicts = batch_solver.read_puzzle_dicts(args.puzzles)
+        max_workers = args.workers
+    else:
+        puzzle_dicts = [{"name": "original", "alphabet": experimenter_cls.alphabet,
+                         "encrypted_words": experimenter_cls.encrypted_words,
+                         "answers_dict": experimenter_cls.answers_dict}]
+        max_workers = 0
+    writer = report_writer.ReportWriter(args.results) if args.results else None
+    for result_dict in batch_solver_cls.generate_result_dicts(puzzle_dicts, max_workers):
+        if writer is not None:
+            writer.append_row(result_dict)
+        print(json.dumps(result_dict))
+    return 0
+
+
+def execute_sweep(args):
+    import random
+    import experimenter
+    experimenter_cls = experimenter.Experimenter()
+    experimenter_cls.report_path = args.report_path
+    experimenter_cls.lexicon_word_list_path = args.word_list
+    experimenter_cls.instrumentation_enabled = args.instrumentation
+    experimenter_cls.use_word_finder_cache = not args.no_cache
+    experimenter_cls.sweep_checkpoint_path = args.checkpoint
+    experimenter_cls.resume_sweep = args.resume
+    experimenter_cls.sweep_seed = args.seed
+    puzzle_dicts = None
+    if args.puzzle_families:
+        import puzzle_generator
+        puzzle_dicts = puzzle_generator.PuzzleGenerator(args.word_list, seed=args.seed).get_puzzle_dicts_for_families()
+    if args.adaptive:
+        for puzzle_dict in puzzle_dicts or [None]:
+            if puzzle_dict is not None:
+                experimenter_cls.set_puzzle(puzzle_dict)
+            experimenter_cls.execute_adaptive_experimenter(no_of_configs=args.configs, eta=args.eta, seed=args.seed)
+        return 0
+    if args.parallel:
+        experimenter_cls.execute_parallel_experimenter(max_workers=args.workers, seed=args.seed,
+                                                       puzzle_dicts=puzzle_dicts)
+        return 0
+    if args.seed is not None:
+        random.seed(args.seed)
+    # One checkpoint for every puzzle, so that resuming continues the whole sweep
+    experimenter_cls.sweep_checkpoint = experimenter_cls.get_sweep_checkpoint()
+    # One word_finder_seed for every puzzle and configuration, so decoder-only configurations use the cache
+    experimenter_cls.word_finder_seed = experimenter_cls.get_word_finder_seed()
+    for puzzle_dict in puzzle_dicts or [None]:
+        if puzzle_dict is not None:
+            experimenter_cls.set_puzzle(puzzle_dict)
+        experimenter_cls.execute_experimenter()
+    return 0
+
+
+def execute_fix_report(args):
+    import csv_report_fixer
+    csv_report_fixer.CSVReportFixer(args.csv_report, args.fixed_csv_report).execute()
+    return 0
+
+
+def execute_bench(args):
+    from benchmarks import run_benchmarks
+    return run_benchmarks.main(args.bench_args, prog="alphabet_soup bench")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="alphabet_soup", description="Decrypts alphabet soup puzzles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    solve_parser = subparsers.add_parser("solve", help="Solves the original puzzle, or a JSON Lines file of puzzles")
+    solve_parser.add_argument("puzzles", nargs="?", help="JSON Lines file with one puzzle per line")
+    solve_parser.add_argument("--word-finder", choices=WORD_FINDERS, default="lexicon")
+    solve_parser.add_argument("--word-decoder", choices=WORD_DECODERS, default="backtracking")
+    solve_parser.add_argument("--max-epochs", type=int, default=75,
+                              help="Epochs for the epochs word decoder, or restarts for the annealing word decoder")
+    solve_parser.add_argument("--beam-width", type=int, default=16, help="Beams kept by the beam word decoder")
+    solve_parser.add_argument("--max-iterations", type=int, default=5000,
+                              help="Moves per restart of the annealing word decoder")
+    solve_parser.add_argument("--max-seconds", type=float, default=None,
+                              help="Time budget per puzzle for the annealing word decoder")
+    solve_parser.add_argument("--word-list", help="Word list for the lexicon and trie word finders")
+    solve_parser.add_argument("--word-frequencies",
+                              help="File of 'word count' lines used to rank potential words, "
+                                   "defaults to the pyspellchecker dictionary")
+    solve_parser.add_argument("--no-word-frequencies", action="store_true",
+                              help="Does not rank potential words by word frequency")
+    solve_parser.add_argument("--no-of-random-letters", type=int, default=10,
+                              help="no_of_random_letters for the pyspellchecker word finder")
+    solve_parser.add_argument("--workers", type=int, default=None,
+                              help="Worker processes for a puzzles file, 0 to solve in this process")
+    solve_parser.add_argument("--results", help="Also appends results to a .jsonl, .csv or .parquet file")
+    solve_parser.add_argument("--no-cache", action="store_true", help="Does not use the word finder cache")
+    solve_parser.add_argument("--verbose", action="store_true", help="Shows word finder and decoder output")
+    solve_parser.set_defaults(execute=execute_solve)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Runs the Experimenter parameter sweep")
+    sweep_parser.add_argument("--parallel", action="store_true", help="Runs configurations across a process pool")
+    sweep_parser.add_argument("--workers", type=int, default=None)
+    sweep_parser.add_argument("--adaptive", action="store_true",
+                              help="Searches params in combination by successive halving, rather than one at a time")
+    sweep_parser.add_argument("--configs", type=int, default=27, help="Configurations sampled by the adaptive search")
+    sweep_parser.add_argument("--eta", type=int, default=3,
+                              help="The adaptive search keeps the best 1/eta of configurations at each rung")
+    sweep_parser.add_argument("--seed", type=int, default=None)
+    sweep_parser.add_argument("--report-path", default="../reports/alphabet_soup_report.jsonl")
+    sweep_parser.add_argument("--word-list", help="Word list for the lexicon word finder and puzzle generator")
+    sweep_parser.add_argument("--puzzle-families", action="store_true",
+                              help="Runs the sweep for generated puzzle families of increasing difficulty")
+    sweep_parser.add_argument("--instrumentation", action="store_true",
+                              help="Writes per stage timers and counters to the report and profile")
+    sweep_parser.add_argument("--no-cache", action="store_true", help="Does not use the word finder cache")
+    sweep_parser.add_argument("--checkpoint", default=None,
+                              help="Records the progress of the sweep to this manifest, so it can be resumed")
+    sweep_parser.add_argument("--resume", action="store_true",
+                              help="Skips configurations completed by the last sweep in the --checkpoint manifest")
+    sweep_parser.set_defaults(execute=execute_sweep)
+
+    fix_report_parser = subparsers.add_parser("fix-report", help="Fixes a CSV report written before the ReportWriter")
+    fix_report_parser.add_argument("csv_report", nargs="?", default="../reports/alphabet_soup_report.csv")
+    fix_report_parser.add_argument("fixed_csv_report", nargs="?", default="../reports/alphabet_soup_report_fixed.csv")
+    fix_report_parser.set_defaults(execute=execute_fix_report)
+
+    # Options, including -h, are parsed by run_benchmarks, which is only imported when benchmarking
+    bench_parser = subparsers.add_parser("bench", add_help=False,
+                                         help="Runs the benchmarks, other arguments are passed to run_benchmarks")
+    bench_parser.set_defaults(execute=execute_bench)
+    return parser
+
+
+def main(args=None):
+    parser = get_parser()
+    parsed_args, other_args = parser.parse_known_args(args)
+    if parsed_args.command == "bench":
+        parsed_args.bench_args = other_args
+    elif other_args:
+        parser.error("unrecognized arguments: {}".format(" ".join(other_args)))
+    if parsed_args.command == "sweep" and parsed_args.resume and parsed_args.checkpoint is None:
+        parser.error("--resume needs the --checkpoint manifest of the sweep to resume")
+    return parsed_args.execute(parsed_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
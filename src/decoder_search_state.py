@@ -0,0 +1,129 @@
+import heapq
+import random
+import instrumentation
+
+POP_LETTER = "pop_letter"
+POP_OWNER = "pop_owner"
+ADD_UNASSIGNED_LETTER = "add_unassigned_letter"
+
+
+class DecoderSearchState():
+    """
+    Mutable search state shared by every starting letter and epoch of the EncryptedWordDecoder.
+    Rather than copying the candidates for each step, letters and the candidates of encrypted_words,
+    i.e. of their owner index, are removed in place and recorded in self.undo_log. Calling rollback
+    restores the state to a checkpoint, so the cost of each starting letter is proportional to the
+    changes made, not to the no. of candidates.
+    """
+    def __init__(self, candidate_ids_by_letter, candidate_owners, letter_counts_by_owner, unassigned_letters,
+                 letter_bits):
+        """
+        :param candidate_ids_by_letter: e.g. {'a': array('i', [9, 31, ...]), ...}, as the PotentialWordTracker's
+        :param candidate_owners: owner of each candidate id, i.e. the CandidateStore's candidate_owners
+        :param letter_counts_by_owner: e.g. {0: {'b': 1, 'd': 1, 'p': 2, ...}, ...} as the PotentialWordTracker's
+        :param unassigned_letters: Letters which are unassigned before any starting letter is decoded
+        :param letter_bits: e.g. {'a': 1, 'b': 2, 'c': 4, ...}
+        """
+        self.candidate_ids_by_letter = candidate_ids_by_letter
+        self.candidate_owners = candidate_owners
+        self.letter_counts_by_owner = letter_counts_by_owner
+        self.unassigned_letters = list(unassigned_letters)
+        self.letter_bits = letter_bits
+        self.letter_counts = {letter: len(candidate_ids) for letter, candidate_ids in candidate_ids_by_letter.items()}
+        self.owners_popped = bytearray(max(letter_counts_by_owner, default=-1) + 1)
+        self.available_letters_mask = 0
+        for letter in self.letter_counts:
+            self.available_letters_mask |= self.letter_bits[letter]
+        self.undo_log = []
+        self.letters_heap = []
+        self.tie_breaks = {}
+        self.changed_letters = set()
+        self.update_letters_heap()
+
+    def update_letters_heap(self):
+        """
+        Rebuilds the letters_heap from the current counts, with new random tie breaks
+        """
+        self.tie_breaks = {letter: random.random() for letter in self.letter_bits}
+        self.letters_heap = [(count, self.tie_breaks[letter], letter) for letter, count in self.letter_counts.items()]
+        heapq.heapify(self.letters_heap)
+        self.changed_letters.clear()
+
+    def get_most_constrained_letter(self):
+        """
+        :return: the letter with the fewest candidates left, ties broken randomly
+        """
+        for letter in self.changed_letters:
+            count = self.letter_counts.get(letter)
+            if count is not None:
+                heapq.heappush(self.letters_heap, (count, self.tie_breaks[letter], letter))
+        self.changed_letters.clear()
+        while self.letters_heap:
+            count, tie_break, letter = self.letters_heap[0]
+            if self.letter_counts.get(letter) == count:
+                return letter
+            heapq.heappop(self.letters_heap)
+        raise ValueError("No letters left in the search state")
+
+    def get_candidate_ids_for_letter(self, letter):
+        """
+        :return: ids of the candidates left using the letter at a zero index
+        """
+        owners_popped = self.owners_popped
+        candidate_owners = self.candidate_owners
+        return [candidate_id for candidate_id in self.candidate_ids_by_letter[letter]
+                if not owners_popped[candidate_owners[candidate_id]]]
+
+    def pop_letter(self, letter):
+        count = self.letter_counts.pop(letter)
+        self.available_letters_mask &= ~self.letter_bits[letter]
+        self.undo_log.append((POP_LETTER, letter, count))
+
+    def pop_owner(self, owner):
+        """
+        Removes every candidate of the owner's encrypted_word. Its candidates are taken off the counts
+        of the letters left all at once, using letter_counts_by_owner
+        """
+        self.owners_popped[owner] = 1
+        self.update_letter_counts_for_owner(owner, -1)
+        self.undo_log.append((POP_OWNER, owner))
+
+    def check_owner_popped(self, owner):
+        return owner >= len(self.owners_popped) or self.owners_popped[owner] == 1
+
+    def update_letter_counts_for_owner(self, owner, sign):
+        for letter, count in self.letter_counts_by_owner[owner].items():
+            letter_count = self.letter_counts.get(letter)
+            if letter_count is not None:
+                self.letter_counts[letter] = letter_count + sign * count
+                self.changed_letters.add(letter)
+
+    def add_unassigned_letter(self, letter):
+        self.unassigned_letters.append(letter)
+        self.undo_log.append((ADD_UNASSIGNED_LETTER,))
+
+    def get_checkpoint(self):
+        return len(self.undo_log)
+
+    def rollback(self, checkpoint=0):
+        """
+        Undoes changes in reverse order until the undo_log is back to the checkpoint.
+        Rolling back to the start rebuilds the letters_heap, so each starting letter and epoch
+        breaks ties between letters differently.
+        """
+        instrumentation.increment("undo_log_changes", len(self.undo_log) - checkpoint)
+        while len(self.undo_log) > checkpoint:
+            change = self.undo_log.pop()
+            if change[0] == POP_LETTER:
+                letter, count = change[1], change[2]
+                self.letter_counts[letter] = count
+                self.available_letters_mask |= self.letter_bits[letter]
+                self.changed_letters.add(letter)
+            elif change[0] == POP_OWNER:
+                owner = change[1]
+                self.owners_popped[owner] = 0
+                self.update_letter_counts_for_owner(owner, 1)
+            else:
+                self.unassigned_letters.pop()
+        if checkpoint == 0:
+            self.update_letters_heap()
@@ -0,0 +1,50 @@
+"""
+Loads the pyspellchecker and TextBlob dictionaries once per process.
+Word finders share these read-only, rather than each instance decompressing
+the frequency dictionary again. When preload_dictionaries is called before
+worker processes are forked, the workers share the loaded pages copy-on-write.
+"""
+import gc
+
+_spell_checker = None
+_text_blob_suggest = None
+
+
+def get_spell_checker():
+    global _spell_checker
+    if _spell_checker is None:
+        from spellchecker import SpellChecker
+        _spell_checker = SpellChecker()
+    return _spell_checker
+
+
+def get_text_blob_suggest():
+    """
+    :return: The function used by textblob.Word.spellcheck, e.g. suggest('rrixt') -> [('wrist', 0.39), ...]
+    Calling it directly avoids building a Word object per test_word.
+    The spelling model is loaded lazily by TextBlob, so a first call is made to load it here.
+    """
+    global _text_blob_suggest
+    if _text_blob_suggest is None:
+        from textblob.en import suggest
+        suggest("a")
+        _text_blob_suggest = suggest
+    return _text_blob_suggest
+
+
+def preload_dictionaries():
+    """
+    Loads every dictionary in this process. gc.freeze moves the loaded objects out of
+    the garbage collector's reach, so forked workers do not copy their pages when collecting.
+    Call unfreeze_dictionaries once the workers are forked, so this process collects them again.
+    """
+    get_spell_checker()
+    get_text_blob_suggest()
+    gc.freeze()
+
+
+def unfreeze_dictionaries():
+    """
+    Undoes the gc.freeze of preload_dictionaries in this process. Workers already forked keep theirs frozen
+    """
+    gc.unfreeze()
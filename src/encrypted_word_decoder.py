@@ -1,15 +1,49 @@
 
 
 import potential_word_tracker
-import copy
+import decoder_search_state
+import instrumentation
 import random
 
 class EncryptedWordDecoder(potential_word_tracker.PotentialWordTracker):
-    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection, max_epochs):
-        potential_word_tracker.PotentialWordTracker.__init__(self, alphabet, encrypted_words, potential_words_dict_collection)
+    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection, max_epochs,
+                 stop_on_full_solution=False, target_accuracy=None, answers_dict=None,
+                 max_epochs_without_improvement=None, propagate_constraints=True):
+        """
+        Decrypted words dictionaries are produced until max_epochs or until a stop condition is met:
+        :param stop_on_full_solution: Stop at the first dictionary where every encrypted_word is decrypted
+        to one of its potential_words and each letter of the alphabet is used exactly once
+        :param target_accuracy: Stop once a dictionary decrypts at least this proportion of words
+        correctly according to answers_dict e.g. 0.9. A ValueError is raised if there is no answers_dict
+        :param max_epochs_without_improvement: Stop if the best score has not improved for this many epochs.
+        The score is accuracy if answers_dict is given, otherwise the no. of words decrypted to potential_words
+        :param propagate_constraints: Removes potential_words which conflict with forced words before decoding
+        """
+        if target_accuracy is not None and not answers_dict:
+            raise ValueError("target_accuracy needs an answers_dict to measure accuracy against")
+        potential_word_tracker.PotentialWordTracker.__init__(self, alphabet, encrypted_words, potential_words_dict_collection,
+                                                             propagate_constraints)
         self.execute_potential_word_tracker()
         self.max_epochs = max_epochs
+        self.stop_on_full_solution = stop_on_full_solution
+        self.target_accuracy = target_accuracy
+        self.answers_dict = answers_dict
+        self.max_epochs_without_improvement = max_epochs_without_improvement
+        self.best_score = None
+        self.epochs_without_improvement = 0
+        self.vowels_mask = self.get_mask_for_letters(['a', 'e', 'i', 'o', 'u'])
+        self.alphabet_mask = self.get_mask_for_letters(self.alphabet)
+        self.search_state = decoder_search_state.DecoderSearchState(self.candidate_ids_by_letter,
+                                                                    self.candidate_store.candidate_owners,
+                                                                    self.letter_counts_by_owner,
+                                                                    self.unassigned_letters,
+                                                                    self.letter_bits)
 
+    def get_mask_for_letters(self, letters):
+        letters_mask = 0
+        for letter in letters:
+            letters_mask |= self.letter_bits.get(letter, 0)
+        return letters_mask
 
     def execute_encrypted_word_decoder(self):
         decrypted_words_dict_collection = self.get_decrypted_words_dict_collection_for_epochs()
@@ -23,12 +57,79 @@ class EncryptedWordDecoder(potential_word_tracker.PotentialWordTracker):
         '0ebr0': 'sebro','0o0ey': 'dovey','0ra0e0': 'brazen','0ri0t': 'hriet','0ro0ec0': 'project',
         's00r0': 'swarm'}
         """
-        decrypted_words_dict_collection = []
+        return list(self.generate_decrypted_words_dicts())
+
+    def generate_decrypted_words_dicts(self):
+        """
+        Yields each decrypted_words_dict as soon as it is produced, so the caller does not need to
+        hold the whole decrypted_words_dict_collection. Stops early when a stop condition is met.
+        """
+        self.best_score = None
+        self.epochs_without_improvement = 0
         for x in range(1, self.max_epochs +1):
             print("Epoch", x)
-            new_words = self.get_decrypted_words_dict_collection_for_epoch()
-            decrypted_words_dict_collection.extend(new_words)
-        return decrypted_words_dict_collection
+            instrumentation.increment("decoder_epochs")
+            for starting_letter in self.starting_letters:
+                decrypted_words_dict = self.get_decrypted_words_dict_for_starting_letter(starting_letter)
+                yield decrypted_words_dict
+                if self.check_stop_for_decrypted_words_dict(decrypted_words_dict):
+                    return
+            if self.check_stop_for_epoch():
+                return
+
+    def check_stop_for_decrypted_words_dict(self, decrypted_words_dict):
+        score = self.get_score(decrypted_words_dict)
+        if self.best_score is None or score > self.best_score:
+            self.best_score = score
+            self.epochs_without_improvement = -1
+        if self.stop_on_full_solution and self.check_full_solution(decrypted_words_dict):
+            print("Stopping: full solution found")
+            return True
+        if self.target_accuracy is not None:
+            if self.get_accuracy(decrypted_words_dict) >= self.target_accuracy:
+                print("Stopping: target accuracy reached")
+                return True
+        return False
+
+    def check_stop_for_epoch(self):
+        """
+        epochs_without_improvement is reset to -1 when the best score improves during an epoch,
+        so it is 0 at the end of an improving epoch
+        """
+        self.epochs_without_improvement += 1
+        if self.max_epochs_without_improvement is not None and \
+                self.epochs_without_improvement >= self.max_epochs_without_improvement:
+            print("Stopping: no improvement in {} epochs".format(self.epochs_without_improvement))
+            return True
+        return False
+
+    def get_score(self, decrypted_words_dict):
+        if self.answers_dict is not None:
+            return self.get_accuracy(decrypted_words_dict)
+        potential_word_masks = self.potential_word_masks
+        return sum(1 for encrypted_word, decrypted_word in decrypted_words_dict.items()
+                   if decrypted_word in potential_word_masks.get(encrypted_word, {}))
+
+    def get_accuracy(self, decrypted_words_dict):
+        correct_words = sum(1 for encrypted_word, correct_word in self.answers_dict.items()
+                            if decrypted_words_dict.get(encrypted_word) == correct_word)
+        return correct_words / len(self.answers_dict)
+
+    def check_full_solution(self, decrypted_words_dict):
+        """
+        True if every encrypted_word is decrypted to one of its potential_words
+        and the letters at zero indexes use each letter of the alphabet exactly once
+        """
+        potential_word_masks = self.potential_word_masks
+        used_letters_mask = 0
+        zeros_count = 0
+        for encrypted_word in self.encrypted_words:
+            letters_mask = potential_word_masks.get(encrypted_word, {}).get(decrypted_words_dict.get(encrypted_word))
+            if letters_mask is None or used_letters_mask & letters_mask:
+                return False
+            used_letters_mask |= letters_mask
+            zeros_count += len(self.potential_words_dict_collection[encrypted_word]['zeros_list'])
+        return used_letters_mask == self.alphabet_mask and zeros_count == len(self.alphabet)
 
     def get_decrypted_words_dict_collection_for_epoch(self):
         """
@@ -36,133 +137,105 @@ class EncryptedWordDecoder(potential_word_tracker.PotentialWordTracker):
         the single corresponding key value pair is the first to be assigned
         to the decrypted word dictionary. e.g. 'g' might only have { 'galaxy': '0ala00'}
         """
-        decrypted_words_dict_collection = []
-        for starting_letter in self.starting_letters:
-            decrypted_words_result_dict = self.get_decrypted_words_result_dict_for_starting_letter(starting_letter)
-            decrypted_words_dict = decrypted_words_result_dict['decrypted_words_dict']
-            unassigned_letters = decrypted_words_result_dict['unassigned_letters']
-            unassigned_words = self.get_unassigned_words(decrypted_words_dict)
-            decrypted_words_dict_for_unassigned_words = self.get_decrypted_words_dict_for_unassigned_words(
-                unassigned_letters, unassigned_words)
-            decrypted_words_dict.update(decrypted_words_dict_for_unassigned_words)
-            decrypted_words_dict_collection.append(decrypted_words_dict)
-        return decrypted_words_dict_collection
+        return [self.get_decrypted_words_dict_for_starting_letter(starting_letter)
+                for starting_letter in self.starting_letters]
+
+    def get_decrypted_words_dict_for_starting_letter(self, starting_letter):
+        decrypted_words_result_dict = self.get_decrypted_words_result_dict_for_starting_letter(starting_letter)
+        decrypted_words_dict = decrypted_words_result_dict['decrypted_words_dict']
+        unassigned_letters = decrypted_words_result_dict['unassigned_letters']
+        unassigned_words = self.get_unassigned_words(decrypted_words_dict)
+        decrypted_words_dict_for_unassigned_words = self.get_decrypted_words_dict_for_unassigned_words(
+            unassigned_letters, unassigned_words)
+        decrypted_words_dict.update(decrypted_words_dict_for_unassigned_words)
+        return decrypted_words_dict
 
     def get_decrypted_words_result_dict_for_starting_letter(self, starting_letter):
-        potential_words_by_alpha_dict_copy = copy.deepcopy(self.potential_words_by_alpha_dict)
-        unassigned_letters_copy = self.unassigned_letters.copy()
+        """
+        Changes made to self.search_state while decoding are rolled back before returning,
+        so the next starting letter or epoch begins from the tracker's candidates
+        """
         decrypted_words_dict = {}
         self.use_starting_letter_bool = True
-        while len(potential_words_by_alpha_dict_copy) > 0:
-            result_dict = self.get_result_dict_for_letter(starting_letter,
-                                                          potential_words_by_alpha_dict_copy,
-                                                          unassigned_letters_copy,
-                                                          decrypted_words_dict)
-            potential_words_by_alpha_dict_copy = result_dict['potential_words_by_alpha_dict']
-            unassigned_letters_copy = result_dict["unassigned_letters"]
-            decrypted_words_dict = result_dict["decrypted_words_dict"]
+        while len(self.search_state.letter_counts) > 0:
+            decrypted_words_dict = self.get_result_dict_for_letter(starting_letter,
+                                                                   decrypted_words_dict)["decrypted_words_dict"]
+        unassigned_letters = list(self.search_state.unassigned_letters)
+        self.search_state.rollback()
         return {"decrypted_words_dict": decrypted_words_dict,
-                "unassigned_letters": unassigned_letters_copy}
-
-    def get_result_dict_for_letter(self,
-                                   starting_letter,
-                                   potential_words_by_alpha_dict,
-                                   unassigned_letters,
-                                   decrypted_words_dict):
-        letter = self.get_letter_for_iteration(starting_letter, potential_words_by_alpha_dict)
-        decrypted_word_result_dict_for_letter = self.get_decrypted_word_result_dict_for_letter(letter,
-                                                                                        potential_words_by_alpha_dict)
+                "unassigned_letters": unassigned_letters}
+
+    def get_result_dict_for_letter(self, starting_letter, decrypted_words_dict):
+        letter = self.get_letter_for_iteration(starting_letter)
+        decrypted_word_result_dict_for_letter = self.get_decrypted_word_result_dict_for_letter(letter)
         if decrypted_word_result_dict_for_letter["success"]:
             decrypted_word_dict_for_letter = decrypted_word_result_dict_for_letter['decrypted_word_dict_for_letter']
-            result_dict = self.get_result_dict_for_potential_words_by_alpha_dict_and_unassigned_letters(
-                unassigned_letters,
-                decrypted_word_dict_for_letter,
-                potential_words_by_alpha_dict)
-            unassigned_letters = result_dict['unassigned_letters']
-            potential_words_by_alpha_dict = result_dict['potential_words_by_alpha_dict']
+            self.update_search_state_for_decrypted_word(decrypted_word_dict_for_letter)
             decrypted_words_dict.update(decrypted_word_dict_for_letter)
         else:
-            potential_words_by_alpha_dict.pop(letter)
-            unassigned_letters.append(letter)
-        return {"decrypted_words_dict": decrypted_words_dict,
-                'potential_words_by_alpha_dict': potential_words_by_alpha_dict,
-                "unassigned_letters": unassigned_letters}
+            self.search_state.pop_letter(letter)
+            self.search_state.add_unassigned_letter(letter)
+        return {"decrypted_words_dict": decrypted_words_dict}
 
-    def get_letter_for_iteration(self, starting_letter, potential_words_by_alpha_dict):
+    def get_letter_for_iteration(self, starting_letter):
         if self.use_starting_letter_bool == True:
             self.use_starting_letter_bool = False
             return starting_letter
         else:
-            return self.get_next_letter(potential_words_by_alpha_dict)
+            return self.get_next_letter()
 
-    def get_next_letter(self, potential_words_by_alpha_dict):
+    def get_next_letter(self):
         """
-        Randomising the keys in choosing the next letter is important in reducing bias.
-        If there are more then 3 potential words per a letter, a random letter is chosen
-        to save iterating over the letters again
+        The most constrained letter, i.e. the letter with the fewest candidates left, is decoded next.
+        The search_state keeps its letters in a heap as potential_words are removed, so this is O(log n).
+        Ties are broken randomly, which is important in reducing bias.
         """
-        counter = 1
-        letter_keys = list(potential_words_by_alpha_dict.keys())
-        random.shuffle(letter_keys)
-        while counter < 4:
-            for a_letter in letter_keys:
-                if len(potential_words_by_alpha_dict[a_letter]) == counter:
-                    return a_letter
-            counter += 1
-        return random.choice(letter_keys)
-
+        return self.search_state.get_most_constrained_letter()
 
-    def get_decrypted_word_result_dict_for_letter(self, letter, potential_words_by_alpha_dict):
-
-        decrypted_word_keys = list(potential_words_by_alpha_dict[letter].keys())
-        random.shuffle(decrypted_word_keys)
-        for decrypted_word in decrypted_word_keys:
-            get_another_letter = False
-            potential_words_by_alpha_dict[letter][decrypted_word] = potential_words_by_alpha_dict[letter].get(decrypted_word)
-            encrypted_word = potential_words_by_alpha_dict[letter][decrypted_word]
-            for i in self.potential_words_dict_collection[encrypted_word]['zeros_list']:
-                if decrypted_word[i] not in potential_words_by_alpha_dict.keys():
-                    get_another_letter = True
-                    break
-            if get_another_letter == False:
+    def get_decrypted_word_result_dict_for_letter(self, letter):
+        """
+        A decrypted_word can be chosen if every letter at its zero indexes is still available,
+        i.e. its letters_mask has no bits outside the search_state's available_letters_mask
+        """
+        available_letters_mask = self.search_state.available_letters_mask
+        letters_masks = self.candidate_store.letters_masks
+        candidate_ids = self.search_state.get_candidate_ids_for_letter(letter)
+        random.shuffle(candidate_ids)
+        for candidate_id in candidate_ids:
+            if not letters_masks[candidate_id] & ~available_letters_mask:
+                encrypted_word = self.candidate_store.get_encrypted_word(candidate_id)
+                decrypted_word = self.candidate_store.get_word(candidate_id)
                 return {"decrypted_word_dict_for_letter": {encrypted_word: decrypted_word}, "success": True}
         return {"success": False}
 
-    def get_result_dict_for_potential_words_by_alpha_dict_and_unassigned_letters(self,
-                                             unassigned_letters,
-                                             decrypted_word_dict_for_letter,
-                                             potential_words_by_alpha_dict):
-
-        potential_words_by_alpha_dict = self.pop_letters_found_from_alpha_dict(
-                                             decrypted_word_dict_for_letter,
-                                             potential_words_by_alpha_dict)
+    def update_search_state_for_decrypted_word(self, decrypted_word_dict_for_letter):
+        self.pop_letters_found_from_alpha_dict(decrypted_word_dict_for_letter)
+        self.pop_encrypted_word_from_alpha_dict(decrypted_word_dict_for_letter)
+        self.pop_unassigned_letters_from_alpha_dict()
 
-        potential_words_by_alpha_dict = self.pop_encrypted_word_from_alpha_dict(decrypted_word_dict_for_letter,
-                                                                                potential_words_by_alpha_dict)
-        return self.get_unassigned_letters_dict(potential_words_by_alpha_dict, unassigned_letters)
-
-    def pop_letters_found_from_alpha_dict(self, decrypted_word_dict_for_letter, potential_words_by_alpha_dict):
+    def pop_letters_found_from_alpha_dict(self, decrypted_word_dict_for_letter):
         for encrypted_word, potential_word in decrypted_word_dict_for_letter.items():
             for i in self.potential_words_dict_collection[encrypted_word]['zeros_list']:
-                potential_words_by_alpha_dict.pop(potential_word[i])
-        return potential_words_by_alpha_dict
+                self.search_state.pop_letter(potential_word[i])
 
-    def pop_encrypted_word_from_alpha_dict(self, decrypted_word_dict_for_letter, potential_words_by_alpha_dict):
-        potential_words_by_alpha_dict_copy = copy.deepcopy(potential_words_by_alpha_dict)
+    def pop_encrypted_word_from_alpha_dict(self, decrypted_word_dict_for_letter):
+        """
+        Removes the encrypted_word's remaining candidates. They are removed together by the index of the
+        encrypted_word's record, its owner, so no candidates are visited
+        """
         for encrypted_word in decrypted_word_dict_for_letter.keys():
-            for letter_key, potential_word_dict in potential_words_by_alpha_dict_copy.items():
-                for k, v in potential_word_dict.items():
-                    if v == encrypted_word:
-                        potential_words_by_alpha_dict[letter_key].pop(k)
-        return potential_words_by_alpha_dict
-
-    def get_unassigned_letters_dict(self, potential_words_by_alpha_dict, unassigned_letters):
-        potential_words_by_alpha_dict_copy = copy.deepcopy(potential_words_by_alpha_dict)
-        for k, v in potential_words_by_alpha_dict_copy.items():
-            if len(v) ==0:
-                unassigned_letters.append(k)
-                potential_words_by_alpha_dict.pop(k)
-        return {"unassigned_letters" : unassigned_letters, "potential_words_by_alpha_dict": potential_words_by_alpha_dict}
+            owner = self.candidate_store.records[encrypted_word].index
+            if not self.search_state.check_owner_popped(owner):
+                self.search_state.pop_owner(owner)
+
+    def pop_unassigned_letters_from_alpha_dict(self):
+        """
+        Letters left without candidates are moved to the search_state's unassigned_letters
+        """
+        letters_to_pop = [k for k, v in self.search_state.letter_counts.items() if v == 0]
+        for letter in letters_to_pop:
+            self.search_state.pop_letter(letter)
+            self.search_state.add_unassigned_letter(letter)
 
     def get_unassigned_words(self, decrypted_word_dict):
         unassigned_encrypted_words = []
@@ -179,28 +252,37 @@ class EncryptedWordDecoder(potential_word_tracker.PotentialWordTracker):
         decrypted_word_dict = {}
         random.shuffle(unassigned_letters)
         random.shuffle(unassigned_words)
+        unassigned_letters_mask = self.get_mask_for_letters(unassigned_letters)
         for encrypted_word in unassigned_words:
             split_decrypted_word = list(encrypted_word)
             for zero_index in self.potential_words_dict_collection[encrypted_word]['zeros_list']:
-                random_letter = self.assign_random_letter_to_zero_index(zero_index, unassigned_letters)
+                random_letter = self.assign_random_letter_to_zero_index(zero_index, unassigned_letters,
+                                                                        unassigned_letters_mask)
                 split_decrypted_word[zero_index] = random_letter
-                unassigned_letters.remove(random_letter)
+                unassigned_letters_mask &= ~self.letter_bits[random_letter]
             decrypted_word = "".join(split_decrypted_word)
             decrypted_word_dict.update({encrypted_word : decrypted_word})
         return decrypted_word_dict
 
 
-    def assign_random_letter_to_zero_index(self, zero_index, unassigned_letters):
-        vowels = ['a', 'e', 'i', 'o', 'u']
+    def assign_random_letter_to_zero_index(self, zero_index, unassigned_letters, unassigned_letters_mask):
+        """
+        unassigned_letters holds the shuffled order of letters; only those with their bit
+        set in unassigned_letters_mask are still available.
+        Vowels are preferred after the first index and consonants at the first index.
+        """
         letter_assigned = None
         for unassigned_letter in unassigned_letters:
-            if unassigned_letter in vowels:
+            letter_bit = self.letter_bits[unassigned_letter]
+            if not unassigned_letters_mask & letter_bit:
+                continue
+            if letter_assigned is None:
+                letter_assigned = unassigned_letter
+            if letter_bit & self.vowels_mask:
                 if zero_index > 0:
-                    letter_assigned = unassigned_letter
-                    break
+                    return unassigned_letter
             elif zero_index == 0:
-                letter_assigned = unassigned_letter
-                break
-        if letter_assigned == None:
-            letter_assigned = unassigned_letters[0]
+                return unassigned_letter
+        if letter_assigned is None:
+            raise ValueError("No unassigned letters left for zero index {}".format(zero_index))
         return letter_assigned
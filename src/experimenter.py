@@ -2,16 +2,50 @@
 import string
 import text_blob_word_finder
 import pyspellchecker_word_finder
+import lexicon_word_finder
+import trie_word_finder
 import encrypted_word_decoder
-import report_maker
+import backtracking_word_decoder
+import beam_word_decoder
+import annealing_word_decoder
+import dictionary_provider
+import instrumentation
+import word_finder_cache
+import word_frequency
+import candidate_store
+import sweep_checkpoint
+import successive_halving_search
+import multiprocessing
 import copy
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from timeit import default_timer as timer
 
+# Word finders which guess random letters, so their results are only cached for a word_finder_seed
+RANDOMISED_WORD_FINDER_NAMES = ("TextBlobWordFinder", "PyspellcheckerWordFinder")
+
 def get_potential_words_dict_collection_report(potential_words_dict_collection):
     for k, v in potential_words_dict_collection.items():
         print("Key", k)
         print("Value", v)
 
+def get_report_maker_for_sweep_config(experimenter_cls, sweep_config):
+    """
+    Runs a single sweep_config in a worker process. The worker's random module is
+    seeded from the sweep_config so each configuration has an independent RNG stream.
+    The ReportMaker is returned rather than executed so that only the parent process
+    writes to the report.
+    """
+    random.seed(sweep_config["seed"])
+    if "puzzle_dict" in sweep_config:
+        experimenter_cls.set_puzzle(sweep_config["puzzle_dict"])
+    experimenter_cls.word_finder_seed = sweep_config["word_finder_seed"]
+    experimenter_cls.sweep_config_key = sweep_config.get("config_key")
+    experimenter_cls.pyspellchecker_no_of_random_letters = sweep_config["no_of_random_letters"]
+    return experimenter_cls.get_report_maker_for_params(sweep_config["text_blob_params_dict"],
+                                                        sweep_config["word_decoder_max_epochs"],
+                                                        sweep_config["word_finder"])
+
 class Experimenter():
     """
     The purpose of this class is to expand the alphabet_soup_report to help
@@ -30,14 +64,56 @@ class Experimenter():
                 '0ro0ec0': 'project'}
         self.encrypted_words = ['0ri0t', '0ala00', '0e00est', '0e00ry', '0ra0e0', 's00r0', '00amy', '0ebr0', '0o0ey',
                            '0ro0ec0']
+        self.puzzle_name = None
         self.text_blob_params_dict = self.get_text_blob_params_dict(min_iters_per_epoch=50,
                                                                         min_potential_words=5,
                                                                         max_epochs=3,
                                                                         max_attempts=3)
         self.text_blob_word_finder = text_blob_word_finder.TextBlobWordFinder
         self.word_decoder_max_epochs = 75
+        self.word_decoder = encrypted_word_decoder.EncryptedWordDecoder
+        self.backtracking_word_decoder = backtracking_word_decoder.BacktrackingWordDecoder
+        self.beam_word_decoder = beam_word_decoder.BeamWordDecoder
+        self.annealing_word_decoder = annealing_word_decoder.AnnealingWordDecoder
+        self.word_decoder_kwargs = {}
+        self.backtracking_max_solutions = 1
+        self.report_path = '../reports/alphabet_soup_report.jsonl'
+        self.instrumentation_enabled = False
+        self.profile_path = '../reports/alphabet_soup_profile.jsonl'
         self.pyspellchecker_no_of_random_letters = 0
         self.pyspellchecker_word_finder = pyspellchecker_word_finder.PyspellcheckerWordFinder
+        self.lexicon_word_finder = lexicon_word_finder.LexiconWordFinder
+        self.lexicon_word_list_path = None
+        self.trie_word_finder = trie_word_finder.TrieWordFinder
+        self.trie_path = '../cache/word_trie.dawg'
+        self.text_blob_test_lists_dict = {"min_iters_per_epoch": [50, 75, 100, 125, 150],
+                                          "min_potential_words": [3, 4, 5, 6, 7],
+                                          "max_epochs": [3, 4, 5, 6, 7, 8],
+                                          "max_attempts": [3, 4, 5]}
+        self.word_decoder_max_epochs_test_list = [5, 10, 25, 50, 75, 100, 125, 150]
+        self.no_of_random_letters_test_list = [5, 10, 15, 20, 25, 26]
+        self.word_finder_cache = word_finder_cache.WordFinderCache('../cache/word_finder')
+        self.use_word_finder_cache = True
+        self.word_finder_seed = None
+        self.use_word_frequencies = True
+        self.word_frequency_path = None
+        self.sweep_checkpoint_path = None
+        self.resume_sweep = False
+        self.sweep_checkpoint = None
+        self.sweep_config_key = None
+        self.sweep_seed = None
+        self.sweep_config_repeats = {}
+
+    def set_puzzle(self, puzzle_dict):
+        """
+        Replaces the alphabet, encrypted_words and answers_dict, e.g. with a puzzle_dict from the PuzzleGenerator
+        :param puzzle_dict: e.g. {"name": "easy", "alphabet": ['a', 'd', ...], "encrypted_words": ['00m0y', ...],
+                                  "answers_dict": {'00m0y': 'homey', ...}}
+        """
+        self.alphabet = list(puzzle_dict["alphabet"])
+        self.encrypted_words = list(puzzle_dict["encrypted_words"])
+        self.answers_dict = dict(puzzle_dict["answers_dict"])
+        self.puzzle_name = puzzle_dict.get("name")
 
     def get_text_blob_params_dict(self, min_iters_per_epoch, min_potential_words, max_epochs, max_attempts):
         return {"min_iters_per_epoch": min_iters_per_epoch,
@@ -46,51 +122,354 @@ class Experimenter():
                 "max_attempts": max_attempts}
 
     def execute_experimenter(self):
-        self.get_results_for_text_blob_word_finder()
-        self.pyspellchecker_no_of_random_letters = 10
-        self.text_blob_params_dict = {k:0 for (k,v) in self.text_blob_params_dict.items()}
-        self.get_results_for_pyspellchecker_word_finder()
+        """
+        If self.sweep_checkpoint_path is set, progress is recorded in its manifest. If self.resume_sweep is also True,
+        configurations completed by the last sweep in the manifest are skipped, so a sweep which was stopped can be
+        rerun to complete it. See sweep_checkpoint.SweepCheckpoint
+        If self.sweep_checkpoint is already set, e.g. to run the sweep for several puzzles, it is used instead.
+        The text_blob_params_dict and pyspellchecker_no_of_random_letters changed for the pyspellchecker
+        word finder are restored afterwards, so the sweep can be run again, e.g. for another puzzle.
+        Every configuration of the run shares one word_finder_seed, see get_word_finder_seed, so configurations
+        which only change decoder parameters reuse the cached word finder results.
+        """
+        text_blob_params_dict = self.text_blob_params_dict
+        pyspellchecker_no_of_random_letters = self.pyspellchecker_no_of_random_letters
+        word_finder_seed = self.word_finder_seed
+        sweep_checkpoint_cls = self.sweep_checkpoint
+        if sweep_checkpoint_cls is None:
+            self.sweep_checkpoint = self.get_sweep_checkpoint()
+        self.sweep_config_repeats = {}
+        try:
+            self.word_finder_seed = self.get_word_finder_seed()
+            self.get_results_for_text_blob_word_finder()
+            self.pyspellchecker_no_of_random_letters = 10
+            self.text_blob_params_dict = {k:0 for (k,v) in self.text_blob_params_dict.items()}
+            self.get_results_for_pyspellchecker_word_finder()
+        finally:
+            self.text_blob_params_dict = text_blob_params_dict
+            self.pyspellchecker_no_of_random_letters = pyspellchecker_no_of_random_letters
+            self.word_finder_seed = word_finder_seed
+            self.sweep_checkpoint = sweep_checkpoint_cls
+            self.sweep_config_key = None
+
+    def execute_adaptive_experimenter(self, no_of_configs=27, eta=3, seed=None):
+        """
+        Searches the params of execute_experimenter in combination, rather than one at a time from the control,
+        with a SuccessiveHalvingSearch for each word finder. Decoder epochs and word finder iterations are only
+        given in full to the configurations with the best mean accuracy per second at smaller budgets.
+        As for execute_experimenter, the word finder params changed for the pyspellchecker word finder are restored.
+        :return: e.g. {"TextBlobWordFinder": {"params_dict": {"min_iters_per_epoch": 75, ...},
+                                              "mean_accuracy": 0.42, "accuracy_per_second": 0.135, ...}, ...}
+        """
+        text_blob_params_dict = self.text_blob_params_dict
+        pyspellchecker_no_of_random_letters = self.pyspellchecker_no_of_random_letters
+        best_result_dicts = {}
+        try:
+            search = successive_halving_search.SuccessiveHalvingSearch(
+                self, self.text_blob_word_finder, self.get_search_param_lists_dict(self.text_blob_word_finder),
+                no_of_configs, eta, seed=seed)
+            best_result_dicts[self.text_blob_word_finder.__name__] = search.execute()
+            self.pyspellchecker_no_of_random_letters = 10
+            self.text_blob_params_dict = {k:0 for (k,v) in self.text_blob_params_dict.items()}
+            search = successive_halving_search.SuccessiveHalvingSearch(
+                self, self.pyspellchecker_word_finder,
+                self.get_search_param_lists_dict(self.pyspellchecker_word_finder),
+                no_of_configs, eta, seed=seed)
+            best_result_dicts[self.pyspellchecker_word_finder.__name__] = search.execute()
+        finally:
+            self.text_blob_params_dict = text_blob_params_dict
+            self.pyspellchecker_no_of_random_letters = pyspellchecker_no_of_random_letters
+            self.sweep_config_key = None
+        return best_result_dicts
+
+    def get_search_param_lists_dict(self, word_finder):
+        """
+        :return: the test lists of execute_experimenter for the word_finder, e.g.
+        {"word_decoder_max_epochs": [5, 10, ...], "min_iters_per_epoch": [50, 75, ...], ...} for the TextBlobWordFinder
+        """
+        param_lists_dict = {"word_decoder_max_epochs": self.word_decoder_max_epochs_test_list}
+        if word_finder is self.text_blob_word_finder:
+            param_lists_dict.update(self.text_blob_test_lists_dict)
+        elif word_finder is self.pyspellchecker_word_finder:
+            param_lists_dict["no_of_random_letters"] = self.no_of_random_letters_test_list
+        return param_lists_dict
+
+    def get_word_finder_seed(self):
+        """
+        :return: self.word_finder_seed if it is set, otherwise one drawn from self.sweep_seed as by get_sweep_configs.
+        Without a sweep_seed, the seed of self.sweep_checkpoint is used if there is one, so a resumed sweep
+        has the same word finder results, or else a random seed.
+        """
+        if self.word_finder_seed is not None:
+            return self.word_finder_seed
+        seed = self.sweep_seed
+        if seed is None and self.sweep_checkpoint is not None:
+            seed = self.sweep_checkpoint.get_seed()
+        return random.Random(seed).getrandbits(32)
+
+    def get_sweep_checkpoint(self):
+        if self.sweep_checkpoint_path is None:
+            return None
+        return sweep_checkpoint.SweepCheckpoint(self.sweep_checkpoint_path, self.resume_sweep)
 
     def get_results_for_text_blob_word_finder(self):
 
         self.get_results_for_control(self.text_blob_word_finder)
-        self.get_results_for_changing_text_blob_params_dict("min_iters_per_epoch", [50, 75, 100, 125, 150])
-        self.get_results_for_changing_text_blob_params_dict("min_potential_words", [3, 4, 5, 6, 7])
-        self.get_results_for_changing_text_blob_params_dict("max_epochs", [3, 4, 5, 6, 7, 8])
-        self.get_results_for_changing_text_blob_params_dict("max_attempts", [3, 4, 5])
-        self.get_results_for_changing_word_decoder_max_epochs([5, 10, 25, 50, 75, 100, 125, 150], self.text_blob_word_finder)
+        for field, test_list in self.text_blob_test_lists_dict.items():
+            self.get_results_for_changing_text_blob_params_dict(field, test_list)
+        self.get_results_for_changing_word_decoder_max_epochs(self.word_decoder_max_epochs_test_list,
+                                                              self.text_blob_word_finder)
 
     def get_results_for_pyspellchecker_word_finder(self):
         self.get_results_for_control(self.pyspellchecker_word_finder)
-        self.get_results_for_changing_word_decoder_max_epochs([5, 10, 25, 50, 75, 100, 125, 150], self.pyspellchecker_word_finder)
-        self.get_results_for_changing_no_of_random_letters([5, 10, 15, 20, 25, 26])
+        self.get_results_for_changing_word_decoder_max_epochs(self.word_decoder_max_epochs_test_list,
+                                                              self.pyspellchecker_word_finder)
+        self.get_results_for_changing_no_of_random_letters(self.no_of_random_letters_test_list)
+
+    def execute_parallel_experimenter(self, max_workers=None, seed=None, share_dictionaries=True, puzzle_dicts=None):
+        """
+        Runs the same configurations as execute_experimenter, but expanded up front by
+        get_sweep_configs and run across a ProcessPoolExecutor with max_workers processes
+        (defaults to the number of CPUs). Results are written by this process in completion order.
+        :param seed: Optional seed used to derive each configuration's seed, for repeatable sweeps
+        :param share_dictionaries: Loads the spellchecker dictionaries before forking the workers,
+        so they share them copy-on-write rather than each loading their own. Only available where fork is.
+        :param puzzle_dicts: Optional puzzles, e.g. from PuzzleGenerator.get_puzzle_dicts_for_families.
+        Every configuration is run for each puzzle
+        If self.sweep_checkpoint_path is set, progress is recorded in its manifest. If self.resume_sweep is also True,
+        configurations completed by the last sweep in the manifest are skipped and, without a seed, its seed is
+        reused so the configurations have the same keys.
+        """
+        self.sweep_checkpoint = self.get_sweep_checkpoint()
+        try:
+            self.execute_sweep_configs(max_workers, seed, share_dictionaries, puzzle_dicts)
+        finally:
+            self.sweep_checkpoint = None
+
+    def execute_sweep_configs(self, max_workers, seed, share_dictionaries, puzzle_dicts):
+        if self.sweep_checkpoint is not None:
+            seed = self.sweep_checkpoint.get_seed(seed)
+        sweep_configs = self.get_sweep_configs(seed, puzzle_dicts)
+        for sweep_config in sweep_configs:
+            sweep_config["config_key"] = sweep_checkpoint.get_config_key(self.get_config_dict(sweep_config))
+        if self.sweep_checkpoint is not None:
+            sweep_configs_count = len(sweep_configs)
+            sweep_configs = [sweep_config for sweep_config in sweep_configs
+                             if not self.sweep_checkpoint.check_config_completed(sweep_config["config_key"])]
+            print("Skipping {} completed sweep configurations".format(sweep_configs_count - len(sweep_configs)))
+        print("Running {} sweep configurations".format(len(sweep_configs)))
+        mp_context = None
+        if share_dictionaries and "fork" in multiprocessing.get_all_start_methods():
+            dictionary_provider.preload_dictionaries()
+            mp_context = multiprocessing.get_context("fork")
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+                futures = {executor.submit(get_report_maker_for_sweep_config, self, sweep_config): sweep_config
+                           for sweep_config in sweep_configs}
+                # Workers using fork are all started by the first submit, so they already share the dictionaries
+                if mp_context is not None:
+                    dictionary_provider.unfreeze_dictionaries()
+                for future in as_completed(futures):
+                    report_maker_cls = future.result()
+                    report_maker_cls.execute_report_maker()
+                    if self.sweep_checkpoint is not None:
+                        sweep_config = futures[future]
+                        self.sweep_checkpoint.mark_config_completed(sweep_config["config_key"],
+                                                                    self.get_config_dict(sweep_config))
+        finally:
+            if mp_context is not None:
+                dictionary_provider.unfreeze_dictionaries()
+
+    def get_sweep_configs(self, seed=None, puzzle_dicts=None):
+        """
+        Expands every configuration run by execute_experimenter into a list.
+        :return: e.g. [{"text_blob_params_dict": {"min_iters_per_epoch": 50, ...}, "word_decoder_max_epochs": 75,
+                        "word_finder": TextBlobWordFinder, "no_of_random_letters": 0, "seed": 2746317213,
+                        "word_finder_seed": 577090037}, ...]
+        word_finder_seed is shared by every configuration of the sweep, so configurations which only
+        change decoder parameters reuse the same cached word finder results.
+        If puzzle_dicts are given, the configurations are repeated for each puzzle, with a "puzzle_dict" key.
+        """
+        sweep_configs = []
+        text_blob_params_dict = self.text_blob_params_dict
+        sweep_configs.append(self.get_sweep_config(text_blob_params_dict, self.word_decoder_max_epochs,
+                                                   self.text_blob_word_finder, self.pyspellchecker_no_of_random_letters))
+        for field, test_list in self.text_blob_test_lists_dict.items():
+            for x in test_list:
+                word_finder_params_dict_copy = copy.deepcopy(text_blob_params_dict)
+                word_finder_params_dict_copy[field] = x
+                sweep_configs.append(self.get_sweep_config(word_finder_params_dict_copy, self.word_decoder_max_epochs,
+                                                           self.text_blob_word_finder,
+                                                           self.pyspellchecker_no_of_random_letters))
+        for x in self.word_decoder_max_epochs_test_list:
+            sweep_configs.append(self.get_sweep_config(text_blob_params_dict, x, self.text_blob_word_finder,
+                                                       self.pyspellchecker_no_of_random_letters))
+
+        pyspellchecker_params_dict = {k: 0 for k in text_blob_params_dict}
+        no_of_random_letters = 10
+        sweep_configs.append(self.get_sweep_config(pyspellchecker_params_dict, self.word_decoder_max_epochs,
+                                                   self.pyspellchecker_word_finder, no_of_random_letters))
+        for x in self.word_decoder_max_epochs_test_list:
+            sweep_configs.append(self.get_sweep_config(pyspellchecker_params_dict, x,
+                                                       self.pyspellchecker_word_finder, no_of_random_letters))
+        for x in self.no_of_random_letters_test_list:
+            sweep_configs.append(self.get_sweep_config(pyspellchecker_params_dict, self.word_decoder_max_epochs,
+                                                       self.pyspellchecker_word_finder, x))
+
+        if puzzle_dicts:
+            sweep_configs = [dict(sweep_config, puzzle_dict=puzzle_dict)
+                             for puzzle_dict in puzzle_dicts for sweep_config in sweep_configs]
+
+        seed_generator = random.Random(seed)
+        word_finder_seed = seed_generator.getrandbits(32)
+        for sweep_config in sweep_configs:
+            sweep_config["seed"] = seed_generator.getrandbits(32)
+            sweep_config["word_finder_seed"] = word_finder_seed
+        return sweep_configs
+
+    def get_sweep_config(self, text_blob_params_dict, word_decoder_max_epochs, word_finder, no_of_random_letters):
+        return {"text_blob_params_dict": text_blob_params_dict,
+                "word_decoder_max_epochs": word_decoder_max_epochs,
+                "word_finder": word_finder,
+                "no_of_random_letters": no_of_random_letters}
+
+    def get_config_dict(self, sweep_config, word_decoder=None):
+        """
+        Fields identifying a sweep_config's results, from which sweep_checkpoint.get_config_key makes its key.
+        Configurations run without a seed of their own, i.e. by execute_experimenter, use self.sweep_seed,
+        and a configuration which is repeated, such as the control, has the no. of times it was run before as repeat.
+        :return: e.g. {"puzzle_name": None, "alphabet": "abc...", "encrypted_words": ['0ri0t', ...],
+                       "word_finder": "TextBlobWordFinder", "text_blob_params_dict": {"min_iters_per_epoch": 50, ...},
+                       "word_decoder": "EncryptedWordDecoder", "word_decoder_kwargs": {},
+                       "word_decoder_max_epochs": 75, "no_of_random_letters": 0, "seed": 2746317213, "repeat": 0}
+        """
+        puzzle_dict = sweep_config.get("puzzle_dict") or {"name": self.puzzle_name, "alphabet": self.alphabet,
+                                                           "encrypted_words": self.encrypted_words}
+        if word_decoder is None:
+            word_decoder = self.word_decoder
+        return {"puzzle_name": puzzle_dict.get("name"),
+                "alphabet": "".join(puzzle_dict.get("alphabet", string.ascii_lowercase)),
+                "encrypted_words": list(puzzle_dict["encrypted_words"]),
+                "word_finder": sweep_config["word_finder"].__name__,
+                "text_blob_params_dict": sweep_config["text_blob_params_dict"],
+                "word_decoder": word_decoder.__name__,
+                "word_decoder_kwargs": self.get_word_decoder_kwargs(word_decoder),
+                "word_decoder_max_epochs": sweep_config["word_decoder_max_epochs"],
+                "no_of_random_letters": sweep_config["no_of_random_letters"],
+                "seed": sweep_config.get("seed", self.sweep_seed),
+                "repeat": sweep_config.get("repeat", 0)}
 
     def get_results_for_control(self, word_finder):
         print("Getting control results for", word_finder.__name__)
         self.get_results_for_params(self.text_blob_params_dict, self.word_decoder_max_epochs, word_finder)
 
-    def get_results_for_params(self, text_blob_params_dict, word_decoder_max_epochs, word_finder):
+    def get_results_for_params(self, text_blob_params_dict, word_decoder_max_epochs, word_finder, word_decoder=None):
+        """
+        :param word_decoder: EncryptedWordDecoder (randomised epochs), BacktrackingWordDecoder (exact search)
+        BeamWordDecoder (keeps the partial assignments of the most common potential_words)
+        or AnnealingWordDecoder (local search within an iteration or time budget). Defaults to self.word_decoder.
+        self.word_decoder_kwargs are also passed to the decoder,
+        e.g. {"stop_on_full_solution": True, "max_epochs_without_improvement": 10}
+        If they include a target_accuracy, self.answers_dict is passed as the answers_dict unless one is given.
+        Configurations completed in self.sweep_checkpoint are skipped.
+        """
+        sweep_config = self.get_sweep_config(text_blob_params_dict, word_decoder_max_epochs, word_finder,
+                                             self.pyspellchecker_no_of_random_letters)
+        config_dict = self.get_config_dict(sweep_config, word_decoder)
+        config_key = sweep_checkpoint.get_config_key(config_dict)
+        repeat = self.sweep_config_repeats.get(config_key, 0)
+        self.sweep_config_repeats[config_key] = repeat + 1
+        # Only a repeated configuration, such as the control, needs a key of its own
+        if repeat:
+            config_dict["repeat"] = repeat
+            config_key = sweep_checkpoint.get_config_key(config_dict)
+        self.sweep_config_key = config_key
+        if self.sweep_checkpoint is not None and self.sweep_checkpoint.check_config_completed(self.sweep_config_key):
+            print("Skipping completed configuration", self.sweep_config_key)
+            return
+        report_maker_cls = self.get_report_maker_for_params(text_blob_params_dict, word_decoder_max_epochs,
+                                                            word_finder, word_decoder)
+        report_maker_cls.execute_report_maker()
+        if self.sweep_checkpoint is not None:
+            self.sweep_checkpoint.mark_config_completed(self.sweep_config_key, config_dict)
+
+    def get_report_maker_for_params(self, text_blob_params_dict, word_decoder_max_epochs, word_finder,
+                                    word_decoder=None):
+        # Imported here as report_maker imports numpy, which is not needed to only find and decode words
+        import report_maker
+        if word_decoder is None:
+            word_decoder = self.word_decoder
+        instrumentation.enable(self.instrumentation_enabled)
+        instrumentation.reset()
         start = timer()
-        potential_words_dict_collection = self.get_potential_words_dict_collection_for_word_finder(word_finder,
-                                                                                                   text_blob_params_dict)
+        with instrumentation.timer("word_finder"):
+            potential_words_dict_collection = self.get_potential_words_dict_collection_for_word_finder(
+                word_finder, text_blob_params_dict)
+        if instrumentation.is_enabled():
+            instrumentation.increment("potential_words_found", sum(len(v.get('potential_words_list', []))
+                                                                   for v in potential_words_dict_collection.values()))
 
         get_potential_words_dict_collection_report(potential_words_dict_collection)
 
-        encrypted_word_decoder_cls = encrypted_word_decoder.EncryptedWordDecoder(self.alphabet,
-                                                                             self.encrypted_words,
-                                                                             potential_words_dict_collection,
-                                                                             max_epochs=word_decoder_max_epochs)
-        decrypted_words_dict_collection = encrypted_word_decoder_cls.execute_encrypted_word_decoder()
-        print(decrypted_words_dict_collection)
-        end = timer()
-        time_taken_in_seconds = end-start
+        word_decoder_kwargs = self.get_word_decoder_kwargs(word_decoder)
+        if word_decoder_kwargs.get("target_accuracy") is not None:
+            word_decoder_kwargs.setdefault("answers_dict", self.answers_dict)
+        encrypted_word_decoder_cls = word_decoder(self.alphabet,
+                                                  self.encrypted_words,
+                                                  potential_words_dict_collection,
+                                                  max_epochs=word_decoder_max_epochs,
+                                                  **word_decoder_kwargs)
+        decrypted_words_dicts = encrypted_word_decoder_cls.generate_decrypted_words_dicts()
         word_finder_name = word_finder.__name__
-        report_maker_cls = report_maker.ReportMaker(self.answers_dict, decrypted_words_dict_collection,
+        report_maker_cls = report_maker.ReportMaker(self.answers_dict, decrypted_words_dicts,
                                                 text_blob_params_dict, word_decoder_max_epochs,
-                                                time_taken_in_seconds, word_finder_name,
+                                                None, word_finder_name,
                                                 self.pyspellchecker_no_of_random_letters)
+        report_maker_cls.report_path = self.report_path
+        report_maker_cls.word_decoder_name = word_decoder.__name__
+        report_maker_cls.puzzle_name = self.puzzle_name
+        report_maker_cls.config_key = self.sweep_config_key
+        # Decrypted words dicts are streamed from the decoder as the ReportMaker scores them,
+        # so the decoder timer also covers scoring
+        with instrumentation.timer("decoder"):
+            report_maker_cls.get_result_dict_for_runs()
+        end = timer()
+        report_maker_cls.time_taken_in_seconds = end-start
+        if instrumentation.is_enabled():
+            report_maker_cls.instrumentation_metrics_dict = instrumentation.get_metrics_dict()
+            report_maker_cls.profile_path = self.profile_path
+        return report_maker_cls
 
-        report_maker_cls.execute_report_maker()
+    def get_word_decoder_kwargs(self, word_decoder):
+        """
+        The BacktrackingWordDecoder would otherwise collect every solution, which can be exponential for a large
+        lexicon. Unless self.word_decoder_kwargs say otherwise, it stops at the first full solution or after
+        self.backtracking_max_solutions solutions, as for the BatchSolver. None collects every solution.
+        :return: a copy of self.word_decoder_kwargs for the word_decoder,
+        e.g. {"max_solutions": 1, "stop_on_full_solution": True} for the BacktrackingWordDecoder
+        """
+        word_decoder_kwargs = dict(self.word_decoder_kwargs)
+        if word_decoder is self.backtracking_word_decoder:
+            word_decoder_kwargs.setdefault("max_solutions", self.backtracking_max_solutions)
+            word_decoder_kwargs.setdefault("stop_on_full_solution", True)
+        return word_decoder_kwargs
+
+    def get_results_for_puzzle_dicts(self, puzzle_dicts, word_finder, word_decoder=None):
+        """
+        Runs word_finder and word_decoder with the current parameters for each puzzle, e.g. generated puzzle
+        families of increasing difficulty from PuzzleGenerator.get_puzzle_dicts_for_families.
+        The puzzle_name is written to the report. The original puzzle is restored afterwards.
+        """
+        original_puzzle_dict = {"name": self.puzzle_name, "alphabet": self.alphabet,
+                                "encrypted_words": self.encrypted_words, "answers_dict": self.answers_dict}
+        try:
+            for puzzle_dict in puzzle_dicts:
+                print("Getting results for puzzle", puzzle_dict.get("name"))
+                self.set_puzzle(puzzle_dict)
+                self.get_results_for_params(self.text_blob_params_dict, self.word_decoder_max_epochs, word_finder,
+                                            word_decoder)
+        finally:
+            self.set_puzzle(original_puzzle_dict)
 
     def get_results_for_changing_text_blob_params_dict(self, field, test_list):
         print("Getting results for {}, with test_list {}".format(field, test_list))
@@ -124,13 +503,67 @@ class Experimenter():
         potential_words_dict_collection = {}
 
         for encrypted_word in self.encrypted_words:
-            word_finder_instance = word_finder(encrypted_word, self.alphabet, **kwargs)
-
-            potential_words_dict = word_finder_instance.execute()
+            potential_words_dict = self.get_potential_words_dict(word_finder, encrypted_word, kwargs)
             potential_words_dict_collection.update(potential_words_dict)
         return potential_words_dict_collection
 
+    def get_potential_words_dict(self, word_finder, encrypted_word, word_finder_kwargs):
+        """
+        Results are reused from self.word_finder_cache unless self.use_word_finder_cache is False.
+        If self.word_finder_seed is set, the random module is seeded from it and the encrypted_word
+        while the word finder runs, so that the cached result is reproducible for its key.
+        Without a word_finder_seed, the cache is bypassed for RANDOMISED_WORD_FINDER_NAMES, so repeated
+        runs each get new random results rather than replaying the first.
+        During a checkpointed sweep, results are also reused from the finder stages of the configuration
+        with self.sweep_config_key, so a stopped configuration does not repeat them.
+        """
+        checkpointed = self.sweep_checkpoint is not None and self.sweep_config_key is not None
+        if checkpointed:
+            potential_words_dict = self.sweep_checkpoint.get_finder_stage(self.sweep_config_key, encrypted_word)
+            if potential_words_dict is not None:
+                print("Using checkpointed potential words for", encrypted_word)
+                return potential_words_dict
+
+        cache_key = None
+        if self.check_use_word_finder_cache(word_finder):
+            cache_key = self.word_finder_cache.get_key(encrypted_word, self.alphabet, word_finder.__name__,
+                                                       word_finder_kwargs, self.word_finder_seed)
+            potential_words_dict = self.word_finder_cache.get(cache_key)
+            if potential_words_dict is not None:
+                print("Using cached potential words for", encrypted_word)
+                if checkpointed:
+                    self.sweep_checkpoint.mark_finder_stage_completed(self.sweep_config_key, encrypted_word,
+                                                                      potential_words_dict)
+                return potential_words_dict
+
+        random_state = random.getstate()
+        if self.word_finder_seed is not None:
+            random.seed("{}:{}".format(self.word_finder_seed, encrypted_word))
+        word_finder_instance = word_finder(encrypted_word, self.alphabet, **word_finder_kwargs)
+        potential_words_dict = word_finder_instance.execute()
+        if self.word_finder_seed is not None:
+            random.setstate(random_state)
+
+        if cache_key is not None:
+            self.word_finder_cache.set(cache_key, potential_words_dict)
+        if checkpointed:
+            self.sweep_checkpoint.mark_finder_stage_completed(self.sweep_config_key, encrypted_word,
+                                                              potential_words_dict)
+        return potential_words_dict
+
+    def check_use_word_finder_cache(self, word_finder):
+        if not self.use_word_finder_cache:
+            return False
+        return self.word_finder_seed is not None or word_finder.__name__ not in RANDOMISED_WORD_FINDER_NAMES
+
     def get_potential_words_dict_collection_for_word_finder(self, word_finder_meta_class, text_blob_params_dict):
+        """
+        If self.use_word_frequencies is True, potential_words are scored and sorted by their frequency
+        in self.word_frequency_path, or the pyspellchecker English dictionary if it is None.
+        See word_frequency.get_scored_potential_words_dict_collection
+        :return: a view of the potential_words_dict_collection held in a candidate_store.CandidateStore,
+        which the word decoders use directly
+        """
         potential_words_dict_collection = {}
         word_finder_name = word_finder_meta_class.__name__
         if word_finder_name == "TextBlobWordFinder":
@@ -141,8 +574,21 @@ class Experimenter():
             print("Getting PyspellcheckerWordFinder word_dict_collection")
             potential_words_dict_collection = self.get_potential_words_dict_collection(
                                             word_finder_meta_class, no_of_random_letters=self.pyspellchecker_no_of_random_letters)
+        elif word_finder_name == "LexiconWordFinder":
+            print("Getting LexiconWordFinder word_dict_collection")
+            potential_words_dict_collection = self.get_potential_words_dict_collection(
+                                            word_finder_meta_class, word_list_path=self.lexicon_word_list_path)
+        elif word_finder_name == "TrieWordFinder":
+            print("Getting TrieWordFinder word_dict_collection")
+            potential_words_dict_collection = self.get_potential_words_dict_collection(
+                                            word_finder_meta_class, word_list_path=self.lexicon_word_list_path,
+                                            trie_path=self.trie_path)
         if potential_words_dict_collection:
-            return potential_words_dict_collection
+            if self.use_word_frequencies:
+                potential_words_dict_collection = word_frequency.get_scored_potential_words_dict_collection(
+                    potential_words_dict_collection, word_frequency.get_word_frequencies(self.word_frequency_path))
+            return candidate_store.CandidateStore.from_potential_words_dict_collection(
+                self.alphabet, potential_words_dict_collection).get_potential_words_dict_collection()
         else:
             raise ValueError("No potential_words_dict_collection. Check word_finder string names")
 
@@ -0,0 +1,66 @@
+"""
+Lightweight named timers and counters for the stages of a run, e.g. word finding,
+potential word tracking, decoding and report writing. Metrics are collected per process
+and reset by the Experimenter at the start of each run.
+Instrumentation is disabled by default: timer then returns a shared no-op context manager
+and increment returns straight away, so instrumented code costs close to nothing.
+
+Example:
+    with instrumentation.timer("word_finder"):
+        ...
+    instrumentation.increment("spellcheck_calls")
+    instrumentation.get_metrics_dict() -> {"time_word_finder": 1.52, "count_spellcheck_calls": 650}
+"""
+import contextlib
+from timeit import default_timer
+
+_enabled = False
+_timings = {}
+_counters = {}
+_null_timer = contextlib.nullcontext()
+
+
+class _Timer():
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _timings[self.name] = _timings.get(self.name, 0) + default_timer() - self.start
+        return False
+
+
+def enable(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    _timings.clear()
+    _counters.clear()
+
+
+def timer(name):
+    if not _enabled:
+        return _null_timer
+    return _Timer(name)
+
+
+def increment(name, amount=1):
+    if not _enabled:
+        return
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def get_metrics_dict():
+    metrics_dict = {"time_" + name: seconds for name, seconds in _timings.items()}
+    metrics_dict.update({"count_" + name: count for name, count in _counters.items()})
+    return metrics_dict
@@ -0,0 +1,114 @@
+import dictionary_provider
+
+
+class Lexicon():
+    """
+    A word list loaded once and indexed by word length and by the letter found at each index
+    position. Words matching an encrypted_word such as '0ri0t' are then found with a single
+    lookup, rather than by guessing random letters for the zeros and spellchecking test_words.
+
+    words_by_length example: {5: {'wrist', 'drift', 'print', ...}, ...}
+    words_by_position example: {5: {(1, 'r'): {'wrist', 'drift', 'print', ...}, ...}, ...}
+    """
+    def __init__(self, words):
+        self.words_by_length = {}
+        self.words_by_position = {}
+        for word in words:
+            self.add_word(word)
+
+    def add_word(self, word):
+        word = word.strip().lower()
+        if not word.isalpha():
+            return
+        length = len(word)
+        self.words_by_length.setdefault(length, set()).add(word)
+        words_by_position_for_length = self.words_by_position.setdefault(length, {})
+        for i, letter in enumerate(word):
+            words_by_position_for_length.setdefault((i, letter), set()).add(word)
+
+    def get_matching_words(self, encrypted_word, zeros_list):
+        """
+        Intersects the sets of words sharing each fixed letter of the encrypted_word,
+        starting with the smallest set. Words with duplicated letters at the zero
+        indexes are removed as each letter may only substitute a single zero.
+        :return: e.g. '0ri0t' -> ['brist', 'drift', 'grist', 'print', 'wrist', ...]
+        """
+        length = len(encrypted_word)
+        if length not in self.words_by_length:
+            return []
+        words_by_position_for_length = self.words_by_position[length]
+        word_sets = []
+        for i, letter in enumerate(encrypted_word):
+            if letter != "0":
+                word_sets.append(words_by_position_for_length.get((i, letter), set()))
+        if not word_sets:
+            word_sets.append(self.words_by_length[length])
+        word_sets.sort(key=len)
+        matching_words = set(word_sets[0])
+        for word_set in word_sets[1:]:
+            matching_words &= word_set
+            if not matching_words:
+                break
+        return sorted(word for word in matching_words
+                      if len({word[i] for i in zeros_list}) == len(zeros_list))
+
+
+_lexicons = {}
+
+
+def get_lexicon(word_list_path=None):
+    """
+    Lexicons are loaded once per process and shared by all LexiconWordFinder instances.
+    If no word_list_path is given, the pyspellchecker English frequency dictionary is used.
+    """
+    if word_list_path not in _lexicons:
+        _lexicons[word_list_path] = Lexicon(load_words(word_list_path))
+    return _lexicons[word_list_path]
+
+
+def load_words(word_list_path=None):
+    if word_list_path is None:
+        return list(dictionary_provider.get_spell_checker().word_frequency.keys())
+    with open(word_list_path) as word_list_file:
+        return word_list_file.read().split()
+
+
+class LexiconWordFinder():
+    """
+    Class evaluates an encrypted_word using a Lexicon indexed by word length and letter positions.
+    When executed, the class provides the same potential_words_dict as the TextBlob and
+    Pyspellchecker word finders, however every word in the lexicon matching the encrypted_word
+    is found deterministically.
+    """
+    def __init__(self, encrypted_word, alphabet, **kwargs):
+        """
+        :param encrypted_word: The original word which contains zeros which need to be decoded to
+        arrive at a word
+        :param alphabet: a list with alphabetical letters A-Z
+        :param word_list_path: Optional path to a whitespace separated word list.
+        Defaults to the pyspellchecker English dictionary
+        """
+        self.encrypted_word = encrypted_word
+        self.alphabet = alphabet
+        self.zeros_list = self.get_zeros_indexes()
+        self.lexicon = get_lexicon(kwargs.get('word_list_path'))
+
+    def get_zeros_indexes(self):
+        """
+        Produces a list of indexes (self.zeros_list)
+        where zeros represent letters in the encrypted_word
+        :return e.g. '0ri0t' -> [0, 3]
+        """
+        return [i for i, letter in enumerate(self.encrypted_word) if letter == "0"]
+
+    def execute(self):
+        print("Executing word_finder for,", self.encrypted_word)
+        potential_words_list = [word for word in self.lexicon.get_matching_words(self.encrypted_word,
+                                                                                 self.zeros_list)
+                                if all(word[i] in self.alphabet for i in self.zeros_list)]
+        return self.get_potential_words_dict(potential_words_list)
+
+    def get_potential_words_dict(self, potential_words_list):
+        success = len(potential_words_list) > 0
+        return {self.encrypted_word: {"potential_words_list": potential_words_list,
+                                      "zeros_list": self.zeros_list, "success": success}}
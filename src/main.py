@@ -3,6 +3,8 @@ Alphabet soup
 
 Please refer to ../README.md for more information on this code
 
+To run a single task without editing this file, use cli.py, e.g. python cli.py solve
+
 In depth explaination, with analysis of reports/alphabet_soup_report.csv is available
 in ../alphabet_soup_report.pdf
 
@@ -30,7 +32,8 @@ obtain proxy words for encrypted words using spell checking libraries;
 
 Finding words using the text_blob_Word_finder is particularly time intensive. 
 
-Results from running this section of code are written to: ../reports/alphabet_soup_report.csv
+Results from running this section of code are written to: ../reports/alphabet_soup_report.jsonl
+Set experimenter_cls.report_path to a .csv or .parquet path to write another format.
 
 This can be analyzed e.g. through using pandas along with graphical libraries/ 
 
@@ -38,6 +41,19 @@ This can be analyzed e.g. through using pandas along with graphical libraries/
 """
 #experimenter_cls.execute_experimenter()
 
+# Alternatively, run the same configurations across a process pool (one worker per CPU by default):
+#experimenter_cls.execute_parallel_experimenter(max_workers=None)
+
+# To measure how results scale beyond the original puzzle, run the configurations across generated
+# puzzle families of increasing difficulty. The puzzle_name is written to the report:
+#import puzzle_generator
+#puzzle_dicts = puzzle_generator.PuzzleGenerator(seed=0).get_puzzle_dicts_for_families()
+#experimenter_cls.execute_parallel_experimenter(max_workers=None, puzzle_dicts=puzzle_dicts)
+
+# To solve a batch of puzzles from a JSON Lines file, one puzzle per line, across a process pool:
+#import batch_solver
+#batch_solver.BatchSolver().execute_batch_solver('../puzzles.jsonl', '../reports/batch_results.jsonl')
+
 """
 Main Code Section 2
 
@@ -53,12 +69,18 @@ Example outcome: {'0ala00': 'galaxy', '0ro0ec0': 'project', '0ra0e0': 'brazen',
                   '0ebr0': 'cebri', '0e00ry': 'heskry'}
                   
 The best outcome from running the parameters will be logged in the shell and also will be appended to 
-the file: reports/alphabet_soup_report.csv. Thus it will be found at the base of the file,
+the file: reports/alphabet_soup_report.jsonl. Thus it will be found at the base of the file,
 in the right-most column: best_decrypted_word_dict.
 
 Uncomment the code below to run Main Code Section 2.             
 
 PLEASE NOTE: the pyspellchecker is provided as the default word finder for the use case below.      
+To search exhaustively rather than with random epochs, pass 
+word_decoder=experimenter_cls.backtracking_word_decoder to get_results_for_params. It stops at the first full solution,
+or after experimenter_cls.backtracking_max_solutions solutions.
+To keep only the partial solutions with the most common words, pass word_decoder=experimenter_cls.beam_word_decoder.
+For a local search within a time budget, pass word_decoder=experimenter_cls.annealing_word_decoder with
+experimenter_cls.word_decoder_kwargs = {"max_seconds": 0.5}.
 """
 
 """
@@ -84,6 +106,9 @@ Main Code Section 3
 This executes the CSVReportFixer instance so that a 'fixed' version of the alphabet_soup_report.csv
 is produced which can be read into a pandas dataframe for analysis. 
 
+This is only needed for reports written before the ReportWriter was introduced. New reports can be
+read directly with report_writer.ReportWriter(report_path).read_report()
+
 alphabet_soup_pandas_problem.html provides more information on this
 
 """
@@ -1,68 +1,189 @@
-
+import array
 import random
+import candidate_store
+import instrumentation
 
 class PotentialWordTracker():
-    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection):
+    def __init__(self, alphabet, encrypted_words, potential_words_dict_collection, propagate_constraints=False):
+        """
+        :param potential_words_dict_collection: e.g. {'0ri0t': {'potential_words_list': ['drift', 'wrist'],
+        'zeros_list': [0, 3], 'success': True}, ...} or a view of a CandidateStore, which is then used directly
+        :param propagate_constraints: Removes potential_words which cannot be part of a full solution
+        before starting letters are chosen. See self.propagate_constraints_for_potential_words
+        """
         self.alphabet = alphabet
         self.potential_words_dict_collection = potential_words_dict_collection
         self.encrypted_words = encrypted_words
-        self.potential_words_by_alpha_dict = {key: {} for key in self.alphabet}
+        self.candidate_store = None
+        self.candidate_ids_by_encrypted_word = {}
+        self.candidate_ids_by_letter = {key: array.array("i") for key in self.alphabet}
+        self.letter_counts_by_owner = {}
         self.unassigned_letters = []
         self.starting_letters = []
+        self.letter_bits = {letter: 1 << i for i, letter in enumerate(self.alphabet)}
+        self.propagate_constraints = propagate_constraints
+        self.forced_words_dict = {}
+        self.potential_word_masks_view = None
+
+    @property
+    def potential_word_masks(self):
+        """
+        e.g. {'0ri0t': {'drift': 40, 'wrist': 4456448}, ...} as a view of self.candidate_ids_by_encrypted_word.
+        The view is kept while the candidate_store and candidate_ids_by_encrypted_word are the same,
+        so the decoders look up potential_words in O(1) rather than building a view for each lookup
+        """
+        view = self.potential_word_masks_view
+        if view is None or view.candidate_store is not self.candidate_store or \
+                view.candidate_ids_by_encrypted_word is not self.candidate_ids_by_encrypted_word:
+            view = candidate_store.PotentialWordMasksView(self.candidate_store, self.candidate_ids_by_encrypted_word)
+            self.potential_word_masks_view = view
+        return view
+
+    @property
+    def potential_words_by_alpha_dict(self):
+        """
+        e.g. {'a': {('0ala00', 'balaga'): 16390, ('0e00est', 'nearest'): 139265}, ...}
+        as a view of self.candidate_ids_by_letter
+        """
+        return candidate_store.AlphaDictView(self.candidate_store, self.candidate_ids_by_letter)
 
     def execute_potential_word_tracker(self):
         """
-        Iterates over the key-pair vals in the self.potential_words_dict_collection.
-        That is a dictionary of encrypted_words as keys and a nested dictionary which
-        contains a potential_word_list for decrypted versions of the word.
-        self.alpha_dict_with_potential_words is updated so that key-pair values consisting
-        respectively of the potential_word and the encrypted_word are assigned under each
-        letter of the alphabet. This is according to where letters may be found at particular
-        indexes of the encrypted_word
-        self.alpha_dict_with_potential_words example:
-        {'a': {'balaga': '0ala00', 'falaba': '0ala00', 'nearest': '0e00est', 'dearest': '0e00est'... etc.}
-        """
-        for k, v in self.potential_words_dict_collection.items():
-            if v['success']:
-                encrypted_word = k
-                potential_word_list = v['potential_words_list']
-                zeros_list = v['zeros_list']
-                self.update_alpha_dict_with_potential_words(encrypted_word, potential_word_list, zeros_list)
-        self.get_starting_and_unassigned_letters()
+        The potential_words_dict_collection is a dictionary of encrypted_words as keys and a nested dictionary
+        which contains a potential_word_list for decrypted versions of the word. It is held in self.candidate_store,
+        where each potential_word of an encrypted_word is a candidate with an integer id and a letters_mask,
+        with one bit set per letter at the zero indexes, according to self.letter_bits.
+        Candidates with duplicated letters at the zero indexes, or letters outside the alphabet, are left out of:
+
+        self.candidate_ids_by_encrypted_word, the candidates of each encrypted_word
+        e.g. {'0ri0t': array('i', [0, 1, 2, 3]), '0ala00': array('i', [4, 5, ...]), ...}
+        self.candidate_ids_by_letter, the candidates using each letter at a zero index
+        e.g. {'a': array('i', [9, 31, ...]), ...}
+        self.letter_counts_by_owner, the no. of candidates of each encrypted_word, by the index of its record
+        in the candidate_store, using each letter e.g. {0: {'b': 1, 'd': 1, 'g': 1, 'p': 2, 'w': 1, ...}, ...}
+
+        A potential_word found for two encrypted_words has a candidate for each.
+        """
+        with instrumentation.timer("potential_word_tracker"):
+            self.candidate_store = candidate_store.get_candidate_store(self.alphabet,
+                                                                       self.potential_words_dict_collection)
+            for encrypted_word, record in self.candidate_store.records.items():
+                if record.success:
+                    candidate_ids = self.candidate_store.get_valid_candidate_ids(encrypted_word)
+                    if candidate_ids:
+                        self.candidate_ids_by_encrypted_word[encrypted_word] = candidate_ids
+            if self.propagate_constraints:
+                self.propagate_constraints_for_potential_words()
+            self.update_candidate_ids_by_letter()
+            self.get_starting_and_unassigned_letters()
+
+    def update_candidate_ids_by_letter(self):
+        letters_masks = self.candidate_store.letters_masks
+        candidate_ids_by_letter = {key: [] for key in self.alphabet}
+        self.letter_counts_by_owner = {}
+        for encrypted_word, candidate_ids in self.candidate_ids_by_encrypted_word.items():
+            letter_counts = self.letter_counts_by_owner.setdefault(self.candidate_store.records[encrypted_word].index, {})
+            for candidate_id in candidate_ids:
+                for letter in self.get_letters_for_mask(letters_masks[candidate_id]):
+                    candidate_ids_by_letter[letter].append(candidate_id)
+                    letter_counts[letter] = letter_counts.get(letter, 0) + 1
+        self.candidate_ids_by_letter = {letter: array.array("i", candidate_ids)
+                                        for letter, candidate_ids in candidate_ids_by_letter.items()}
+
+    def propagate_constraints_for_potential_words(self):
+        """
+        Repeats until nothing changes:
+        1. An encrypted_word with a single potential_word is forced to it, so potential_words of other
+        encrypted_words using any of its letters at zero indexes are removed.
+        2. When each letter must be used exactly once (see self.check_letters_used_exactly_once), a letter
+        found in the potential_words of a single encrypted_word must be used by it, so that encrypted_word's
+        potential_words without the letter are removed. A letter found in a single potential_word forces it.
+        Removals which would leave an encrypted_word without potential_words are skipped, as the
+        word finders may have missed the correct word.
+        self.candidate_ids_by_encrypted_word is updated and self.forced_words_dict holds the forced words,
+        e.g. {'0ebr0': 'zebra', ...}
+        :return: True if any potential_words were removed
+        """
+        letters_used_exactly_once = self.check_letters_used_exactly_once()
+        removed = False
+        changed = True
+        while changed:
+            changed = self.remove_potential_words_for_forced_words()
+            if letters_used_exactly_once:
+                changed = self.remove_potential_words_without_required_letters() or changed
+            removed = removed or changed
+        self.forced_words_dict = {encrypted_word: self.candidate_store.get_word(candidate_ids[0])
+                                  for encrypted_word, candidate_ids in self.candidate_ids_by_encrypted_word.items()
+                                  if len(candidate_ids) == 1}
+        return removed
 
-    def update_alpha_dict_with_potential_words(self, encrypted_word, potential_words, zeros_list):
-        for potential_word in potential_words:
-            self.assign_potential_word_to_letter(encrypted_word, potential_word, zeros_list)
+    def check_letters_used_exactly_once(self):
+        """
+        True when every encrypted_word has potential_words and there are as many zeros as letters
+        """
+        zeros_count = 0
+        for encrypted_word in self.encrypted_words:
+            if not self.candidate_ids_by_encrypted_word.get(encrypted_word):
+                return False
+            zeros_count += len(self.potential_words_dict_collection[encrypted_word]['zeros_list'])
+        return zeros_count == len(self.alphabet)
 
-    def assign_potential_word_to_letter(self, encrypted_word, potential_word, zeros_list):
-        letters_found_result_dict = self.get_letters_found_result_dict(zeros_list, potential_word)
-        if letters_found_result_dict['success']:
-            for letter in letters_found_result_dict["letters_found"]:
-                val = {potential_word: encrypted_word}
-                self.potential_words_by_alpha_dict[letter].update(val)
+    def remove_potential_words_for_forced_words(self):
+        letters_masks = self.candidate_store.letters_masks
+        forced_masks = {encrypted_word: letters_masks[candidate_ids[0]]
+                        for encrypted_word, candidate_ids in self.candidate_ids_by_encrypted_word.items()
+                        if len(candidate_ids) == 1}
+        changed = False
+        for encrypted_word in self.candidate_ids_by_encrypted_word:
+            claimed_mask = 0
+            for forced_encrypted_word, forced_mask in forced_masks.items():
+                if forced_encrypted_word != encrypted_word:
+                    claimed_mask |= forced_mask
+            changed = self.remove_potential_words(encrypted_word,
+                                                  lambda letters_mask: letters_mask & claimed_mask) or changed
+        return changed
 
-    def get_letters_found_result_dict(self, zeros_list, potential_word):
+    def remove_potential_words_without_required_letters(self):
+        letters_masks = self.candidate_store.letters_masks
+        encrypted_words_by_letter = {}
+        for encrypted_word, candidate_ids in self.candidate_ids_by_encrypted_word.items():
+            encrypted_word_mask = 0
+            for candidate_id in candidate_ids:
+                encrypted_word_mask |= letters_masks[candidate_id]
+            for letter, letter_bit in self.letter_bits.items():
+                if encrypted_word_mask & letter_bit:
+                    encrypted_words_by_letter.setdefault(letter, []).append(encrypted_word)
+        changed = False
+        for letter, encrypted_words in encrypted_words_by_letter.items():
+            if len(encrypted_words) == 1:
+                letter_bit = self.letter_bits[letter]
+                changed = self.remove_potential_words(encrypted_words[0],
+                                                      lambda letters_mask: not letters_mask & letter_bit) or changed
+        return changed
+
+    def remove_potential_words(self, encrypted_word, check_remove):
+        """
+        Removes the encrypted_word's potential_words where check_remove(letters_mask) is True,
+        unless none would be left
+        :return: True if any potential_words were removed
         """
-        Iterates through letters of the potential_word at indexes of the zero_list.
-        Checks that there are no duplicated letters at the indexes.
-        Builds a list of letters found
+        letters_masks = self.candidate_store.letters_masks
+        candidate_ids = self.candidate_ids_by_encrypted_word[encrypted_word]
+        kept_candidate_ids = array.array("i", [candidate_id for candidate_id in candidate_ids
+                                               if not check_remove(letters_masks[candidate_id])])
+        if len(kept_candidate_ids) == len(candidate_ids) or not kept_candidate_ids:
+            return False
+        self.candidate_ids_by_encrypted_word[encrypted_word] = kept_candidate_ids
+        instrumentation.increment("propagation_potential_words_removed",
+                                  len(candidate_ids) - len(kept_candidate_ids))
+        return True
 
-        :return: e.g. {"success": True, "letters_found":['a', 'p', 't']
-        """
-        letters_found = []
-        no_dupe_letters = True
-        for i in zeros_list:
-            letter = potential_word[i]
-            if letter not in letters_found:
-                letters_found.append(letter)
-            else:
-                no_dupe_letters = False
-        return {"success": no_dupe_letters, "letters_found":letters_found}
+    def get_letters_for_mask(self, letters_mask):
+        return [letter for letter in self.alphabet if letters_mask & self.letter_bits[letter]]
 
     def get_starting_and_unassigned_letters(self):
         """
-        iterates over self.potential_words_by_alpha_dict to find the no. of key-pair vals
-        of encrypted_words and potential_words for letters. If len is 0, is appended to
+        iterates over self.candidate_ids_by_letter to find the no. of candidates for letters. If len is 0, is appended to
         self.unassigned_letters. If len is 1, is is appended to self.starting_letters.
         The number of starting letters determines which letters will be decoded first,
         each time the EncryptedWordEncoder runs the self.get_decrypted_words_dict_for_epoch
@@ -71,7 +192,7 @@ class PotentialWordTracker():
          unassigned_letters are added to the list. They cannot be duplicated.
         """
         self.starting_letters = []
-        for k, v in self.potential_words_by_alpha_dict.items():
+        for k, v in self.candidate_ids_by_letter.items():
             if len(v) == 0:
                 self.unassigned_letters.append(k)
             if len(v) ==1:
@@ -0,0 +1,142 @@
+import random
+import lexicon_word_finder
+
+# Letters ordered by frequency in English, so smaller alphabets are made of letters that most words contain
+LETTERS_BY_FREQUENCY = "etaoinshrdlcumwfgypbvkjxqz"
+
+# Puzzle families of increasing difficulty, with more letters, more words, longer words and more zeros per word
+PUZZLE_FAMILIES = [
+    {"name": "easy", "alphabet_size": 10, "no_of_words": 5, "min_word_length": 4, "max_word_length": 6,
+     "min_zeros_per_word": 1, "max_zeros_per_word": 3},
+    {"name": "medium", "alphabet_size": 18, "no_of_words": 8, "min_word_length": 5, "max_word_length": 7,
+     "min_zeros_per_word": 1, "max_zeros_per_word": 3},
+    {"name": "standard", "alphabet_size": 26, "no_of_words": 10, "min_word_length": 5, "max_word_length": 7,
+     "min_zeros_per_word": 2, "max_zeros_per_word": 3},
+    {"name": "hard", "alphabet_size": 26, "no_of_words": 8, "min_word_length": 6, "max_word_length": 9,
+     "min_zeros_per_word": 2, "max_zeros_per_word": 4},
+    {"name": "very_hard", "alphabet_size": 26, "no_of_words": 7, "min_word_length": 7, "max_word_length": 10,
+     "min_zeros_per_word": 3, "max_zeros_per_word": 5}]
+
+
+def get_alphabet(alphabet_size):
+    """
+    :return: e.g. 10 -> ['a', 'd', 'e', 'h', 'i', 'n', 'o', 'r', 's', 't']
+    """
+    return sorted(LETTERS_BY_FREQUENCY[:alphabet_size])
+
+
+class PuzzleGenerator():
+    """
+    Generates alphabet soup puzzles from a word list, so the word finders and decoders can be
+    measured on puzzles other than the original 10 encrypted_words. As in the original puzzle,
+    every letter of the alphabet substitutes exactly one zero across the encrypted_words, and
+    letters which are not zeros are shown in the encrypted_words.
+
+    Words are chosen for the rarest letter still to be placed first, as rare letters have the fewest
+    words to choose from. If a puzzle cannot be completed, generation restarts, up to max_attempts.
+    """
+    def __init__(self, word_list_path=None, seed=None, max_attempts=1000):
+        """
+        :param word_list_path: Optional path to a whitespace separated word list.
+        Defaults to the pyspellchecker English dictionary, as for the LexiconWordFinder
+        :param seed: Seed for the generator's own random.Random, so puzzles are repeatable
+        """
+        self.words_by_length = lexicon_word_finder.get_lexicon(word_list_path).words_by_length
+        self.random = random.Random(seed)
+        self.max_attempts = max_attempts
+
+    def get_puzzle_dicts_for_families(self, puzzle_families=None):
+        """
+        :return: a puzzle_dict for each family, e.g. PUZZLE_FAMILIES
+        """
+        if puzzle_families is None:
+            puzzle_families = PUZZLE_FAMILIES
+        return [self.get_puzzle_dict(**puzzle_family) for puzzle_family in puzzle_families]
+
+    def get_puzzle_dict(self, name=None, alphabet_size=26, no_of_words=10, min_word_length=5, max_word_length=7,
+                        min_zeros_per_word=1, max_zeros_per_word=4):
+        """
+        :return: e.g. {"name": "standard", "alphabet": ['a', 'b', ...],
+                       "encrypted_words": ['0ri0t', '0ala00', ...],
+                       "answers_dict": {'0ri0t': 'wrist', '0ala00': 'galaxy', ...}}
+        """
+        if not no_of_words * min_zeros_per_word <= alphabet_size <= no_of_words * max_zeros_per_word:
+            raise ValueError("alphabet_size must be between no_of_words * min_zeros_per_word "
+                             "and no_of_words * max_zeros_per_word")
+        alphabet = get_alphabet(alphabet_size)
+        words = [word for length in range(min_word_length, max_word_length + 1)
+                 for word in self.words_by_length.get(length, ()) if word.isascii()]
+        words.sort()
+        words_by_letter = self.get_words_by_letter(words, alphabet)
+        missing_letters = [letter for letter, letter_words in words_by_letter.items() if not letter_words]
+        if missing_letters:
+            raise ValueError("No words of length {} to {} contain {}".format(min_word_length, max_word_length,
+                                                                             missing_letters))
+        for attempt in range(self.max_attempts):
+            zeros_counts = self.get_zeros_counts(alphabet_size, no_of_words, min_zeros_per_word,
+                                                 max_zeros_per_word)
+            answers_dict = self.get_answers_dict(alphabet, words_by_letter, zeros_counts)
+            if answers_dict is not None:
+                return {"name": name, "alphabet": alphabet, "encrypted_words": list(answers_dict),
+                        "answers_dict": answers_dict}
+        raise ValueError("Could not generate a puzzle in {} attempts. Try a larger word list "
+                         "or a wider range of word lengths".format(self.max_attempts))
+
+    def get_words_by_letter(self, words, alphabet):
+        """
+        :return: e.g. {'a': ['balaga', 'galaxy', ...], 'b': ['braved', 'zebra', ...], ...}
+        """
+        words_by_letter = {letter: [] for letter in alphabet}
+        for word in words:
+            for letter in set(word):
+                if letter in words_by_letter:
+                    words_by_letter[letter].append(word)
+        return words_by_letter
+
+    def get_zeros_counts(self, alphabet_size, no_of_words, min_zeros_per_word, max_zeros_per_word):
+        """
+        Randomly distributes one zero per letter of the alphabet across the words
+        :return: e.g. 26 letters across 10 words -> [4, 3, 3, 3, 3, 2, 2, 2, 2, 2]
+        """
+        zeros_counts = [min_zeros_per_word] * no_of_words
+        for x in range(alphabet_size - min_zeros_per_word * no_of_words):
+            i = self.random.choice([i for i, zeros_count in enumerate(zeros_counts)
+                                    if zeros_count < max_zeros_per_word])
+            zeros_counts[i] += 1
+        return sorted(zeros_counts, reverse=True)
+
+    def get_answers_dict(self, alphabet, words_by_letter, zeros_counts):
+        """
+        :return: {encrypted_word: word}, or None if a word could not be found for one of the zeros_counts
+        """
+        unassigned_letters = set(alphabet)
+        answers_dict = {}
+        for zeros_count in zeros_counts:
+            rarest_letter = min(sorted(unassigned_letters),
+                                key=lambda letter: len(words_by_letter[letter]))
+            candidate_words = [word for word in words_by_letter[rarest_letter]
+                               if word not in answers_dict.values()
+                               and len(unassigned_letters.intersection(word)) >= zeros_count]
+            self.random.shuffle(candidate_words)
+            for word in candidate_words:
+                encrypted_word = self.get_encrypted_word(word, rarest_letter, unassigned_letters, zeros_count)
+                if encrypted_word not in answers_dict:
+                    break
+            else:
+                return None
+            answers_dict[encrypted_word] = word
+            unassigned_letters.difference_update(word[i] for i, letter in enumerate(encrypted_word)
+                                                 if letter == "0")
+        return answers_dict
+
+    def get_encrypted_word(self, word, rarest_letter, unassigned_letters, zeros_count):
+        """
+        Replaces one occurrence each of the rarest_letter and zeros_count - 1 other unassigned letters with zeros
+        :return: e.g. 'wrist', 'w', {'w', 's', ...}, 2 -> '0ri0t'
+        """
+        other_letters = sorted(unassigned_letters.intersection(word) - {rarest_letter})
+        zero_letters = [rarest_letter] + self.random.sample(other_letters, zeros_count - 1)
+        split_word = list(word)
+        for letter in zero_letters:
+            split_word[self.random.choice([i for i, x in enumerate(word) if x == letter])] = "0"
+        return "".join(split_word)
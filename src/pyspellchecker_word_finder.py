@@ -1,5 +1,6 @@
 import random
-from spellchecker import SpellChecker
+import dictionary_provider
+import instrumentation
 
 class PyspellcheckerWordFinder():
     """
@@ -23,7 +24,7 @@ class PyspellcheckerWordFinder():
         self.alphabet = alphabet
         self.zeros_list = self.get_zeros_indexes()
         self.split_word = list(self.encrypted_word)
-        self.spell_checker = SpellChecker()
+        self.spell_checker = dictionary_provider.get_spell_checker()
         self.no_of_random_letters = kwargs.get('no_of_random_letters')
 
     def get_zeros_indexes(self):
@@ -71,6 +72,7 @@ class PyspellcheckerWordFinder():
         based on creating test_words based on substituting zeros in the encrypted_word
         """
         proxy_word_list = []
+        instrumentation.increment("spellcheck_calls")
         proxy_word_list.extend(self.spell_checker.candidates(self.encrypted_word))
         test_words_proxy_words_list = self.get_proxy_words_for_test_words()
         proxy_word_list.extend(test_words_proxy_words_list)
@@ -80,6 +82,7 @@ class PyspellcheckerWordFinder():
         test_words_list = self.get_test_words()
         test_words_proxy_words_list = []
         for test_word in test_words_list:
+            instrumentation.increment("spellcheck_calls")
             test_words_proxy_words_list.extend(self.spell_checker.candidates(test_word))
         return test_words_proxy_words_list
 
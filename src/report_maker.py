@@ -1,7 +1,8 @@
-import pprint
+import array
 
-import statistics
-import os
+import numpy as np
+import report_writer
+from timeit import default_timer as timer
 
 class ReportMaker():
     def __init__(self, answers_dict, decrypted_words_dict_collection, text_blob_params_dict,
@@ -13,15 +14,24 @@ class ReportMaker():
         self.time_taken_in_seconds = time_taken_in_seconds
         self.word_finder_name = word_finder_name
         self.no_of_random_letters = no_of_random_letters
+        self.report_path = '../reports/alphabet_soup_report.jsonl'
+        self.word_decoder_name = None
+        self.puzzle_name = None
+        self.config_key = None
+        self.instrumentation_metrics_dict = {}
+        self.profile_path = None
+        self.result_dict_for_runs = None
 
     def execute_report_maker(self):
-        pp = pprint.PrettyPrinter(width=41, compact=True)
-        pp.pprint(self.decrypted_words_dict_collection)
         result_dict_for_runs = self.get_result_dict_for_runs()
         list_of_percentage_of_words_correct_for_runs = result_dict_for_runs["list_of_percentage_of_words_correct_for_runs"]
         self.get_report_for_each_run(list_of_percentage_of_words_correct_for_runs)
         summary_report_dict_for_runs = self.get_summary_report_dict_for_runs(result_dict_for_runs)
-        self.write_report_to_csv(summary_report_dict_for_runs)
+        start = timer()
+        self.write_report(summary_report_dict_for_runs)
+        end = timer()
+        if self.profile_path:
+            self.write_profile(end-start)
         self.get_best_accuracy_report(summary_report_dict_for_runs)
 
     def get_summary_report_dict_for_runs(self, result_dict_for_runs):
@@ -30,16 +40,21 @@ class ReportMaker():
         standard_deviation and median are in relation to list_of_percentage_of_words_correct_for_runs
         and are represents as %. Standard dev would represent % points.
         """
-        list_of_percentage_of_words_correct_for_runs = \
-            result_dict_for_runs["list_of_percentage_of_words_correct_for_runs"]
-        mean_accuracy = statistics.mean(list_of_percentage_of_words_correct_for_runs)*100
-        standard_dev = statistics.stdev(list_of_percentage_of_words_correct_for_runs)*100
-        median = statistics.median(list_of_percentage_of_words_correct_for_runs)*100
+        accuracies = result_dict_for_runs["accuracies"]
+        mean_accuracy = 0
+        standard_dev = 0
+        median = 0
+        if len(accuracies):
+            mean_accuracy = float(accuracies.mean())*100
+            median = float(np.median(accuracies))*100
+        if len(accuracies) > 1:
+            standard_dev = float(accuracies.std(ddof=1))*100
         print("Overall mean accuracy: {}%".format(round(mean_accuracy,2)))
         print("Standard deviation: {}% pts".format(round(standard_dev,2)))
         print("Median: {}%".format(median))
         return {"mean_accuracy": mean_accuracy, "standard_dev": standard_dev, "median": median,
-                "no_of_runs": len(list_of_percentage_of_words_correct_for_runs),
+                "no_of_runs": len(accuracies),
+                "word_accuracy_dict": result_dict_for_runs["word_accuracy_dict"],
                 "best_accuracy":result_dict_for_runs["best_accuracy"]*100,
                 "best_decrypted_word_dict": result_dict_for_runs["best_decrypted_word_dict"]}
 
@@ -51,69 +66,114 @@ class ReportMaker():
             counter += 1
 
     def get_result_dict_for_runs(self):
-        list_of_percentage_of_words_correct_for_runs = []
+        """
+        The decrypted_words_dict_collection may be a list or a stream such as
+        EncryptedWordDecoder.generate_decrypted_words_dicts(). It is consumed once, encoding
+        each decrypted_words_dict as a row of word ids (see get_word_ids_matrix), and only the
+        best decrypted_words_dict is kept. Accuracy for each run and hit rates for each encrypted word
+        are then computed with NumPy. word_accuracy_dict e.g. {'0ri0t': 0.35, '0ala00': 1.0, ...}
+        is the proportion of runs where the encrypted_word was decrypted correctly.
+        """
+        if self.result_dict_for_runs is not None:
+            return self.result_dict_for_runs
+        word_ids_matrix_result_dict = self.get_word_ids_matrix_result_dict()
+        correct_matrix = word_ids_matrix_result_dict["word_ids_matrix"] == 0
         no_of_words = len(self.answers_dict)
+        if len(correct_matrix):
+            accuracies = correct_matrix.sum(axis=1) / no_of_words
+            word_accuracies = correct_matrix.mean(axis=0)
+        else:
+            accuracies = np.zeros(0)
+            word_accuracies = np.zeros(no_of_words)
         best_accuracy = 0
+        if len(accuracies):
+            best_accuracy = float(accuracies.max())
+        word_accuracy_dict = {encrypted_word: float(word_accuracy) for encrypted_word, word_accuracy
+                              in zip(self.answers_dict, word_accuracies)}
+        self.result_dict_for_runs = {"list_of_percentage_of_words_correct_for_runs": accuracies.tolist(),
+                                     "accuracies": accuracies,
+                                     "word_accuracy_dict": word_accuracy_dict,
+                                     "best_accuracy":best_accuracy,
+                                     "best_decrypted_word_dict":word_ids_matrix_result_dict["best_decrypted_word_dict"]}
+        self.decrypted_words_dict_collection = None
+        return self.result_dict_for_runs
+
+    def get_word_ids_matrix_result_dict(self):
+        """
+        Each decrypted word is given an id per encrypted word, where the correct word has id 0.
+        The best decrypted_words_dict is the first with the most correct words, if any are correct.
+        :return: e.g. {"word_ids_matrix": array([[0, 1, 0, ...], [2, 0, 0, ...]]),
+                       "best_decrypted_word_dict": {'0ri0t': 'wrist', ...}}
+        """
+        encrypted_words = list(self.answers_dict)
+        word_ids_dicts = [{correct_word: 0} for correct_word in self.answers_dict.values()]
+        word_ids = array.array('i')
+        most_correct_words = 0
         best_decrypted_word_dict = None
         for decrypted_words_dict in self.decrypted_words_dict_collection:
-            counter = 0
-            for encrypted_word, correct_word in self.answers_dict.items():
-                if decrypted_words_dict[encrypted_word] == correct_word:
-                    counter += 1
-            accuracy = counter / no_of_words
-            if accuracy > best_accuracy:
-                best_accuracy=accuracy
-                best_decrypted_word_dict=decrypted_words_dict
-            list_of_percentage_of_words_correct_for_runs.append(accuracy)
-        return {"list_of_percentage_of_words_correct_for_runs":list_of_percentage_of_words_correct_for_runs,
-                "best_accuracy":best_accuracy, "best_decrypted_word_dict":best_decrypted_word_dict}
+            correct_words = 0
+            for column, encrypted_word in enumerate(encrypted_words):
+                word_ids_dict = word_ids_dicts[column]
+                word_id = word_ids_dict.setdefault(decrypted_words_dict[encrypted_word], len(word_ids_dict))
+                word_ids.append(word_id)
+                if word_id == 0:
+                    correct_words += 1
+            if correct_words > most_correct_words:
+                most_correct_words = correct_words
+                best_decrypted_word_dict = decrypted_words_dict
+        word_ids_matrix = np.frombuffer(word_ids, dtype=np.intc) if word_ids else np.zeros(0, dtype=np.intc)
+        return {"word_ids_matrix": word_ids_matrix.reshape(-1, len(encrypted_words)),
+                "best_decrypted_word_dict": best_decrypted_word_dict}
 
-    def write_report_to_csv(self, summary_report_dict_for_runs):
-        file_path= '../reports/alphabet_soup_report.csv'
-        metrics_line_for_csv = self.get_metrics_line_for_csv(summary_report_dict_for_runs)
-
-        if os.path.exists(file_path):
-            report_writer = open(file_path, 'a')
-            report_writer.write(metrics_line_for_csv)
-            report_writer.close()
-        else:
-            report_writer = open(file_path, 'w')
-            first_line = "no_of_runs,mean_accuracy,standard_dev,median,word_decoder_max_epochs," \
-                         "word_finder_min_iters_per_epoch,word_finder_min_potential_words,word_finder_max_epochs," \
-                         "word_finder_max_attempts,no_of_random_letters,time_taken_in_seconds,word_finder_name," \
-                         "best_accuracy,best_decrypted_word_dict"
-            lines = first_line+metrics_line_for_csv
-            report_writer.write(lines)
-            report_writer.close()
-        print("Written report to csv")
+    def write_report(self, summary_report_dict_for_runs):
+        """
+        The report format (CSV, JSON Lines or Parquet) follows the extension of self.report_path.
+        See ReportWriter for how rows are appended.
+        """
+        metrics_dict_for_report = self.get_metrics_dict_for_report(summary_report_dict_for_runs)
+        report_writer.ReportWriter(self.report_path).append_row(metrics_dict_for_report)
+        print("Written report to", self.report_path)
 
-    def get_metrics_line_for_csv(self, summary_report_dict_for_runs):
-        no_of_runs = summary_report_dict_for_runs['no_of_runs']
-        mean_accuracy = summary_report_dict_for_runs['mean_accuracy']
-        standard_dev = summary_report_dict_for_runs['standard_dev']
-        median = summary_report_dict_for_runs['median']
-        word_finder_min_iters_per_epoch = self.text_blob_params_dict["min_iters_per_epoch"]
-        word_finder_min_potential_words = self.text_blob_params_dict["min_potential_words"]
-        word_finder_max_epochs = self.text_blob_params_dict["max_epochs"]
-        word_finder_max_attempts = self.text_blob_params_dict["max_attempts"]
-        best_accuracy=summary_report_dict_for_runs["best_accuracy"]
-        best_decrypted_word_dict=summary_report_dict_for_runs["best_decrypted_word_dict"]
+    def get_metrics_dict_for_report(self, summary_report_dict_for_runs):
+        metrics_dict_for_report = {"no_of_runs": summary_report_dict_for_runs['no_of_runs'],
+                                   "mean_accuracy": summary_report_dict_for_runs['mean_accuracy'],
+                                   "standard_dev": summary_report_dict_for_runs['standard_dev'],
+                                   "median": summary_report_dict_for_runs['median']}
+        for encrypted_word, word_accuracy in summary_report_dict_for_runs["word_accuracy_dict"].items():
+            metrics_dict_for_report["word_accuracy_" + encrypted_word] = word_accuracy*100
+        metrics_dict_for_report.update({
+            "word_decoder_max_epochs": self.word_decoder_max_epochs,
+            "word_finder_min_iters_per_epoch": self.text_blob_params_dict["min_iters_per_epoch"],
+            "word_finder_min_potential_words": self.text_blob_params_dict["min_potential_words"],
+            "word_finder_max_epochs": self.text_blob_params_dict["max_epochs"],
+            "word_finder_max_attempts": self.text_blob_params_dict["max_attempts"],
+            "no_of_random_letters": self.no_of_random_letters,
+            "time_taken_in_seconds": self.time_taken_in_seconds,
+            **self.instrumentation_metrics_dict,
+            "word_finder_name": self.word_finder_name,
+            "word_decoder_name": self.word_decoder_name,
+            "puzzle_name": self.puzzle_name,
+            "config_key": self.config_key,
+            "best_accuracy": summary_report_dict_for_runs["best_accuracy"],
+            "best_decrypted_word_dict": summary_report_dict_for_runs["best_decrypted_word_dict"]})
+        return metrics_dict_for_report
 
-        line_for_csv = "\n{},{},{},{},{},{},{},{},{},{},{},{},{},{}".format(no_of_runs,
-                                                                          mean_accuracy,
-                                                                          standard_dev,
-                                                                          median,
-                                                                          self.word_decoder_max_epochs,
-                                                                          word_finder_min_iters_per_epoch,
-                                                                          word_finder_min_potential_words,
-                                                                          word_finder_max_epochs,
-                                                                          word_finder_max_attempts,
-                                                                          self.no_of_random_letters,
-                                                                          self.time_taken_in_seconds,
-                                                                          self.word_finder_name,
-                                                                          best_accuracy,
-                                                                          best_decrypted_word_dict)
-        return line_for_csv
+    def write_profile(self, report_write_time_in_seconds):
+        """
+        Appends the per stage timers and counters for this run to self.profile_path,
+        along with the parameters identifying the run
+        """
+        profile_dict = {"word_finder_name": self.word_finder_name,
+                        "word_decoder_name": self.word_decoder_name,
+                        "puzzle_name": self.puzzle_name,
+                        "word_decoder_max_epochs": self.word_decoder_max_epochs,
+                        "no_of_random_letters": self.no_of_random_letters,
+                        "time_taken_in_seconds": self.time_taken_in_seconds}
+        for k, v in self.text_blob_params_dict.items():
+            profile_dict["word_finder_" + k] = v
+        profile_dict.update(self.instrumentation_metrics_dict)
+        profile_dict["time_report_write"] = report_write_time_in_seconds
+        report_writer.ReportWriter(self.profile_path).append_row(profile_dict)
 
     def get_best_accuracy_report(self, summary_report_dict_for_runs):
         no_of_runs = summary_report_dict_for_runs["no_of_runs"]
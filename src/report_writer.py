@@ -0,0 +1,313 @@
+import ast
+import csv
+import io
+import json
+import os
+import time
+
+REPORT_FORMATS = ("csv", "jsonl", "parquet")
+# Part files of a level a Parquet report may have before they are compacted into one part of the next level
+MAX_PARQUET_PARTS = 64
+# Lists the compacted parts of a Parquet report and the parts they replace
+PARQUET_MANIFEST_NAME = "_manifest.json"
+COMPACTED_MARK = "-compacted-"
+# A compaction lock older than this is left from a process which stopped while compacting
+STALE_LOCK_SECONDS = 600
+
+
+class ReportWriter():
+    """
+    Appends rows of metrics to a report in one of the REPORT_FORMATS, inferred from the report_path extension.
+    Nested fields such as best_decrypted_word_dict are stored properly: as a JSON object in JSON Lines,
+    and as a JSON string in CSV and Parquet, so every Parquet part has the same string column whatever
+    the dict holds, or if it is None. This means reports can be read with read_report directly,
+    without the CSVReportFixer.
+
+    Appends are atomic. CSV and JSON Lines rows are written with a single write to a file opened
+    in append mode, so rows from several processes are never interleaved. As Parquet files cannot be
+    appended to, a Parquet report is a directory where each row is written to a new part file,
+    which is renamed into place once complete. Once there are MAX_PARQUET_PARTS part files,
+    the process which wrote the last one compacts them into a single part, see compact_parquet_parts.
+    """
+    def __init__(self, report_path, report_format=None):
+        self.report_path = report_path
+        self.report_format = report_format or self.get_report_format(report_path)
+        if self.report_format not in REPORT_FORMATS:
+            raise ValueError("report_format should be one of {}".format(REPORT_FORMATS))
+
+    def get_report_format(self, report_path):
+        return os.path.splitext(report_path)[1].lstrip(".").lower()
+
+    def append_row(self, row_dict):
+        if self.report_format == "csv":
+            self.append_csv_row(row_dict)
+        elif self.report_format == "jsonl":
+            self.append_text(json.dumps(row_dict) + "\n")
+        else:
+            self.append_parquet_row(row_dict)
+
+    def append_text(self, text):
+        file_descriptor = os.open(self.report_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(file_descriptor, text.encode("utf-8"))
+        finally:
+            os.close(file_descriptor)
+
+    def append_csv_row(self, row_dict):
+        """
+        The header is written by whichever process creates the file. If the report already exists,
+        values follow the columns of its header, so older reports can still be appended to.
+        A ValueError is raised if the row has columns which are not in the header, e.g. per word accuracies
+        of another puzzle or instrumentation metrics, rather than dropping them. Such rows should be written
+        to a new report, or to a JSON Lines or Parquet report, which allow columns to differ between rows.
+        """
+        columns = self.get_csv_columns()
+        if columns is None:
+            columns = list(row_dict)
+            if not self.create_csv_with_header(columns):
+                columns = self.get_csv_columns()
+        missing_columns = [column for column in row_dict if column not in columns]
+        if missing_columns:
+            raise ValueError("Columns {} are not in the header of {}".format(missing_columns, self.report_path))
+        lines = io.StringIO()
+        if not self.check_ends_with_newline():
+            lines.write("\n")
+        csv_writer = csv.writer(lines, lineterminator="\n")
+        csv_writer.writerow([self.get_csv_value(row_dict.get(column, "")) for column in columns])
+        self.append_text(lines.getvalue())
+
+    def create_csv_with_header(self, columns):
+        """
+        :return: False if another process created the report first
+        """
+        lines = io.StringIO()
+        csv.writer(lines, lineterminator="\n").writerow(columns)
+        try:
+            file_descriptor = os.open(self.report_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        try:
+            os.write(file_descriptor, lines.getvalue().encode("utf-8"))
+        finally:
+            os.close(file_descriptor)
+        return True
+
+    def check_ends_with_newline(self):
+        """
+        Reports written before the ReportWriter do not end with a newline
+        """
+        with open(self.report_path, "rb") as report_reader:
+            report_reader.seek(0, os.SEEK_END)
+            if report_reader.tell() == 0:
+                return True
+            report_reader.seek(-1, os.SEEK_END)
+            return report_reader.read(1) == b"\n"
+
+    def get_csv_columns(self):
+        try:
+            with open(self.report_path, newline="") as report_reader:
+                return next(csv.reader(report_reader), None)
+        except FileNotFoundError:
+            return None
+
+    def get_csv_value(self, value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def append_parquet_row(self, row_dict):
+        import pandas as pd
+        os.makedirs(self.report_path, exist_ok=True)
+        part_name = "part-{}-{}.parquet".format(time.time_ns(), os.getpid())
+        part_path = os.path.join(self.report_path, part_name)
+        temp_path = os.path.join(self.report_path, "." + part_name + ".tmp")
+        row_dict = {column: self.get_csv_value(value) for column, value in row_dict.items()}
+        pd.DataFrame([row_dict]).to_parquet(temp_path, index=False)
+        os.replace(temp_path, part_path)
+        manifest_dict = self.read_parquet_manifest()
+        if len(self.get_part_names_for_level(self.get_parquet_part_names(manifest_dict), manifest_dict, 0)) >= \
+                MAX_PARQUET_PARTS:
+            self.compact_parquet_parts()
+
+    def read_parquet_manifest(self):
+        """
+        :return: e.g. {"version": 3, "parts": {"part-1700000000000000000-4242-compacted-1.parquet":
+                                                {"level": 1, "replaced": []}, ...}}
+        where parts are the compacted parts which are complete, and replaced the parts each compacted part
+        holds the rows of which have not been removed yet
+        """
+        try:
+            with open(os.path.join(self.report_path, PARQUET_MANIFEST_NAME)) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {"version": 0, "parts": {}}
+
+    def write_parquet_manifest(self, manifest_dict):
+        manifest_dict["version"] += 1
+        manifest_path = os.path.join(self.report_path, PARQUET_MANIFEST_NAME)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w") as manifest_file:
+            json.dump(manifest_dict, manifest_file)
+        os.replace(temp_path, manifest_path)
+
+    def get_parquet_part_names(self, manifest_dict):
+        """
+        :return: names of the part files holding the report's rows according to the manifest_dict, oldest first.
+        Temporary files start with ".", parts which have been replaced by a compacted part are left out,
+        and so are compacted parts which are not in the manifest yet
+        """
+        replaced_part_names = set()
+        for part_dict in manifest_dict["parts"].values():
+            replaced_part_names.update(part_dict["replaced"])
+        part_names = []
+        for part_name in sorted(os.listdir(self.report_path)):
+            if not part_name.startswith("part-") or not part_name.endswith(".parquet"):
+                continue
+            if part_name in replaced_part_names:
+                continue
+            if COMPACTED_MARK in part_name and part_name not in manifest_dict["parts"]:
+                continue
+            part_names.append(part_name)
+        return part_names
+
+    def get_part_names_for_level(self, part_names, manifest_dict, level):
+        """
+        Parts written by append_parquet_row are level 0, and a part compacted from parts of level n is level n + 1
+        """
+        return [x for x in part_names if manifest_dict["parts"].get(x, {"level": 0})["level"] == level]
+
+    def get_parquet_part_paths(self):
+        """
+        :return: paths of the part files holding the report's rows, oldest first. The manifest is read
+        before and after listing the parts, and again if a compaction changed it in between, so the
+        parts listed always hold every row once
+        """
+        manifest_dict = self.read_parquet_manifest()
+        while True:
+            part_names = self.get_parquet_part_names(manifest_dict)
+            next_manifest_dict = self.read_parquet_manifest()
+            if next_manifest_dict["version"] == manifest_dict["version"]:
+                return [os.path.join(self.report_path, x) for x in part_names]
+            manifest_dict = next_manifest_dict
+
+    def compact_parquet_parts(self):
+        """
+        Tiered compaction: once there are MAX_PARQUET_PARTS parts of a level, they are compacted into one part
+        of the next level, and so on, so each row is only rewritten once per level rather than every time
+        parts are compacted. A lock file stops two processes compacting at once, and other writers skip
+        compaction while it is held.
+        A compacted part is only used by readers once it is added to the manifest, together with the parts it
+        replaces, which are removed afterwards. So read_report never misses a row or sees one twice.
+        """
+        lock_path = os.path.join(self.report_path, ".compact.lock")
+        try:
+            if time.time() - os.stat(lock_path).st_mtime > STALE_LOCK_SECONDS:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            return
+        try:
+            manifest_dict = self.read_parquet_manifest()
+            self.remove_replaced_parquet_parts(manifest_dict)
+            level = 0
+            while True:
+                part_names = self.get_part_names_for_level(self.get_parquet_part_names(manifest_dict),
+                                                           manifest_dict, level)
+                if len(part_names) < MAX_PARQUET_PARTS:
+                    break
+                self.compact_parquet_parts_for_level(part_names, manifest_dict, level)
+                level += 1
+        finally:
+            os.remove(lock_path)
+
+    def compact_parquet_parts_for_level(self, part_names, manifest_dict, level):
+        # Named after the newest part replaced, so parts stay in the order their rows were written
+        part_name = "-".join(part_names[-1][:-len(".parquet")].split("-")[:3]) + \
+                    "{}{}.parquet".format(COMPACTED_MARK, level + 1)
+        temp_path = os.path.join(self.report_path, "." + part_name + ".tmp")
+        part_paths = [os.path.join(self.report_path, x) for x in part_names]
+        self.read_parquet_parts(part_paths).to_parquet(temp_path, index=False)
+        os.replace(temp_path, os.path.join(self.report_path, part_name))
+        for replaced_part_name in part_names:
+            manifest_dict["parts"].pop(replaced_part_name, None)
+        manifest_dict["parts"][part_name] = {"level": level + 1, "replaced": part_names}
+        self.write_parquet_manifest(manifest_dict)
+        self.remove_replaced_parquet_parts(manifest_dict)
+
+    def remove_replaced_parquet_parts(self, manifest_dict):
+        """
+        Removes parts replaced by compacted parts, and compacted parts which were not added to the manifest,
+        e.g. by a process which stopped while compacting
+        """
+        changed = False
+        for part_dict in manifest_dict["parts"].values():
+            for part_name in part_dict["replaced"]:
+                try:
+                    os.remove(os.path.join(self.report_path, part_name))
+                except FileNotFoundError:
+                    pass
+            changed = changed or bool(part_dict["replaced"])
+            part_dict["replaced"] = []
+        for part_name in os.listdir(self.report_path):
+            if part_name.startswith("part-") and COMPACTED_MARK in part_name and \
+                    part_name not in manifest_dict["parts"]:
+                os.remove(os.path.join(self.report_path, part_name))
+        if changed:
+            self.write_parquet_manifest(manifest_dict)
+
+    def read_parquet_parts(self, part_paths):
+        """
+        Parts are read one at a time and concatenated, so columns missing from some parts,
+        e.g. instrumentation metrics, are filled with NaN rather than dropped
+        """
+        import pandas as pd
+        part_dfs = [pd.read_parquet(part_path) for part_path in part_paths]
+        if not part_dfs:
+            return pd.DataFrame()
+        return pd.concat(part_dfs, ignore_index=True)
+
+    def read_report(self):
+        """
+        :return: a pandas DataFrame with one row per report row.
+        best_decrypted_word_dict values are returned as dictionaries.
+        CSV reports written before the ReportWriter must first be fixed with the CSVReportFixer.
+        """
+        import pandas as pd
+        if self.report_format == "jsonl":
+            return pd.read_json(self.report_path, lines=True, precise_float=True)
+        if self.report_format == "parquet":
+            report_df = self.read_parquet_report()
+        else:
+            report_df = pd.read_csv(self.report_path)
+        if "best_decrypted_word_dict" in report_df.columns:
+            report_df["best_decrypted_word_dict"] = report_df["best_decrypted_word_dict"].map(parse_dict_value)
+        return report_df
+
+
+    def read_parquet_report(self):
+        """
+        Parts can be removed by a compaction after they are listed, in which case they are listed again
+        """
+        if not os.path.isdir(self.report_path):
+            raise FileNotFoundError("No Parquet report at {}".format(self.report_path))
+        while True:
+            try:
+                return self.read_parquet_parts(self.get_parquet_part_paths())
+            except FileNotFoundError:
+                continue
+
+
+def parse_dict_value(value):
+    """
+    Parses JSON strings written by the ReportWriter, and Python dict reprs from reports fixed by the CSVReportFixer.
+    Missing values, e.g. NaN, are returned as None
+    """
+    if not isinstance(value, str):
+        return value if isinstance(value, dict) else None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
@@ -0,0 +1,152 @@
+import math
+import random
+import sweep_checkpoint
+
+# Params which are scaled by the budget of a rung: decoder epochs and word finder iterations
+BUDGET_PARAMS = ("word_decoder_max_epochs", "min_iters_per_epoch", "max_epochs")
+
+
+class SuccessiveHalvingSearch():
+    """
+    Adaptive alternative to the Experimenter's sweeps, which change one parameter at a time from the control.
+    no_of_configs configurations are sampled from every combination of the param_lists_dict and run with
+    a small fraction of their budget, i.e. with their decoder epochs and word finder iterations
+    (BUDGET_PARAMS) scaled down. Only the best 1/eta by mean accuracy per second of runtime are kept
+    for the next rung, which has eta times the budget, until the last rung runs the remaining
+    configurations with their full budget. Each run is written to the Experimenter's report as usual.
+
+    As configurations are ranked by their runtime, each must pay the same word finder cost. The word finder
+    cache is turned off while searching, otherwise configurations sharing word finder params after scaling
+    would reuse the results of whichever ran first. One-off loading, e.g. of dictionaries, word lists and
+    word frequencies, is done by warm_up before any configuration is timed.
+    """
+    def __init__(self, experimenter_cls, word_finder, param_lists_dict, no_of_configs=27, eta=3, min_budget=1/9,
+                 seed=None):
+        """
+        :param param_lists_dict: e.g. {"min_iters_per_epoch": [50, 75, 100], "word_decoder_max_epochs": [5, 10, 25],
+        "no_of_random_letters": [5, 10]}. Fields of the Experimenter's text_blob_params_dict may be used, along with
+        word_decoder_max_epochs and no_of_random_letters. Params not given keep the Experimenter's values
+        :param min_budget: Fraction of the full budget given to each configuration by the first rung
+        :param seed: Optional seed for sampling configurations
+        """
+        self.experimenter_cls = experimenter_cls
+        self.word_finder = word_finder
+        self.param_lists_dict = param_lists_dict
+        self.no_of_configs = no_of_configs
+        self.eta = eta
+        self.min_budget = min_budget
+        self.random = random.Random(seed)
+        self.rung_result_dicts = []
+
+    def execute(self):
+        """
+        :return: the result dict of the best configuration at its full budget, e.g.
+        {"params_dict": {"min_iters_per_epoch": 75, "word_decoder_max_epochs": 25, ...}, "budget": 1.0,
+         "mean_accuracy": 0.42, "time_taken_in_seconds": 3.1, "accuracy_per_second": 0.135}
+        """
+        experimenter_cls = self.experimenter_cls
+        use_word_finder_cache = experimenter_cls.use_word_finder_cache
+        pyspellchecker_no_of_random_letters = experimenter_cls.pyspellchecker_no_of_random_letters
+        experimenter_cls.use_word_finder_cache = False
+        try:
+            return self.get_best_result_dict()
+        finally:
+            experimenter_cls.use_word_finder_cache = use_word_finder_cache
+            experimenter_cls.pyspellchecker_no_of_random_letters = pyspellchecker_no_of_random_letters
+
+    def get_best_result_dict(self):
+        params_dicts = self.get_params_dicts()
+        budgets = self.get_budgets()
+        print("Searching {} configurations with budgets {}".format(len(params_dicts), budgets))
+        self.warm_up(params_dicts[0], budgets[0])
+        result_dicts = []
+        for rung, budget in enumerate(budgets):
+            if rung:
+                no_to_keep = max(1, len(result_dicts) // self.eta)
+                params_dicts = [result_dict["params_dict"] for result_dict in result_dicts[:no_to_keep]]
+            print("Rung {}: running {} configurations with budget {}".format(rung + 1, len(params_dicts), budget))
+            result_dicts = [self.get_result_dict_for_params_dict(params_dict, budget) for params_dict in params_dicts]
+            result_dicts.sort(key=lambda result_dict: result_dict["accuracy_per_second"], reverse=True)
+            self.rung_result_dicts.append(result_dicts)
+        best_result_dict = result_dicts[0]
+        print("Best configuration:", best_result_dict)
+        return best_result_dict
+
+    def get_params_dicts(self):
+        """
+        :return: up to no_of_configs distinct configurations, sampled from every combination of params
+        e.g. [{"min_iters_per_epoch": 75, "word_decoder_max_epochs": 25}, ...]
+        """
+        no_of_combinations = math.prod(len(param_list) for param_list in self.param_lists_dict.values())
+        indexes = self.random.sample(range(no_of_combinations), min(self.no_of_configs, no_of_combinations))
+        return [dict(zip(self.param_lists_dict, self.get_combination_for_index(index))) for index in indexes]
+
+    def get_combination_for_index(self, index):
+        """
+        :return: the combination of params at the index, in the order of itertools.product of the param lists
+        """
+        values = []
+        for param_list in reversed(list(self.param_lists_dict.values())):
+            index, i = divmod(index, len(param_list))
+            values.append(param_list[i])
+        return tuple(reversed(values))
+
+    def get_budgets(self):
+        """
+        :return: e.g. [0.111, 0.333, 1.0] for an eta of 3 and min_budget of 1/9
+        """
+        no_of_rungs = int(math.floor(math.log(1 / self.min_budget, self.eta) + 1e-9)) + 1
+        return [round(float(self.eta) ** -x, 3) for x in reversed(range(no_of_rungs))]
+
+    def get_params_dict_for_budget(self, params_dict, budget):
+        """
+        :return: e.g. {"min_iters_per_epoch": 25, "word_decoder_max_epochs": 3} for
+        {"min_iters_per_epoch": 75, "word_decoder_max_epochs": 10} and a budget of 1/3
+        """
+        return {name: max(1, round(value * budget)) if name in BUDGET_PARAMS and value else value
+                for name, value in params_dict.items()}
+
+    def warm_up(self, params_dict, budget):
+        """
+        Runs the word finder once, untimed and unreported, so the first configuration does not pay for loading
+        """
+        print("Warming up the word finder")
+        text_blob_params_dict = self.get_text_blob_params_dict_for_budget(params_dict, budget)
+        self.experimenter_cls.get_potential_words_dict_collection_for_word_finder(self.word_finder,
+                                                                                 text_blob_params_dict)
+
+    def get_text_blob_params_dict_for_budget(self, params_dict, budget):
+        """
+        Also sets the Experimenter's pyspellchecker_no_of_random_letters, if it is a param
+        """
+        experimenter_cls = self.experimenter_cls
+        budget_params_dict = self.get_params_dict_for_budget(params_dict, budget)
+        text_blob_params_dict = dict(experimenter_cls.text_blob_params_dict)
+        for field in text_blob_params_dict:
+            if field in budget_params_dict:
+                text_blob_params_dict[field] = budget_params_dict[field]
+        experimenter_cls.pyspellchecker_no_of_random_letters = budget_params_dict.get(
+            "no_of_random_letters", experimenter_cls.pyspellchecker_no_of_random_letters)
+        return text_blob_params_dict
+
+    def get_result_dict_for_params_dict(self, params_dict, budget):
+        experimenter_cls = self.experimenter_cls
+        text_blob_params_dict = self.get_text_blob_params_dict_for_budget(params_dict, budget)
+        word_decoder_max_epochs = self.get_params_dict_for_budget(params_dict, budget).get(
+            "word_decoder_max_epochs", max(1, round(experimenter_cls.word_decoder_max_epochs * budget)))
+        sweep_config = experimenter_cls.get_sweep_config(text_blob_params_dict, word_decoder_max_epochs,
+                                                         self.word_finder,
+                                                         experimenter_cls.pyspellchecker_no_of_random_letters)
+        config_dict = experimenter_cls.get_config_dict(sweep_config)
+        experimenter_cls.sweep_config_key = sweep_checkpoint.get_config_key(config_dict)
+        report_maker_cls = experimenter_cls.get_report_maker_for_params(text_blob_params_dict, word_decoder_max_epochs,
+                                                                        self.word_finder)
+        report_maker_cls.execute_report_maker()
+        accuracies = report_maker_cls.get_result_dict_for_runs()["accuracies"]
+        mean_accuracy = float(accuracies.mean()) if len(accuracies) else 0
+        time_taken_in_seconds = report_maker_cls.time_taken_in_seconds
+        return {"params_dict": params_dict,
+                "budget": budget,
+                "mean_accuracy": mean_accuracy,
+                "time_taken_in_seconds": time_taken_in_seconds,
+                "accuracy_per_second": mean_accuracy / max(time_taken_in_seconds, 1e-9)}
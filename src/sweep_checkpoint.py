@@ -0,0 +1,127 @@
+import hashlib
+import json
+import random
+import uuid
+import report_writer
+
+SWEEP_STARTED = "sweep_started"
+SWEEP_SEED = "sweep_seed"
+FINDER_STAGE_COMPLETED = "finder_stage_completed"
+CONFIG_COMPLETED = "config_completed"
+
+
+def get_config_key(config_dict):
+    """
+    :param config_dict: e.g. {"word_finder": "TextBlobWordFinder", "text_blob_params_dict": {...},
+                              "word_decoder_max_epochs": 75, "no_of_random_letters": 0, "seed": 2746317213, ...}
+    :return: e.g. '9c1e...' a sha256 hex digest, which is the same in every run and process
+    """
+    config_json = json.dumps(config_dict, sort_keys=True, default=str)
+    return hashlib.sha256(config_json.encode("utf-8")).hexdigest()
+
+
+class SweepCheckpoint():
+    """
+    Manifest of the progress of Experimenter sweeps, so a sweep which is stopped can be resumed
+    without repeating work. The manifest is a JSON Lines file of events, appended atomically by a
+    ReportWriter so worker processes can write to it as well, e.g.
+
+    {"event": "sweep_started", "sweep_id": "5f0c..."}
+    {"event": "sweep_seed", "sweep_id": "5f0c...", "seed": 2746317213}
+    {"event": "finder_stage_completed", "sweep_id": "5f0c...", "config_key": "9c1e...", "encrypted_word": "0ri0t",
+     "potential_words_dict": {"0ri0t": {"potential_words_list": [...], "zeros_list": [0, 3], "success": true}}}
+    {"event": "config_completed", "sweep_id": "5f0c...", "config_key": "9c1e...", "config_dict": {...}}
+
+    Every sweep has its own sweep_id, so a sweep is only skipped where it was run before if resume is True,
+    which continues the last sweep in the manifest. Otherwise a new sweep is started, so repeating a sweep,
+    e.g. to measure the variance of its results, runs every configuration again.
+    A configuration is completed once its row has been written to the report. Finder stages are the
+    potential_words_dicts of each encrypted_word, so a configuration stopped part way through its
+    word finder only finds the encrypted_words left. Lines cut short by the sweep being killed are ignored.
+    """
+    def __init__(self, manifest_path, resume=False):
+        self.manifest_path = manifest_path
+        self.sweep_id = None
+        self.seed = None
+        self.completed_config_keys = set()
+        self.finder_stages = {}
+        if resume:
+            self.load_manifest()
+        if self.sweep_id is None:
+            self.sweep_id = uuid.uuid4().hex
+            self.append_event({"event": SWEEP_STARTED})
+
+    def load_manifest(self):
+        """
+        Loads the progress of the last sweep in the manifest
+        """
+        event_dicts = []
+        try:
+            with open(self.manifest_path) as manifest_file:
+                for line in manifest_file:
+                    try:
+                        event_dict = json.loads(line)
+                    except ValueError:
+                        continue
+                    if event_dict.get("event") == SWEEP_STARTED:
+                        self.sweep_id = event_dict.get("sweep_id")
+                    event_dicts.append(event_dict)
+        except FileNotFoundError:
+            pass
+        if self.sweep_id is None:
+            return
+        finder_stages = {}
+        for event_dict in event_dicts:
+            if event_dict.get("sweep_id") != self.sweep_id:
+                continue
+            event = event_dict.get("event")
+            if event == SWEEP_SEED:
+                self.seed = event_dict["seed"]
+            elif event == FINDER_STAGE_COMPLETED:
+                finder_stages[(event_dict["config_key"], event_dict["encrypted_word"])] = \
+                    event_dict["potential_words_dict"]
+            elif event == CONFIG_COMPLETED:
+                self.completed_config_keys.add(event_dict["config_key"])
+        # Finder stages are only needed to resume configurations which were not completed
+        self.finder_stages = {key: potential_words_dict for key, potential_words_dict in finder_stages.items()
+                              if key[0] not in self.completed_config_keys}
+        print("Resuming sweep {}: {} configurations completed in {}".format(self.sweep_id,
+                                                                           len(self.completed_config_keys),
+                                                                           self.manifest_path))
+
+    def append_event(self, event_dict):
+        report_writer.ReportWriter(self.manifest_path, "jsonl").append_row(dict(event_dict, sweep_id=self.sweep_id))
+
+    def get_seed(self, seed=None):
+        """
+        :return: seed, or if it is None, the seed of the sweep being resumed so that its configurations
+        have the same keys. Otherwise the sweep is given a random seed, which is recorded.
+        """
+        if seed is None:
+            seed = self.seed
+        if seed is None:
+            seed = random.getrandbits(32)
+        if seed != self.seed:
+            self.seed = seed
+            self.append_event({"event": SWEEP_SEED, "seed": seed})
+        return seed
+
+    def check_config_completed(self, config_key):
+        return config_key in self.completed_config_keys
+
+    def mark_config_completed(self, config_key, config_dict=None):
+        self.append_event({"event": CONFIG_COMPLETED, "config_key": config_key, "config_dict": config_dict})
+        self.completed_config_keys.add(config_key)
+        self.finder_stages = {key: potential_words_dict for key, potential_words_dict in self.finder_stages.items()
+                              if key[0] != config_key}
+
+    def get_finder_stage(self, config_key, encrypted_word):
+        """
+        :return: the potential_words_dict found for the encrypted_word by the configuration, or None
+        """
+        return self.finder_stages.get((config_key, encrypted_word))
+
+    def mark_finder_stage_completed(self, config_key, encrypted_word, potential_words_dict):
+        self.append_event({"event": FINDER_STAGE_COMPLETED, "config_key": config_key,
+                           "encrypted_word": encrypted_word, "potential_words_dict": potential_words_dict})
+        self.finder_stages[(config_key, encrypted_word)] = potential_words_dict
@@ -1,5 +1,24 @@
 import random
-from textblob import Word as Textblob
+import dictionary_provider
+import instrumentation
+from functools import lru_cache
+
+PROXY_WORDS_MEMO_SIZE = 65536
+# Words with up to this many distinct test_words have them all enumerated in a shuffled order
+MAX_ENUMERATED_TEST_WORDS = 20000
+
+
+@lru_cache(maxsize=PROXY_WORDS_MEMO_SIZE)
+def get_memoized_proxy_words(test_word):
+    """
+    Spellchecking is the slowest step of the TextBlobWordFinder and the same test_words are
+    drawn many times across iterations, epochs, attempts and finder instances.
+    Results are kept in a bounded LRU memo shared by every instance in the process.
+    :return: e.g. (('wrist', 0.39), ('print', 0.29))
+    """
+    instrumentation.increment("spellcheck_calls")
+    suggest = dictionary_provider.get_text_blob_suggest()
+    return tuple(tuple(proxy_word) for proxy_word in suggest(test_word))
 
 class TextBlobWordFinder():
     """
@@ -31,6 +50,9 @@ class TextBlobWordFinder():
         self.alphabet = alphabet
         self.zeros_list = self.get_zeros_indexes()
         self.split_word = list(self.encrypted_word)
+        self.seen_test_words = set()
+        self.no_of_test_words = len(self.alphabet) ** len(self.zeros_list)
+        self.test_word_indexes = None
 
     def get_zeros_indexes(self):
         """
@@ -63,6 +85,10 @@ class TextBlobWordFinder():
         attempts = 1
         success = True
         while bool(potential_words_list) == False:
+            if self.check_all_test_words_seen():
+                success = False
+                print("All test words tried. No words found. results_dict['success']= False")
+                break
             print("Attempt(s):", attempts)
             potential_words_list = self.get_minimal_potential_words_list()
             attempts += 1
@@ -88,7 +114,7 @@ class TextBlobWordFinder():
             potential_words_list.extend(self.get_potential_words_list_for_epoch(self.min_iters_per_epoch))
             potential_words_list = list(set(potential_words_list))
             epochs += 1
-            if epochs == self.max_epochs + 1:
+            if epochs == self.max_epochs + 1 or self.check_all_test_words_seen():
                 break
         return potential_words_list
 
@@ -101,7 +127,11 @@ class TextBlobWordFinder():
         """
         potential_words_list = []
         for x in range(0, min_iters_per_epoch):
+            if self.check_all_test_words_seen():
+                print("All {} test words have been tried".format(self.no_of_test_words))
+                break
             test_word = self.get_test_word()
+            self.seen_test_words.add(test_word)
             proxy_words_list = self.get_proxy_words_dict(test_word)
             new_potential_words_list = self.get_potential_words_list(proxy_words_list)
             if new_potential_words_list:
@@ -109,7 +139,44 @@ class TextBlobWordFinder():
                 potential_words_list = list(set(potential_words_list))
         return potential_words_list
 
+    def check_all_test_words_seen(self):
+        """
+        Each zero may be substituted with any letter of the alphabet, so there are
+        len(alphabet) ** len(zeros_list) distinct test_words. Once all have been tried,
+        further sampling cannot find new potential words.
+        """
+        return len(self.seen_test_words) >= self.no_of_test_words
+
     def get_test_word(self):
+        """
+        Each test_word is one which has not been drawn before, so every iteration spellchecks a new test_word.
+        If there are at most MAX_ENUMERATED_TEST_WORDS, e.g. 676 for '0ri0t', they are enumerated in a shuffled
+        order. Otherwise random test_words are drawn again until one has not been seen.
+        Should only be called while self.check_all_test_words_seen is False
+        :return: e.g. '0ri0t' -> drift
+        """
+        if self.no_of_test_words <= MAX_ENUMERATED_TEST_WORDS:
+            if self.test_word_indexes is None:
+                self.test_word_indexes = list(range(self.no_of_test_words))
+                random.shuffle(self.test_word_indexes)
+            return self.get_test_word_for_index(self.test_word_indexes.pop())
+        test_word = self.get_random_test_word()
+        while test_word in self.seen_test_words:
+            test_word = self.get_random_test_word()
+        return test_word
+
+    def get_test_word_for_index(self, index):
+        """
+        :return: the test_word at the index of every test_word, counting letters of the alphabet
+        at each zero as digits, e.g. 0 -> 'ariat' and 1 -> 'aribt' for '0ri0t'
+        """
+        local_split_word = self.split_word.copy()
+        for x in reversed(self.zeros_list):
+            index, i = divmod(index, len(self.alphabet))
+            local_split_word[x] = self.alphabet[i]
+        return "".join(local_split_word)
+
+    def get_random_test_word(self):
         """
         test_word created by substituting zeros from a split version of
         the encrypted_word (self.split_word) and with random letters. This
@@ -158,7 +225,8 @@ class TextBlobWordFinder():
 
     def get_proxy_words_dict(self, test_word):
         """
-        text_word e.g. 'rrixt', is passed to the NLP TextBlob object.
+        text_word e.g. 'rrixt', is passed to the NLP TextBlob spelling model, which is
+        loaded once per process by the dictionary_provider. Results are memoized.
         This produces a list of tuples with proxy_words and a weighting e.g.
         [('wrist', 0.39), ('print', 0.29)]
         Basically, weightings >0 mean the proxy word is part of the English language.
@@ -168,8 +236,8 @@ class TextBlobWordFinder():
         :param test_word: produce from self.get_test_word
         :return: e.g. {'wrist': 0.39, 'print': 0.29}
         """
-        textblob = Textblob(test_word)
-        proxy_words = textblob.spellcheck()
+        instrumentation.increment("test_words")
+        proxy_words = get_memoized_proxy_words(test_word)
 
         proxy_words_dict = dict(proxy_words)
         return proxy_words_dict
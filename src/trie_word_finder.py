@@ -0,0 +1,261 @@
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import lexicon_word_finder
+
+TRIE_FILE_MAGIC = b"ASDAWG01"
+# magic, byteorder ('l' or 'b'), padding, no. of nodes, no. of edges, sha256 of the word list source
+TRIE_FILE_HEADER = struct.Struct("<8sc3xII32s")
+
+
+def get_padded_length(length):
+    return (length + 3) // 4 * 4
+
+
+class WordTrie():
+    """
+    A word list stored as a DAWG: a trie where identical suffixes are shared between words.
+    Nodes and edges are held in flat arrays, so the trie can be written to a file and memory mapped
+    by later processes rather than rebuilt:
+
+    first_edges: node -> index of its first edge. Edges of node n are first_edges[n] to first_edges[n + 1]
+    word_ends: node -> 1 if a word ends at the node
+    edge_letters: edge -> letter, sorted within each node, so a fixed letter is found with a single find
+    edge_targets: edge -> node the edge leads to
+
+    Node 0 is the root.
+    """
+    def __init__(self, first_edges, word_ends, edge_letters, edge_targets, mapped_file=None):
+        self.first_edges = first_edges
+        self.word_ends = word_ends
+        self.edge_letters = edge_letters
+        self.edge_targets = edge_targets
+        self.mapped_file = mapped_file
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Builds a trie of the words, then merges nodes with identical suffixes, from the leaves up
+        """
+        root = {}
+        for word in words:
+            word = word.strip().lower()
+            if not word.isalpha() or not word.isascii():
+                continue
+            node = root
+            for letter in word:
+                node = node.setdefault(letter, {})
+            node[""] = True
+
+        node_ids = {}
+        node_list = []
+
+        def get_node_id(node):
+            signature = tuple((letter, get_node_id(child)) if letter else ("", -1)
+                              for letter, child in sorted(node.items()))
+            if signature not in node_ids:
+                node_ids[signature] = len(node_list)
+                node_list.append(signature)
+            return node_ids[signature]
+
+        root_id = get_node_id(root)
+        # Number nodes so the root is node 0
+        order = [root_id] + [i for i in range(len(node_list)) if i != root_id]
+        new_ids = {old_id: new_id for new_id, old_id in enumerate(order)}
+        first_edges = array.array("i", [0])
+        word_ends = bytearray()
+        edge_letters = bytearray()
+        edge_targets = array.array("i")
+        for old_id in order:
+            signature = node_list[old_id]
+            word_ends.append(1 if signature and signature[0][0] == "" else 0)
+            for letter, child_id in signature:
+                if letter:
+                    edge_letters.append(ord(letter))
+                    edge_targets.append(new_ids[child_id])
+            first_edges.append(len(edge_targets))
+        return cls(first_edges, bytes(word_ends), bytes(edge_letters), edge_targets)
+
+    @classmethod
+    def load(cls, trie_path, source_key=None):
+        """
+        Memory maps a file written by save. The arrays are views on the mapped file, so loading does not
+        read the whole file and processes loading the same file share its pages.
+        :return: None if the file was written for another source_key or byteorder, so it should be rebuilt
+        """
+        with open(trie_path, "rb") as trie_file:
+            mapped_file = mmap.mmap(trie_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, no_of_nodes, no_of_edges, file_source_key = TRIE_FILE_HEADER.unpack_from(mapped_file)
+        if magic != TRIE_FILE_MAGIC or byteorder != sys.byteorder[0].encode() or \
+                (source_key is not None and file_source_key != source_key):
+            mapped_file.close()
+            return None
+        file_view = memoryview(mapped_file)
+        offset = TRIE_FILE_HEADER.size
+        first_edges = file_view[offset:offset + 4 * (no_of_nodes + 1)].cast("i")
+        offset += 4 * (no_of_nodes + 1)
+        word_ends = file_view[offset:offset + no_of_nodes]
+        offset += get_padded_length(no_of_nodes)
+        edge_letters_offset = offset
+        offset += get_padded_length(no_of_edges)
+        edge_targets = file_view[offset:offset + 4 * no_of_edges].cast("i")
+        edge_letters = MappedLetters(mapped_file, edge_letters_offset, no_of_edges)
+        return cls(first_edges, word_ends, edge_letters, edge_targets, mapped_file)
+
+    def save(self, trie_path, source_key=b"\0" * 32):
+        """
+        Writes the arrays after a header. The file is written to a temporary path then renamed,
+        so processes never map a partly written file.
+        """
+        no_of_nodes = len(self.word_ends)
+        no_of_edges = len(self.edge_targets)
+        temp_path = "{}.{}.tmp".format(trie_path, os.getpid())
+        with open(temp_path, "wb") as trie_file:
+            trie_file.write(TRIE_FILE_HEADER.pack(TRIE_FILE_MAGIC, sys.byteorder[0].encode(), no_of_nodes,
+                                                  no_of_edges, source_key))
+            trie_file.write(array.array("i", self.first_edges).tobytes())
+            trie_file.write(bytes(self.word_ends).ljust(get_padded_length(no_of_nodes), b"\0"))
+            trie_file.write(bytes(self.edge_letters[0:no_of_edges]).ljust(get_padded_length(no_of_edges), b"\0"))
+            trie_file.write(array.array("i", self.edge_targets).tobytes())
+        os.replace(temp_path, trie_path)
+
+    def get_matching_words(self, encrypted_word, allowed_letters=None):
+        """
+        Walks the fixed letters of the encrypted_word directly and only branches at zeros.
+        Branches which reuse a letter already chosen for another zero of the word are pruned,
+        as are letters not in allowed_letters, if given.
+        :return: e.g. '0ri0t' -> ['brist', 'drift', 'grist', 'print', 'wrist', ...]
+        """
+        allowed_bytes = None if allowed_letters is None else {ord(letter) for letter in allowed_letters}
+        letter_codes = [0 if letter == "0" else ord(letter) for letter in encrypted_word]
+        matching_words = []
+        self.add_matching_words(0, 0, letter_codes, allowed_bytes, bytearray(), set(), matching_words)
+        return matching_words
+
+    def add_matching_words(self, node, i, letter_codes, allowed_bytes, word, zero_letters, matching_words):
+        if i == len(letter_codes):
+            if self.word_ends[node]:
+                matching_words.append(word.decode())
+            return
+        start, end = self.first_edges[node], self.first_edges[node + 1]
+        letter_code = letter_codes[i]
+        if letter_code:
+            edge = self.edge_letters.find(bytes((letter_code,)), start, end)
+            if edge != -1:
+                word.append(letter_code)
+                self.add_matching_words(self.edge_targets[edge], i + 1, letter_codes, allowed_bytes, word,
+                                        zero_letters, matching_words)
+                word.pop()
+            return
+        for edge in range(start, end):
+            letter_code = self.edge_letters[edge]
+            if letter_code in zero_letters or (allowed_bytes is not None and letter_code not in allowed_bytes):
+                continue
+            zero_letters.add(letter_code)
+            word.append(letter_code)
+            self.add_matching_words(self.edge_targets[edge], i + 1, letter_codes, allowed_bytes, word,
+                                    zero_letters, matching_words)
+            word.pop()
+            zero_letters.discard(letter_code)
+
+
+class MappedLetters():
+    """
+    The edge letters of a memory mapped WordTrie. Indexes and find are relative to the start of the
+    edge letters, and find uses the mmap's own find, so no copy of the letters is made.
+    """
+    def __init__(self, mapped_file, offset, length):
+        self.mapped_file = mapped_file
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.mapped_file[self.offset + i.start:self.offset + i.stop]
+        return self.mapped_file[self.offset + i]
+
+    def find(self, sub, start, end):
+        i = self.mapped_file.find(sub, self.offset + start, self.offset + end)
+        return i if i == -1 else i - self.offset
+
+
+def get_source_key(word_list_path=None):
+    """
+    Identifies the word list a trie file was built from, so a stale file is rebuilt
+    :return: sha256 digest of the word list path, size and modification time
+    """
+    if word_list_path is None:
+        source = "pyspellchecker"
+    else:
+        stat = os.stat(word_list_path)
+        source = "{}:{}:{}".format(os.path.abspath(word_list_path), stat.st_size, stat.st_mtime_ns)
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+_word_tries = {}
+
+
+def get_word_trie(word_list_path=None, trie_path=None):
+    """
+    Word tries are loaded once per process. If trie_path is given, the trie is memory mapped
+    from it, or built from the word list and saved to it if the file is missing or stale.
+    """
+    key = (word_list_path, trie_path)
+    if key not in _word_tries:
+        word_trie = None
+        source_key = get_source_key(word_list_path)
+        if trie_path is not None and os.path.exists(trie_path):
+            word_trie = WordTrie.load(trie_path, source_key)
+        if word_trie is None:
+            word_trie = WordTrie.from_words(lexicon_word_finder.load_words(word_list_path))
+            if trie_path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(trie_path)), exist_ok=True)
+                word_trie.save(trie_path, source_key)
+        _word_tries[key] = word_trie
+    return _word_tries[key]
+
+
+class TrieWordFinder():
+    """
+    Class evaluates an encrypted_word by a wildcard search of a WordTrie built from a word list.
+    Fixed letters are followed directly and only zeros branch, so no test_words are spellchecked
+    and no candidates are thrown away afterwards. Provides the same potential_words_dict as the
+    other word finders.
+    """
+    def __init__(self, encrypted_word, alphabet, **kwargs):
+        """
+        :param encrypted_word: The original word which contains zeros which need to be decoded to
+        arrive at a word
+        :param alphabet: a list with alphabetical letters A-Z
+        :param word_list_path: Optional path to a whitespace separated word list.
+        Defaults to the pyspellchecker English dictionary
+        :param trie_path: Optional path of a file the trie is memory mapped from, or saved to when first built
+        """
+        self.encrypted_word = encrypted_word
+        self.alphabet = alphabet
+        self.zeros_list = self.get_zeros_indexes()
+        self.word_trie = get_word_trie(kwargs.get('word_list_path'), kwargs.get('trie_path'))
+
+    def get_zeros_indexes(self):
+        """
+        Produces a list of indexes (self.zeros_list)
+        where zeros represent letters in the encrypted_word
+        :return e.g. '0ri0t' -> [0, 3]
+        """
+        return [i for i, letter in enumerate(self.encrypted_word) if letter == "0"]
+
+    def execute(self):
+        print("Executing word_finder for,", self.encrypted_word)
+        potential_words_list = self.word_trie.get_matching_words(self.encrypted_word, self.alphabet)
+        return self.get_potential_words_dict(potential_words_list)
+
+    def get_potential_words_dict(self, potential_words_list):
+        success = len(potential_words_list) > 0
+        return {self.encrypted_word: {"potential_words_list": potential_words_list,
+                                      "zeros_list": self.zeros_list, "success": success}}
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import instrumentation
+
+
+class WordFinderCache():
+    """
+    Persistent on-disk cache of potential_words_dicts produced by word finders.
+    Entries are content addressed by a key made from the encrypted_word, alphabet, word finder name,
+    word finder kwargs and seed, so later runs and other processes can reuse them.
+    Each entry is a JSON file, written atomically. When the cache grows beyond max_size_bytes,
+    the least recently used entries are removed until it is within low_watermark of max_size_bytes.
+    Rather than scanning the cache on every write, its size is estimated from one scan plus the entries
+    written since, and it is only scanned again once the estimate passes max_size_bytes. Entries written by
+    other processes are only counted at the next scan, so the cache may briefly exceed max_size_bytes.
+    """
+    def __init__(self, cache_dir, max_size_bytes=50 * 1024 * 1024, low_watermark=0.9):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.low_watermark = low_watermark
+        self.size_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, encrypted_word, alphabet, word_finder_name, word_finder_kwargs, seed):
+        """
+        :return: e.g. '3f5a...' a sha256 hex digest
+        """
+        key_fields = [encrypted_word, "".join(alphabet), word_finder_name, word_finder_kwargs, seed]
+        key_json = json.dumps(key_fields, sort_keys=True, default=str)
+        return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        """
+        :return: the cached potential_words_dict, or None if there is no entry for the key
+        """
+        path = self.get_path(key)
+        try:
+            with open(path) as cache_file:
+                potential_words_dict = json.load(cache_file)
+        except (OSError, ValueError):
+            self.misses += 1
+            instrumentation.increment("word_finder_cache_misses")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed by another process since it was read
+            pass
+        self.hits += 1
+        instrumentation.increment("word_finder_cache_hits")
+        return potential_words_dict
+
+    def set(self, key, potential_words_dict):
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(temp_path, "w") as cache_file:
+            json.dump(potential_words_dict, cache_file)
+        if self.size_bytes is None:
+            self.size_bytes = self.get_entries_result_dict()["total_size"]
+        try:
+            self.size_bytes -= os.stat(path).st_size
+        except OSError:
+            pass
+        self.size_bytes += os.stat(temp_path).st_size
+        os.replace(temp_path, path)
+        if self.size_bytes > self.max_size_bytes:
+            self.evict()
+
+    def get_entries_result_dict(self):
+        """
+        :return: e.g. {"entries": [(mtime, size, path), ...], "total_size": 52431000}
+        """
+        entries = []
+        total_size = 0
+        for dir_path, dir_names, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+        return {"entries": entries, "total_size": total_size}
+
+    def evict(self):
+        """
+        If the cache is beyond self.max_size_bytes, removes least recently used entries until it is
+        within self.low_watermark of self.max_size_bytes
+        """
+        entries_result_dict = self.get_entries_result_dict()
+        entries = entries_result_dict["entries"]
+        total_size = entries_result_dict["total_size"]
+        self.size_bytes = total_size
+        if total_size <= self.max_size_bytes:
+            return
+        target_size = self.max_size_bytes * self.low_watermark
+        entries.sort()
+        for mtime, size, path in entries:
+            if total_size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+        self.size_bytes = total_size
@@ -0,0 +1,65 @@
+"""
+Word frequencies used to score potential_words, so common words such as 'request' rank above
+junk found by the word finders such as 'xegfest'. Frequencies are loaded once per process.
+"""
+import math
+import dictionary_provider
+
+_word_frequencies = {}
+
+
+def get_word_frequencies(word_frequency_path=None):
+    """
+    If no word_frequency_path is given, the pyspellchecker English frequency dictionary is used.
+    :return: e.g. {'the': 76041, 'request': 1532, ...}
+    """
+    if word_frequency_path not in _word_frequencies:
+        _word_frequencies[word_frequency_path] = load_word_frequencies(word_frequency_path)
+    return _word_frequencies[word_frequency_path]
+
+
+def load_word_frequencies(word_frequency_path=None):
+    """
+    A word frequency file has a word and its count on each line, e.g. 'request 1532'.
+    Words without a count are given a count of 1, so a plain word list can also be used.
+    The lexicon and trie word finders skip the counts, as they are not alphabetical,
+    so the same file can also be used as their word list.
+    """
+    if word_frequency_path is None:
+        return dictionary_provider.get_spell_checker().word_frequency.dictionary
+    word_frequencies = {}
+    with open(word_frequency_path) as word_frequency_file:
+        for line in word_frequency_file:
+            fields = line.split()
+            if not fields:
+                continue
+            word = fields[0].lower()
+            count = int(fields[1]) if len(fields) > 1 else 1
+            word_frequencies[word] = word_frequencies.get(word, 0) + count
+    return word_frequencies
+
+
+def get_word_score(word, word_frequencies):
+    """
+    :return: log of the word's count + 1, so unknown words score 0 and scores of words can be added
+    """
+    return math.log(word_frequencies.get(word, 0) + 1)
+
+
+def get_scored_potential_words_dict_collection(potential_words_dict_collection, word_frequencies):
+    """
+    Adds potential_word_scores to each potential_words_dict and sorts its potential_words_list
+    from the highest score down. Decoders which try potential_words in order then try the most common first.
+    :return: e.g. {'0ri0t': {'potential_words_list': ['print', 'wrist', 'drift', 'grist'], 'zeros_list': [0, 3],
+                   'success': True, 'potential_word_scores': {'print': 9.1, 'wrist': 6.3, ...}}, ...}
+    """
+    scored_potential_words_dict_collection = {}
+    for encrypted_word, potential_words_dict in potential_words_dict_collection.items():
+        potential_word_scores = {potential_word: get_word_score(potential_word, word_frequencies)
+                                 for potential_word in potential_words_dict.get('potential_words_list', [])}
+        scored_potential_words_dict = dict(potential_words_dict)
+        scored_potential_words_dict['potential_words_list'] = sorted(potential_word_scores,
+                                                                     key=potential_word_scores.get, reverse=True)
+        scored_potential_words_dict['potential_word_scores'] = potential_word_scores
+        scored_potential_words_dict_collection[encrypted_word] = scored_potential_words_dict
+    return scored_potential_words_dict_collection
@@ -0,0 +1,30 @@
+import annealing_word_decoder
+
+ALPHABET = list("abcd")
+POTENTIAL_WORDS_DICT_COLLECTION = {
+    "0x0": {"potential_words_list": ["axb", "cxd"], "zeros_list": [0, 2], "success": True},
+    "y00": {"potential_words_list": ["ycd", "yab", "ycb"], "zeros_list": [1, 2], "success": True}}
+
+
+def get_decoder(potential_words_dict_collection, **kwargs):
+    return annealing_word_decoder.AnnealingWordDecoder(ALPHABET, list(potential_words_dict_collection),
+                                                       potential_words_dict_collection, **kwargs)
+
+
+def test_finds_full_solution():
+    decoder = get_decoder(POTENTIAL_WORDS_DICT_COLLECTION, max_epochs=5, stop_on_full_solution=True)
+    decrypted_words_dicts = decoder.execute_encrypted_word_decoder()
+    assert decoder.check_full_solution(decrypted_words_dicts[-1])
+
+
+def test_word_without_valid_candidates_is_a_free_word():
+    potential_words_dict_collection = dict(POTENTIAL_WORDS_DICT_COLLECTION)
+    # 'bxb' uses 'b' twice at the zeros, so '0x0' has no candidates despite its success
+    potential_words_dict_collection["0x0"] = {"potential_words_list": ["bxb"], "zeros_list": [0, 2], "success": True}
+    decoder = get_decoder(potential_words_dict_collection, max_epochs=2)
+    assert "0x0" not in decoder.annealing_candidates
+    assert decoder.free_words == ["0x0"]
+    for decrypted_words_dict in decoder.execute_encrypted_word_decoder():
+        assert decrypted_words_dict["y00"] in ["ycd", "yab", "ycb"]
+        used_letters = [decrypted_words_dict["0x0"][i] for i in (0, 2)] + list(decrypted_words_dict["y00"][1:])
+        assert sorted(used_letters) == ALPHABET
@@ -0,0 +1,46 @@
+import beam_word_decoder
+
+ALPHABET = list("abcd")
+
+
+def get_potential_words_dict_collection(axb_score, cxd_score):
+    return {"0x0": {"potential_words_list": ["axb", "cxd"], "zeros_list": [0, 2], "success": True,
+                    "potential_word_scores": {"axb": axb_score, "cxd": cxd_score}},
+            "y00": {"potential_words_list": ["ycd", "yab"], "zeros_list": [1, 2], "success": True,
+                    "potential_word_scores": {"ycd": 1.0, "yab": 1.0}}}
+
+
+def get_decoder(potential_words_dict_collection, **kwargs):
+    return beam_word_decoder.BeamWordDecoder(ALPHABET, list(potential_words_dict_collection),
+                                             potential_words_dict_collection, propagate_constraints=False, **kwargs)
+
+
+def test_full_assignments_are_yielded_from_the_highest_score_down():
+    for axb_score, cxd_score, best_decrypted_words_dict in [(5.0, 1.0, {"0x0": "axb", "y00": "ycd"}),
+                                                            (1.0, 5.0, {"0x0": "cxd", "y00": "yab"})]:
+        decoder = get_decoder(get_potential_words_dict_collection(axb_score, cxd_score))
+        decrypted_words_dicts = decoder.execute_encrypted_word_decoder()
+        assert decrypted_words_dicts[0] == best_decrypted_words_dict
+        assert len(decrypted_words_dicts) == 2
+        assert all(decoder.check_full_solution(x) for x in decrypted_words_dicts)
+
+
+def test_beam_width_limits_the_assignments_kept():
+    decoder = get_decoder(get_potential_words_dict_collection(5.0, 1.0), beam_width=1)
+    assert decoder.execute_encrypted_word_decoder() == [{"0x0": "axb", "y00": "ycd"}]
+
+
+def test_stops_on_full_solution():
+    decoder = get_decoder(get_potential_words_dict_collection(5.0, 1.0), stop_on_full_solution=True)
+    assert len(decoder.execute_encrypted_word_decoder()) == 1
+
+
+def test_best_partial_beam_is_filled_when_every_beam_is_pruned():
+    potential_words_dict_collection = get_potential_words_dict_collection(5.0, 1.0)
+    potential_words_dict_collection["y00"] = {"potential_words_list": ["yac"], "zeros_list": [1, 2], "success": True}
+    potential_words_dict_collection["0x0"]["potential_words_list"] = ["axb"]
+    decoder = get_decoder(potential_words_dict_collection)
+    decrypted_words_dicts = decoder.execute_encrypted_word_decoder()
+    assert len(decrypted_words_dicts) == 1
+    assert sorted(decrypted_words_dicts[0]) == ["0x0", "y00"]
+    assert not decoder.check_full_solution(decrypted_words_dicts[0])
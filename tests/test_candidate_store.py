@@ -0,0 +1,58 @@
+import string
+import candidate_store
+import potential_word_tracker
+
+ALPHABET = list(string.ascii_lowercase)
+POTENTIAL_WORDS_DICT_COLLECTION = {
+    "0ri0t": {"potential_words_list": ["drift", "wrist", "tritt", "wrist"], "zeros_list": [0, 3], "success": True},
+    "0o0ey": {"potential_words_list": ["money", "honey"], "zeros_list": [0, 2], "success": True},
+    "00amy": {"potential_words_list": [], "zeros_list": [0, 1], "success": False}}
+
+
+def get_tracker(propagate_constraints=False):
+    tracker = potential_word_tracker.PotentialWordTracker(ALPHABET, list(POTENTIAL_WORDS_DICT_COLLECTION),
+                                                          POTENTIAL_WORDS_DICT_COLLECTION, propagate_constraints)
+    tracker.execute_potential_word_tracker()
+    return tracker
+
+
+def test_potential_words_dict_collection_view_round_trip():
+    store = candidate_store.CandidateStore.from_potential_words_dict_collection(ALPHABET,
+                                                                             POTENTIAL_WORDS_DICT_COLLECTION)
+    view = store.get_potential_words_dict_collection()
+    assert dict(view["0ri0t"]) == {"potential_words_list": ["drift", "wrist", "tritt"], "zeros_list": [0, 3],
+                                   "success": True}
+    assert dict(view["00amy"]) == POTENTIAL_WORDS_DICT_COLLECTION["00amy"]
+    assert list(view) == list(POTENTIAL_WORDS_DICT_COLLECTION)
+    assert candidate_store.get_candidate_store(ALPHABET, view) is store
+
+
+def test_get_candidate_id():
+    store = candidate_store.CandidateStore.from_potential_words_dict_collection(ALPHABET,
+                                                                             POTENTIAL_WORDS_DICT_COLLECTION)
+    candidate_id = store.get_candidate_id("0o0ey", "honey")
+    assert store.get_word(candidate_id) == "honey"
+    assert store.get_encrypted_word(candidate_id) == "0o0ey"
+    assert store.get_candidate_id("0ri0t", "honey") is None
+    assert store.get_candidate_id("0ri0t", "unknown") is None
+    assert store.get_candidate_id("unknown", "honey") is None
+
+
+def test_invalid_candidates_are_left_out_of_views():
+    tracker = get_tracker()
+    assert dict(tracker.potential_word_masks["0ri0t"]) == {"drift": (1 << 3) | (1 << 5),
+                                                          "wrist": (1 << 22) | (1 << 18)}
+    assert "tritt" not in tracker.potential_word_masks["0ri0t"]
+    assert "00amy" not in tracker.potential_word_masks
+    assert tracker.potential_words_by_alpha_dict["w"][("0ri0t", "wrist")] == (1 << 22) | (1 << 18)
+    assert ("0o0ey", "money") not in tracker.potential_words_by_alpha_dict["w"]
+
+
+def test_potential_word_masks_view_is_kept_until_candidates_change():
+    tracker = get_tracker()
+    view = tracker.potential_word_masks
+    candidate_masks_view = view["0o0ey"]
+    assert tracker.potential_word_masks is view
+    assert view["0o0ey"] is candidate_masks_view
+    tracker.remove_potential_words("0o0ey", lambda letters_mask: letters_mask & (1 << 7))
+    assert dict(view["0o0ey"]) == {"money": (1 << 12) | (1 << 13)}
@@ -0,0 +1,62 @@
+import encrypted_word_decoder
+
+ALPHABET = list("abcd")
+POTENTIAL_WORDS_DICT_COLLECTION = {
+    "0x0": {"potential_words_list": ["axb", "cxd"], "zeros_list": [0, 2], "success": True},
+    "y00": {"potential_words_list": ["ycd", "yab", "ycb"], "zeros_list": [1, 2], "success": True}}
+
+
+def get_search_state():
+    decoder = encrypted_word_decoder.EncryptedWordDecoder(ALPHABET, list(POTENTIAL_WORDS_DICT_COLLECTION),
+                                                          POTENTIAL_WORDS_DICT_COLLECTION, 1,
+                                                          propagate_constraints=False)
+    return decoder, decoder.search_state
+
+
+def get_snapshot(search_state):
+    return (dict(search_state.letter_counts), bytes(search_state.owners_popped), list(search_state.unassigned_letters),
+            search_state.available_letters_mask)
+
+
+def test_initial_letter_counts():
+    decoder, search_state = get_search_state()
+    assert search_state.letter_counts == {"a": 2, "b": 3, "c": 3, "d": 2}
+    assert search_state.available_letters_mask == decoder.alphabet_mask
+
+
+def test_pop_owner_removes_its_candidates():
+    decoder, search_state = get_search_state()
+    owner = decoder.candidate_store.records["y00"].index
+    search_state.pop_owner(owner)
+    assert search_state.check_owner_popped(owner)
+    assert search_state.letter_counts == {"a": 1, "b": 1, "c": 1, "d": 1}
+    assert [decoder.candidate_store.get_word(x) for x in search_state.get_candidate_ids_for_letter("b")] == ["axb"]
+
+
+def test_rollback_to_checkpoint_and_start():
+    decoder, search_state = get_search_state()
+    start_snapshot = get_snapshot(search_state)
+    search_state.pop_letter("a")
+    checkpoint = search_state.get_checkpoint()
+    checkpoint_snapshot = get_snapshot(search_state)
+    search_state.pop_owner(decoder.candidate_store.records["0x0"].index)
+    search_state.pop_letter("d")
+    search_state.add_unassigned_letter("d")
+    search_state.rollback(checkpoint)
+    assert get_snapshot(search_state) == checkpoint_snapshot
+    search_state.rollback()
+    assert get_snapshot(search_state) == start_snapshot
+    assert search_state.undo_log == []
+
+
+def test_most_constrained_letter_follows_counts():
+    decoder, search_state = get_search_state()
+    assert search_state.get_most_constrained_letter() in ("a", "d")
+    search_state.pop_owner(decoder.candidate_store.records["0x0"].index)
+    # 'a' has one candidate left, 'yab', and 'd' one, 'ycd', while 'b' and 'c' have two
+    assert search_state.get_most_constrained_letter() in ("a", "d")
+    search_state.pop_letter("a")
+    search_state.pop_letter("d")
+    assert search_state.get_most_constrained_letter() in ("b", "c")
+    search_state.rollback()
+    assert search_state.letter_counts == {"a": 2, "b": 3, "c": 3, "d": 2}
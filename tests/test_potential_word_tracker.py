@@ -0,0 +1,52 @@
+import potential_word_tracker
+
+
+def get_tracker(alphabet, potential_words_dict_collection):
+    tracker = potential_word_tracker.PotentialWordTracker(list(alphabet), list(potential_words_dict_collection),
+                                                          potential_words_dict_collection, propagate_constraints=True)
+    tracker.execute_potential_word_tracker()
+    return tracker
+
+
+def get_potential_words(tracker, encrypted_word):
+    return list(tracker.potential_word_masks[encrypted_word])
+
+
+def test_forced_words_remove_conflicting_potential_words():
+    tracker = get_tracker("abcdef", {
+        "0x0": {"potential_words_list": ["axb"], "zeros_list": [0, 2], "success": True},
+        "y00": {"potential_words_list": ["yab", "ycd", "yac"], "zeros_list": [1, 2], "success": True},
+        "z00": {"potential_words_list": ["zdc", "zef", "zea"], "zeros_list": [1, 2], "success": True}})
+    # 'axb' forces 'ycd', which then removes 'zdc'. 'zea' uses 'a' of 'axb'
+    assert get_potential_words(tracker, "y00") == ["ycd"]
+    assert get_potential_words(tracker, "z00") == ["zef"]
+    assert tracker.forced_words_dict == {"0x0": "axb", "y00": "ycd", "z00": "zef"}
+
+
+def test_letter_of_a_single_encrypted_word_is_required_when_letters_are_used_exactly_once():
+    tracker = get_tracker("abcd", {
+        "0x0": {"potential_words_list": ["axb", "cxd"], "zeros_list": [0, 2], "success": True},
+        "y00": {"potential_words_list": ["yab", "ycb"], "zeros_list": [1, 2], "success": True}})
+    # Only '0x0' can use 'd', so it must be 'cxd', which leaves 'yab'
+    assert tracker.forced_words_dict == {"0x0": "cxd", "y00": "yab"}
+    assert tracker.letter_counts_by_owner == {0: {"c": 1, "d": 1}, 1: {"a": 1, "b": 1}}
+
+
+def test_required_letters_are_not_used_without_exact_cover():
+    tracker = get_tracker("abcde", {
+        "0x0": {"potential_words_list": ["axb", "cxd"], "zeros_list": [0, 2], "success": True},
+        "y00": {"potential_words_list": ["yab", "ycb"], "zeros_list": [1, 2], "success": True}})
+    assert get_potential_words(tracker, "0x0") == ["axb", "cxd"]
+    assert tracker.forced_words_dict == {}
+
+
+def test_removals_which_would_leave_no_potential_words_are_skipped():
+    potential_words_dict_collection = {
+        "0x0": {"potential_words_list": ["axb"], "zeros_list": [0, 2], "success": True},
+        "y00": {"potential_words_list": ["yab"], "zeros_list": [1, 2], "success": True}}
+    tracker = potential_word_tracker.PotentialWordTracker(list("abcd"), list(potential_words_dict_collection),
+                                                          potential_words_dict_collection)
+    tracker.execute_potential_word_tracker()
+    assert tracker.propagate_constraints_for_potential_words() is False
+    assert get_potential_words(tracker, "y00") == ["yab"]
+    assert tracker.forced_words_dict == {"0x0": "axb", "y00": "yab"}
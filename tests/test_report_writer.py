@@ -0,0 +1,65 @@
+import pytest
+import report_writer
+
+ROW_DICTS = [{"mean_accuracy": 0.5, "word_finder_name": "LexiconWordFinder",
+              "best_decrypted_word_dict": {"0ri0t": "wrist", "0o0ey": "money"}},
+             {"mean_accuracy": 0.7, "word_finder_name": "TrieWordFinder",
+              "best_decrypted_word_dict": {"0ri0t": "grist", "0o0ey": "honey"}}]
+
+
+@pytest.mark.parametrize("report_name", ["report.csv", "report.jsonl"])
+def test_read_report_round_trip(tmp_path, report_name):
+    writer = report_writer.ReportWriter(str(tmp_path / report_name))
+    for row_dict in ROW_DICTS:
+        writer.append_row(row_dict)
+    report_df = writer.read_report()
+    assert report_df.to_dict("records") == ROW_DICTS
+
+
+def test_csv_row_with_columns_missing_from_header_raises(tmp_path):
+    writer = report_writer.ReportWriter(str(tmp_path / "report.csv"))
+    writer.append_row(ROW_DICTS[0])
+    with pytest.raises(ValueError):
+        writer.append_row(dict(ROW_DICTS[1], word_accuracy_0ri0t=1.0))
+    writer.append_row({"mean_accuracy": 0.1})
+    assert writer.read_report()["mean_accuracy"].tolist() == [0.5, 0.1]
+
+
+def test_csv_appends_to_report_without_final_newline(tmp_path):
+    report_path = tmp_path / "report.csv"
+    report_path.write_text("mean_accuracy,word_finder_name\n0.1,TextBlobWordFinder")
+    writer = report_writer.ReportWriter(str(report_path))
+    writer.append_row({"mean_accuracy": 0.2, "word_finder_name": "LexiconWordFinder"})
+    assert writer.read_report()["mean_accuracy"].tolist() == [0.1, 0.2]
+
+
+def test_parquet_round_trip_with_tiered_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_writer, "MAX_PARQUET_PARTS", 3)
+    writer = report_writer.ReportWriter(str(tmp_path / "report.parquet"))
+    row_dicts = [{"run": x, "best_decrypted_word_dict": {"0ri0t": "wrist"} if x % 2 else None} for x in range(20)]
+    for row_dict in row_dicts:
+        writer.append_row(row_dict)
+    report_df = writer.read_report()
+    assert report_df["run"].tolist() == list(range(20))
+    assert report_df["best_decrypted_word_dict"].tolist() == [x["best_decrypted_word_dict"] for x in row_dicts]
+    manifest_dict = writer.read_parquet_manifest()
+    # 20 rows are 2 parts of level 2 (9 rows each), no parts of level 1 and 2 parts of level 0
+    part_names = writer.get_parquet_part_names(manifest_dict)
+    assert [len(writer.get_part_names_for_level(part_names, manifest_dict, level)) for level in range(3)] == [2, 0, 2]
+    assert len([x for x in (tmp_path / "report.parquet").iterdir() if x.name.startswith("part-")]) == 4
+
+
+def test_parquet_parts_not_in_manifest_are_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_writer, "MAX_PARQUET_PARTS", 3)
+    writer = report_writer.ReportWriter(str(tmp_path / "report.parquet"))
+    writer.append_row({"run": 0})
+    writer.append_row({"run": 1})
+    # A compacted part left by a process which stopped before adding it to the manifest
+    part_path = writer.get_parquet_part_paths()[-1]
+    orphan_path = part_path[:-len(".parquet")] + report_writer.COMPACTED_MARK + "1.parquet"
+    writer.read_parquet_parts(writer.get_parquet_part_paths()).to_parquet(orphan_path, index=False)
+    assert writer.read_report()["run"].tolist() == [0, 1]
+    writer.append_row({"run": 2})
+    assert writer.read_report()["run"].tolist() == [0, 1, 2]
+    assert writer.read_parquet_manifest()["parts"] == {
+        next(x for x in writer.get_parquet_part_names(writer.read_parquet_manifest())): {"level": 1, "replaced": []}}
@@ -0,0 +1,91 @@
+import json
+import sweep_checkpoint
+
+POTENTIAL_WORDS_DICT = {"0ri0t": {"potential_words_list": ["wrist"], "zeros_list": [0, 3], "success": True}}
+
+
+def test_config_key_is_stable():
+    config_dict = {"word_finder": "LexiconWordFinder", "text_blob_params_dict": {"max_epochs": 3, "max_attempts": 3},
+                   "seed": 1}
+    reordered_config_dict = {"seed": 1, "text_blob_params_dict": {"max_attempts": 3, "max_epochs": 3},
+                             "word_finder": "LexiconWordFinder"}
+    assert sweep_checkpoint.get_config_key(config_dict) == sweep_checkpoint.get_config_key(reordered_config_dict)
+    assert sweep_checkpoint.get_config_key(config_dict) != sweep_checkpoint.get_config_key(dict(config_dict, seed=2))
+
+
+def test_resume_continues_the_last_sweep(tmp_path):
+    manifest_path = str(tmp_path / "sweep_checkpoint.jsonl")
+    checkpoint = sweep_checkpoint.SweepCheckpoint(manifest_path)
+    seed = checkpoint.get_seed()
+    checkpoint.mark_config_completed("completed", {"seed": seed})
+    checkpoint.mark_finder_stage_completed("completed", "0ri0t", POTENTIAL_WORDS_DICT)
+    checkpoint.mark_finder_stage_completed("stopped", "0ri0t", POTENTIAL_WORDS_DICT)
+    # A line cut short by the sweep being killed
+    with open(manifest_path, "a") as manifest_file:
+        manifest_file.write('{"event": "config_completed", "sweep_id": ')
+
+    resumed_checkpoint = sweep_checkpoint.SweepCheckpoint(manifest_path, resume=True)
+    assert resumed_checkpoint.sweep_id == checkpoint.sweep_id
+    assert resumed_checkpoint.get_seed() == seed
+    assert resumed_checkpoint.check_config_completed("completed")
+    assert not resumed_checkpoint.check_config_completed("stopped")
+    assert resumed_checkpoint.get_finder_stage("stopped", "0ri0t") == POTENTIAL_WORDS_DICT
+    assert resumed_checkpoint.get_finder_stage("completed", "0ri0t") is None
+    resumed_checkpoint.mark_config_completed("stopped")
+    assert resumed_checkpoint.get_finder_stage("stopped", "0ri0t") is None
+
+
+def test_sweeps_are_only_resumed_when_asked(tmp_path):
+    manifest_path = str(tmp_path / "sweep_checkpoint.jsonl")
+    first_checkpoint = sweep_checkpoint.SweepCheckpoint(manifest_path)
+    first_checkpoint.mark_config_completed("first")
+    second_checkpoint = sweep_checkpoint.SweepCheckpoint(manifest_path)
+    assert second_checkpoint.sweep_id != first_checkpoint.sweep_id
+    assert not second_checkpoint.check_config_completed("first")
+    second_checkpoint.mark_config_completed("second")
+    # Only the last sweep in the manifest is resumed
+    resumed_checkpoint = sweep_checkpoint.SweepCheckpoint(manifest_path, resume=True)
+    assert resumed_checkpoint.sweep_id == second_checkpoint.sweep_id
+    assert resumed_checkpoint.completed_config_keys == {"second"}
+    with open(manifest_path) as manifest_file:
+        assert [json.loads(line)["event"] for line in manifest_file] == [
+            sweep_checkpoint.SWEEP_STARTED, sweep_checkpoint.CONFIG_COMPLETED,
+            sweep_checkpoint.SWEEP_STARTED, sweep_checkpoint.CONFIG_COMPLETED]
+
+
+def test_resume_without_a_manifest_starts_a_sweep(tmp_path):
+    checkpoint = sweep_checkpoint.SweepCheckpoint(str(tmp_path / "sweep_checkpoint.jsonl"), resume=True)
+    assert checkpoint.sweep_id is not None
+    assert checkpoint.completed_config_keys == set()
+    assert checkpoint.get_seed(7) == 7
+
+
+def test_experimenter_skips_configurations_completed_before_resuming(tmp_path):
+    import os
+    import experimenter
+    import report_writer
+
+    def run_configurations(resume):
+        experimenter_cls = experimenter.Experimenter()
+        experimenter_cls.lexicon_word_list_path = os.path.join(os.path.dirname(experimenter.__file__), "benchmarks",
+                                                               "fixtures", "word_list_v1.txt")
+        experimenter_cls.use_word_frequencies = False
+        experimenter_cls.use_word_finder_cache = False
+        experimenter_cls.report_path = report_path
+        experimenter_cls.sweep_checkpoint_path = manifest_path
+        experimenter_cls.resume_sweep = resume
+        experimenter_cls.sweep_seed = 0
+        experimenter_cls.sweep_checkpoint = experimenter_cls.get_sweep_checkpoint()
+        for word_decoder_max_epochs in (1, 2):
+            experimenter_cls.get_results_for_params(experimenter_cls.text_blob_params_dict, word_decoder_max_epochs,
+                                                    experimenter_cls.lexicon_word_finder)
+
+    report_path = str(tmp_path / "report.jsonl")
+    manifest_path = str(tmp_path / "sweep_checkpoint.jsonl")
+    run_configurations(resume=False)
+    run_configurations(resume=True)
+    report_df = report_writer.ReportWriter(report_path).read_report()
+    assert len(report_df) == 2
+    assert report_df["config_key"].nunique() == 2
+    run_configurations(resume=False)
+    assert len(report_writer.ReportWriter(report_path).read_report()) == 4
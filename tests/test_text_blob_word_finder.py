@@ -0,0 +1,56 @@
+import string
+import text_blob_word_finder
+
+ALPHABET = list(string.ascii_lowercase)
+
+
+def get_word_finder(encrypted_word):
+    return text_blob_word_finder.TextBlobWordFinder(encrypted_word, ALPHABET, min_iters_per_epoch=50,
+                                                    min_potential_words=5, max_epochs=3, max_attempts=3)
+
+
+def test_get_test_word_for_index():
+    word_finder = get_word_finder("0ri0t")
+    assert word_finder.get_test_word_for_index(0) == "ariat"
+    assert word_finder.get_test_word_for_index(1) == "aribt"
+    assert word_finder.get_test_word_for_index(26) == "briat"
+
+
+def test_small_spaces_are_enumerated_without_repeats():
+    word_finder = get_word_finder("0ri0t")
+    test_words = set()
+    while not word_finder.check_all_test_words_seen():
+        test_word = word_finder.get_test_word()
+        assert test_word not in test_words
+        test_words.add(test_word)
+        word_finder.seen_test_words.add(test_word)
+    assert len(test_words) == 26 ** 2
+
+
+def test_large_spaces_are_redrawn_without_repeats():
+    word_finder = get_word_finder("0e00e0t")
+    assert word_finder.no_of_test_words > text_blob_word_finder.MAX_ENUMERATED_TEST_WORDS
+    for x in range(2000):
+        test_word = word_finder.get_test_word()
+        assert test_word not in word_finder.seen_test_words
+        word_finder.seen_test_words.add(test_word)
+
+
+def test_every_iteration_spellchecks_a_new_test_word(monkeypatch):
+    test_words = []
+    monkeypatch.setattr(text_blob_word_finder, "get_memoized_proxy_words",
+                        lambda test_word: test_words.append(test_word) or ())
+    word_finder = get_word_finder("0o0ey")
+    potential_words_dict = word_finder.execute()
+    assert potential_words_dict["0o0ey"]["success"] is False
+    assert len(test_words) == len(set(test_words)) == 50 * 3 * 3
+
+
+def test_stops_once_every_test_word_is_seen(monkeypatch):
+    test_words = []
+    monkeypatch.setattr(text_blob_word_finder, "get_memoized_proxy_words",
+                        lambda test_word: test_words.append(test_word) or ())
+    word_finder = text_blob_word_finder.TextBlobWordFinder("0o0ey", ALPHABET, min_iters_per_epoch=300,
+                                                           min_potential_words=5, max_epochs=3, max_attempts=3)
+    assert word_finder.execute()["0o0ey"]["success"] is False
+    assert len(test_words) == len(set(test_words)) == 26 ** 2
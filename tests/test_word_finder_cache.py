@@ -0,0 +1,80 @@
+import os
+import word_finder_cache
+
+POTENTIAL_WORDS_DICT = {"0ri0t": {"potential_words_list": ["drift", "wrist"], "zeros_list": [0, 3], "success": True}}
+
+
+def get_key(cache, seed):
+    return cache.get_key("0ri0t", "abcdefghijklmnopqrstuvwxyz", "TextBlobWordFinder", {"max_epochs": 3}, seed)
+
+
+def test_set_and_get(tmp_path):
+    cache = word_finder_cache.WordFinderCache(str(tmp_path))
+    key = get_key(cache, 1)
+    assert key != get_key(cache, 2)
+    assert cache.get(key) is None
+    cache.set(key, POTENTIAL_WORDS_DICT)
+    assert cache.get(key) == POTENTIAL_WORDS_DICT
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted_to_the_low_watermark(tmp_path):
+    cache = word_finder_cache.WordFinderCache(str(tmp_path), max_size_bytes=10 ** 9)
+    keys = [get_key(cache, seed) for seed in range(10)]
+    for i, key in enumerate(keys):
+        cache.set(key, POTENTIAL_WORDS_DICT)
+        os.utime(cache.get_path(key), (i, i))
+    # Reading the oldest entry makes it the most recently used
+    cache.get(keys[0])
+    entry_size = os.stat(cache.get_path(keys[0])).st_size
+    cache.max_size_bytes = entry_size * 8
+    cache.low_watermark = 0.5
+    cache.evict()
+    assert [key for key in keys if os.path.exists(cache.get_path(key))] == [keys[0]] + keys[7:]
+    assert cache.size_bytes == entry_size * 4
+
+
+def test_cache_is_only_scanned_once_the_size_estimate_passes_the_limit(tmp_path, monkeypatch):
+    cache = word_finder_cache.WordFinderCache(str(tmp_path))
+    cache.set(get_key(cache, 0), POTENTIAL_WORDS_DICT)
+    entry_size = cache.size_bytes
+    cache.max_size_bytes = entry_size * 20
+    scans = []
+    get_entries_result_dict = cache.get_entries_result_dict
+    monkeypatch.setattr(cache, "get_entries_result_dict", lambda: scans.append(1) or get_entries_result_dict())
+    for seed in range(1, 100):
+        cache.set(get_key(cache, seed), POTENTIAL_WORDS_DICT)
+    assert cache.get_entries_result_dict()["total_size"] <= cache.max_size_bytes
+    # One scan per eviction, each of which frees 10% of the cache, rather than one per write
+    assert len(scans) - 1 < 99 / 2
+    # Rewriting an entry replaces its size in the estimate
+    size_bytes = cache.size_bytes
+    cache.set(get_key(cache, 99), POTENTIAL_WORDS_DICT)
+    assert cache.size_bytes == size_bytes
+
+
+def test_randomised_word_finders_are_only_cached_with_a_seed():
+    import experimenter
+    experimenter_cls = experimenter.Experimenter()
+    assert not experimenter_cls.check_use_word_finder_cache(experimenter_cls.text_blob_word_finder)
+    assert not experimenter_cls.check_use_word_finder_cache(experimenter_cls.pyspellchecker_word_finder)
+    assert experimenter_cls.check_use_word_finder_cache(experimenter_cls.lexicon_word_finder)
+    experimenter_cls.word_finder_seed = 1
+    assert experimenter_cls.check_use_word_finder_cache(experimenter_cls.text_blob_word_finder)
+    experimenter_cls.use_word_finder_cache = False
+    assert not experimenter_cls.check_use_word_finder_cache(experimenter_cls.lexicon_word_finder)
+
+
+def test_sequential_sweep_runs_share_one_word_finder_seed():
+    import experimenter
+    experimenter_cls = experimenter.Experimenter()
+    experimenter_cls.sweep_seed = 0
+    word_finder_seeds = []
+    experimenter_cls.get_results_for_text_blob_word_finder = \
+        lambda: word_finder_seeds.append(experimenter_cls.word_finder_seed)
+    experimenter_cls.get_results_for_pyspellchecker_word_finder = \
+        lambda: word_finder_seeds.append(experimenter_cls.word_finder_seed)
+    experimenter_cls.execute_experimenter()
+    assert word_finder_seeds[0] is not None
+    assert word_finder_seeds == [word_finder_seeds[0]] * 2
+    assert experimenter_cls.word_finder_seed is None